@@ -1,141 +1,248 @@
+import os
 import sqlite3
 import pathlib
-from .schema import SENTENCIAS_CREACION
+import threading
+from .migraciones import aplicar_migraciones
 
 # Ruta a la base de datos
 BASE_DIR = pathlib.Path(__file__).parent
 DB_NAME = BASE_DIR / "clinica.db"
 
 
-def _inicializar_bdd():
-    """Crea la base de datos y todas las tablas si no existen."""
-    conn = None
-    try:
-        print(f"Creando nueva base de datos en: {DB_NAME}")
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        for sentencia in SENTENCIAS_CREACION:
-            cursor.executescript(sentencia)
-        conn.commit()
-        print("Base de datos inicializada correctamente.")
-    except sqlite3.Error as e:
-        print(f"Error al inicializar la base de datos: {e}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
-
-def _aplicar_migraciones(conn):
-    """Aplica migraciones ligeras de esquema si faltan columnas."""
-    try:
-        cur = conn.cursor()
-        cur.execute("PRAGMA table_info(Historial);")
-        columnas = [fila[1] for fila in cur.fetchall()]
-
-        cambios = []
-        if 'id_medico' not in columnas:
-            cambios.append(("id_medico", "INTEGER"))
-        if 'fecha' not in columnas:
-            cambios.append(("fecha", "DATETIME"))
-        if 'observaciones' not in columnas:
-            cambios.append(("observaciones", "TEXT"))
-
-        for nombre, tipo in cambios:
-            cur.execute(f"ALTER TABLE Historial ADD COLUMN {nombre} {tipo};")
-            conn.commit()
-
-        cur.execute("PRAGMA table_info(Turno);")
-        columnas_turno = [fila[1] for fila in cur.fetchall()]
-        if 'asistio' not in columnas_turno:
-            cur.execute("ALTER TABLE Turno ADD COLUMN asistio INTEGER;")
-            conn.commit()
-
-        try:
-            cur.execute("INSERT OR IGNORE INTO Estado (id_estado, nombre) VALUES (1, 'Vigente'), (2, 'Vencida');")
-            conn.commit()
-        except sqlite3.Error:
-            pass
-    except sqlite3.Error as e:
-        print(f"Advertencia: no se pudo aplicar migraciones: {e}")
+# Hilos que usan la base durante toda la ejecución, cada uno con su propia
+# conexión: la interfaz Tk, el planificador de recordatorios y el reclamador
+# del outbox (fijos), los workers de email y los hilos de consultas de la GUI.
+HILOS_FIJOS = 3
+HILOS_EMAIL = int(os.environ.get('EMAIL_WORKERS', 2))   # ver notifications.py
+HILOS_GUI = int(os.environ.get('GUI_HILOS', 3))         # ver GUI/ejecutor.py
+# Lugares extra para hilos de corta vida (scripts, tareas puntuales)
+MARGEN_CONEXIONES = 4
+# Cantidad máxima de conexiones abiertas a la vez (una por hilo activo). Se
+# calcula con los hilos anteriores para que ninguno quede esperando un lugar.
+MAX_CONEXIONES = int(os.environ.get('DB_MAX_CONEXIONES',
+                                    HILOS_FIJOS + HILOS_EMAIL + HILOS_GUI + MARGEN_CONEXIONES))
+# Segundos que un hilo espera por un lugar libre en el pool antes de fallar.
+TIMEOUT_POOL = 10
+
+# Perfiles de pragmas aplicados a cada conexión nueva del pool.
+# El perfil se elige con la variable de entorno DB_PERFIL (por defecto 'normal').
+PERFILES_PRAGMAS = {
+    # Varios puestos de recepción compartiendo clinica.db: WAL permite que los
+    # lectores no bloqueen al que escribe y busy_timeout espera en vez de fallar.
+    'normal': (
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("busy_timeout", 5000),
+        ("cache_size", -16000),      # ~16 MB
+        ("mmap_size", 67108864),     # 64 MB
+        ("temp_store", "MEMORY"),
+    ),
+    # Igual que 'normal' pero sincronizando cada commit al disco.
+    'seguro': (
+        ("journal_mode", "WAL"),
+        ("synchronous", "FULL"),
+        ("busy_timeout", 10000),
+        ("cache_size", -8000),
+        ("mmap_size", 0),
+        ("temp_store", "DEFAULT"),
+    ),
+    # Comportamiento anterior: journal de rollback y valores por defecto.
+    'compatible': (
+        ("journal_mode", "DELETE"),
+        ("synchronous", "FULL"),
+        ("busy_timeout", 5000),
+        ("cache_size", -2000),
+        ("mmap_size", 0),
+        ("temp_store", "DEFAULT"),
+    ),
+}
+DB_PERFIL = os.environ.get('DB_PERFIL', 'normal')
+
+
+def pragmas_de_perfil(nombre):
+    """Devuelve las sentencias PRAGMA del perfil indicado (foreign_keys siempre activo)."""
+    perfil = PERFILES_PRAGMAS.get(nombre)
+    if perfil is None:
+        print(f"Advertencia: perfil de base de datos desconocido '{nombre}', se usa 'normal'.")
+        perfil = PERFILES_PRAGMAS['normal']
+    return ("PRAGMA foreign_keys = ON;",) + tuple(f"PRAGMA {clave} = {valor};" for clave, valor in perfil)
+
+
+# Pragmas que se aplican a cada conexión nueva del pool.
+PRAGMAS_CONEXION = pragmas_de_perfil(DB_PERFIL)
+
+
+class _ConexionProxy:
+    """Proxy mínimo para proteger el cierre accidental desde DAOs.
+
+    Los DAOs llaman a `conn.close()` al terminar cada operación; como la
+    conexión del hilo se reutiliza, ese cierre se ignora. Use
+    `liberar_conexion()` o `close_real_conexion()` para cerrarla de verdad.
+    """
 
+    def __init__(self, real):
+        self._real = real
 
-class DBConnection:
-    """Implementación del patrón Singleton usando __new__.
+    def close(self):
+        # Ignorar cierres accidentales desde DAOs de forma silenciosa.
+        pass
 
-    La primera vez que se crea un objeto `DBConnection()` se guarda en
-    `DBConnection._instance`. Las siguientes llamadas a `DBConnection()`
-    retornan la misma instancia.
-    """
-    _instance = None
+    def close_real(self):
+        return self._real.close()
 
-    def __new__(cls, *args, **kwargs):
-        # Si no existe la instancia única, crearla y guardarla
-        if cls._instance is None:
-            cls._instance = super(DBConnection, cls).__new__(cls)
-        return cls._instance
+    def __getattr__(self, name):
+        return getattr(self._real, name)
 
-    def __init__(self):
-        # Inicializar solo la primera vez
-        if getattr(self, '_initialized', False):
-            return
 
-        if not DB_NAME.exists():
-            _inicializar_bdd()
+class ConnectionPool:
+    """Pool de conexiones SQLite con una conexión por hilo.
+
+    Cada hilo (la interfaz Tk, el scheduler de notificaciones, etc.) recibe
+    su propia conexión, de modo que una escritura sin confirmar de un hilo no
+    es visible ni bloquea el trabajo de los demás. El pool limita la cantidad
+    de conexiones abiertas (`max_conexiones`); cuando está lleno, reclama las
+    conexiones de hilos que ya terminaron o espera a que alguno libere la suya.
+    """
 
-        try:
-            # Permitir uso desde hilos distintos
-            self.conn = sqlite3.connect(DB_NAME, check_same_thread=False)
-            self.conn.execute("PRAGMA foreign_keys = ON;")
+    def __init__(self, db_path=DB_NAME, max_conexiones=MAX_CONEXIONES,
+                 pragmas=PRAGMAS_CONEXION, timeout=TIMEOUT_POOL, migrar=True):
+        self.db_path = db_path
+        self.max_conexiones = max_conexiones
+        self.pragmas = tuple(pragmas)
+        self.timeout = timeout
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        # ident del hilo -> (hilo, conexión real)
+        self._conexiones = {}
+        # Las migraciones (Backend/BDD/migraciones.py) se aplican una sola vez,
+        # con la primera conexión; también crean la base si no existía.
+        self._migrado = not migrar
+
+    def _crear_conexion(self):
+        # check_same_thread=False solo para poder cerrar desde otro hilo las
+        # conexiones de hilos terminados; cada conexión la usa un único hilo.
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        if not self._migrado:
             try:
-                _aplicar_migraciones(self.conn)
-            except Exception:
-                pass
-
-            # Proxy mínimo para proteger el cierre accidental desde DAOs
-            class _Proxy:
-                def __init__(self, real):
-                    self._real = real
-
-                def close(self):
-                    # Ignorar cierres accidentales desde DAOs de forma silenciosa.
-                    # Use `close_real_conexion()` para cerrar la conexión explícitamente.
+                aplicadas = aplicar_migraciones(conn)
+                if aplicadas:
+                    print(f"Base de datos migrada a la versión {aplicadas[-1]}.")
+            except sqlite3.Error as e:
+                print(f"Error al aplicar las migraciones de la base de datos: {e}")
+            self._migrado = True
+        return conn
+
+    def _reclamar_hilos_terminados(self):
+        """Cierra las conexiones de hilos que ya no existen. Requiere el lock."""
+        for ident, (hilo, conn) in list(self._conexiones.items()):
+            if not hilo.is_alive():
+                del self._conexiones[ident]
+                try:
+                    conn.close()
+                except sqlite3.Error:
                     pass
 
-                def close_real(self):
-                    return self._real.close()
+    def obtener(self):
+        """Devuelve la conexión del hilo actual, creándola si hace falta."""
+        proxy = getattr(self._local, 'proxy', None)
+        if proxy is not None:
+            return proxy
+
+        hilo = threading.current_thread()
+        with self._cond:
+            # El sistema reutiliza los ident de hilos terminados: si hay una
+            # entrada con este ident es de un hilo muerto, y su conexión se cierra
+            # antes de pisarla (si no, quedaría abierta y fuera de la cuenta).
+            anterior = self._conexiones.get(hilo.ident)
+            if anterior is not None and anterior[0] is not hilo:
+                del self._conexiones[hilo.ident]
+                try:
+                    anterior[1].close()
+                except sqlite3.Error:
+                    pass
+            while len(self._conexiones) >= self.max_conexiones:
+                self._reclamar_hilos_terminados()
+                if len(self._conexiones) < self.max_conexiones:
+                    break
+                if not self._cond.wait(self.timeout):
+                    self._reclamar_hilos_terminados()
+                    if len(self._conexiones) >= self.max_conexiones:
+                        raise sqlite3.OperationalError("No hay conexiones libres en el pool.")
+            conn = self._crear_conexion()
+            self._conexiones[hilo.ident] = (hilo, conn)
+
+        proxy = _ConexionProxy(conn)
+        self._local.proxy = proxy
+        return proxy
+
+    def liberar(self):
+        """Cierra la conexión del hilo actual y libera su lugar en el pool."""
+        proxy = getattr(self._local, 'proxy', None)
+        if proxy is None:
+            return
+        self._local.proxy = None
+        with self._cond:
+            self._conexiones.pop(threading.get_ident(), None)
+            try:
+                if proxy.in_transaction:
+                    proxy.rollback()
+                proxy.close_real()
+            except sqlite3.Error as e:
+                print(f"Error cerrando la conexión: {e}")
+            self._cond.notify()
 
-                def __getattr__(self, name):
-                    return getattr(self._real, name)
+    def cerrar_todas(self):
+        """Cierra todas las conexiones del pool (al apagar la aplicación)."""
+        with self._cond:
+            for hilo, conn in self._conexiones.values():
+                try:
+                    conn.close()
+                except sqlite3.Error as e:
+                    print(f"Error cerrando la conexión: {e}")
+            self._conexiones.clear()
+            self._cond.notify_all()
+        self._local = threading.local()
 
-            self._proxy = _Proxy(self.conn)
-        except sqlite3.Error as e:
-            print(f"Error al conectar con la base de datos: {e}")
-            self.conn = None
+    def conexiones_abiertas(self):
+        with self._cond:
+            return len(self._conexiones)
 
-        self._initialized = True
 
-    def get_conexion(self):
-        return getattr(self, '_proxy', self.conn)
+_pool = None
+_pool_lock = threading.Lock()
 
-    def close_conexion(self):
-        if getattr(self, 'conn', None):
-            try:
-                self.conn.close()
-            except Exception as e:
-                print(f"Error cerrando la conexión: {e}")
-            finally:
-                type(self)._instance = None
+
+def get_pool():
+    """Devuelve el pool de conexiones de la aplicación, creándolo la primera vez."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_NAME)
+    return _pool
 
 
 def get_conexion():
-    """API pública compatible: devuelve la conexión SQLite compartida."""
-    singleton = DBConnection()
-    return singleton.get_conexion()
+    """API pública compatible: devuelve la conexión SQLite del hilo actual."""
+    try:
+        return get_pool().obtener()
+    except sqlite3.Error as e:
+        print(f"Error al conectar con la base de datos: {e}")
+        return None
 
 
-def close_real_conexion():
-    """Cerrar la conexión real; útil al apagar la aplicación."""
-    singleton = DBConnection()
-    singleton.close_conexion()
+def liberar_conexion():
+    """Libera la conexión del hilo actual; útil al terminar hilos de trabajo."""
+    if _pool is not None:
+        _pool.liberar()
 
+
+def close_real_conexion():
+    """Cerrar todas las conexiones reales; útil al apagar la aplicación."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.cerrar_todas()
+            _pool = None
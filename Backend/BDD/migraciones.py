@@ -0,0 +1,328 @@
+"""
+Migraciones de esquema numeradas, según `PRAGMA user_version`.
+
+La base guarda en su encabezado (`user_version`) el número de la última
+migración aplicada. Al abrir la primera conexión se compara con la versión
+de este módulo: si coincide no se hace nada más (una sola lectura del
+encabezado, sin revisar tablas ni columnas); si es menor se aplican las
+migraciones pendientes, en orden y todas en UNA transacción (BEGIN IMMEDIATE),
+junto con el nuevo user_version. Si alguna falla se deshace todo y la base
+queda exactamente como estaba.
+
+Las bases anteriores a este módulo tienen user_version 0 y pueden venir con
+distintas columnas según la versión del programa que las creó; por eso las
+primeras migraciones usan `_agregar_columna`, que solo agrega lo que falta.
+
+Para cambiar el esquema se agrega una función al final de MIGRACIONES (nunca
+se modifica ni se reordena una ya publicada). Dentro de una migración no usar
+`executescript` (hace COMMIT y rompería la transacción): usar `_ejecutar`.
+
+`reconstruir` recalcula desde cero las tablas derivadas (resumen diario de
+turnos e índices de búsqueda), por si quedaron desfasadas de los datos.
+
+Uso:  python -m Backend.BDD.migraciones [aplicar|verificar|reconstruir] [ruta.db]
+"""
+import sys
+import sqlite3
+import pathlib
+
+from .schema import (SQL_CREAR_TABLA_USUARIO, SQL_CREAR_TABLA_BARRIO, SQL_CREAR_TABLA_OBRA_SOCIAL,
+                     SQL_CREAR_TABLA_CONSULTORIO, SQL_CREAR_TABLA_ESTADO, SQL_INSERT_ESTADOS_DEFAULT,
+                     SQL_CREAR_TABLA_ESPECIALIDAD, SQL_CREAR_TABLA_PACIENTE, SQL_CREAR_TABLA_MEDICO,
+                     SQL_CREAR_TABLA_TURNO, SQL_CREAR_TABLA_HISTORIAL, SQL_CREAR_TABLA_RECETA,
+                     SQL_CREAR_TABLA_FRANJA_HORARIA, SQL_INSERTAR_OBRAS_SOCIALES_DEFAULT,
+                     SQL_INSERTAR_BARRIOS_DEFAULT, SQL_CREAR_INDICES_TURNO,
+                     SQL_COMPLETAR_CLAVE_SLOT, SQL_CREAR_INDICES_SLOT_TURNO, SQL_CREAR_TABLA_OUTBOX,
+                     SQL_CREAR_TABLAS_NOTIFICACION, SQL_COPIAR_NOTIFICACIONES_ANTERIORES,
+                     SQL_CREAR_BUSQUEDA_PERSONAS, SQL_RECONSTRUIR_BUSQUEDA_PERSONAS,
+                     SQL_CREAR_RESUMEN_TURNOS, SQL_RECONSTRUIR_RESUMEN_TURNOS)
+
+
+# ---------------- utilidades para las migraciones ----------------
+def _ejecutar(cur, script):
+    """Ejecuta un script de varias sentencias sin salir de la transacción."""
+    sentencia = ""
+    for linea in script.splitlines(keepends=True):
+        sentencia += linea
+        # complete_statement no corta dentro de los BEGIN ... END de un trigger
+        if sqlite3.complete_statement(sentencia):
+            cur.execute(sentencia)
+            sentencia = ""
+    if sentencia.strip():
+        cur.execute(sentencia)
+
+
+def _columnas(cur, tabla):
+    cur.execute(f"PRAGMA table_info({tabla})")
+    return [fila[1] for fila in cur.fetchall()]
+
+
+def _agregar_columna(cur, tabla, columna, tipo):
+    """ALTER TABLE ... ADD COLUMN solo si la columna no existe. Devuelve True si la agregó."""
+    if columna in _columnas(cur, tabla):
+        return False
+    cur.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
+    return True
+
+
+def _minutos(hora):
+    """'HH:MM' o 'HH:MM:SS' -> minutos desde la medianoche."""
+    partes = str(hora).split(":")
+    return int(partes[0]) * 60 + int(partes[1])
+
+
+def _franjas_fuera_de_grilla(cur):
+    """(id_franja, hora_inicio, hora_fin) de las franjas que no empiezan o terminan en HH:00/HH:30."""
+    cur.execute("SELECT id_franja, hora_inicio, hora_fin FROM FranjaHoraria")
+    fuera = []
+    for id_franja, hora_inicio, hora_fin in cur.fetchall():
+        try:
+            if _minutos(hora_inicio) % 30 or _minutos(hora_fin) % 30:
+                fuera.append((id_franja, hora_inicio, hora_fin))
+        except (ValueError, IndexError):
+            fuera.append((id_franja, hora_inicio, hora_fin))
+    return fuera
+
+
+def _fts5_disponible(cur):
+    cur.execute("SELECT 1 FROM pragma_compile_options WHERE compile_options = 'ENABLE_FTS5'")
+    return cur.fetchone() is not None
+
+
+# ---------------- migraciones ----------------
+def _m001_esquema_base(cur):
+    """Tablas principales, datos por defecto y columnas agregadas a Historial/Turno/Usuario."""
+    for sql in (SQL_CREAR_TABLA_USUARIO, SQL_CREAR_TABLA_BARRIO, SQL_CREAR_TABLA_OBRA_SOCIAL,
+                SQL_CREAR_TABLA_CONSULTORIO, SQL_CREAR_TABLA_ESTADO, SQL_INSERT_ESTADOS_DEFAULT,
+                SQL_CREAR_TABLA_ESPECIALIDAD, SQL_CREAR_TABLA_PACIENTE, SQL_CREAR_TABLA_MEDICO,
+                SQL_CREAR_TABLA_TURNO, SQL_CREAR_TABLA_HISTORIAL, SQL_CREAR_TABLA_RECETA,
+                SQL_CREAR_TABLA_FRANJA_HORARIA, SQL_INSERTAR_OBRAS_SOCIALES_DEFAULT,
+                SQL_INSERTAR_BARRIOS_DEFAULT):
+        _ejecutar(cur, sql)
+    _agregar_columna(cur, "Historial", "id_medico", "INTEGER")
+    _agregar_columna(cur, "Historial", "fecha", "DATETIME")
+    _agregar_columna(cur, "Historial", "observaciones", "TEXT")
+    _agregar_columna(cur, "Turno", "asistio", "INTEGER")
+    # Bases muy viejas tenían la columna de la contraseña mal escrita
+    if "contrasea" in _columnas(cur, "Usuario"):
+        cur.execute("ALTER TABLE Usuario RENAME COLUMN contrasea TO contrasenia")
+
+
+def _m002_indices_turno(cur):
+    """Índices compuestos de Turno por médico, paciente, consultorio y fecha."""
+    _ejecutar(cur, SQL_CREAR_INDICES_TURNO)
+
+
+def _m003_clave_slot(cur):
+    """clave_slot en Turno (completada en los turnos existentes) y sus índices únicos."""
+    _agregar_columna(cur, "Turno", "clave_slot", "INTEGER")
+    cur.execute(SQL_COMPLETAR_CLAVE_SLOT)
+    _ejecutar(cur, SQL_CREAR_INDICES_SLOT_TURNO)
+
+
+def _m004_outbox(cur):
+    """Outbox de emails."""
+    _ejecutar(cur, SQL_CREAR_TABLA_OUTBOX)
+
+
+def _m005_notificaciones(cur):
+    """Tablas de recordatorios enviados (antes las creaba notifications.py al iniciar)."""
+    _ejecutar(cur, SQL_CREAR_TABLAS_NOTIFICACION)
+    cur.execute(SQL_COPIAR_NOTIFICACIONES_ANTERIORES)
+
+
+def _m006_busqueda_personas(cur):
+    """Índices FTS5 de pacientes y médicos (si el SQLite no trae FTS5 las búsquedas usan LIKE)."""
+    if not _fts5_disponible(cur):
+        print("Advertencia: búsqueda de texto completo no disponible; se usará LIKE.")
+        return
+    _ejecutar(cur, SQL_CREAR_BUSQUEDA_PERSONAS)
+    _ejecutar(cur, SQL_RECONSTRUIR_BUSQUEDA_PERSONAS)
+
+
+def _m007_resumen_turnos(cur):
+    """Resumen diario de turnos para los reportes, con sus triggers, calculado desde Turno."""
+    _ejecutar(cur, SQL_CREAR_RESUMEN_TURNOS)
+    _ejecutar(cur, SQL_RECONSTRUIR_RESUMEN_TURNOS)
+
+
+def _m008_franjas_en_grilla(cur):
+    """
+    Lleva las franjas a la grilla de turnos (HH:00/HH:30): el inicio se redondea
+    hacia arriba y el fin hacia abajo. Las que quedarían vacías, chocan con otra
+    franja del mismo día o tienen horas ilegibles se dejan como están y las
+    informa `verificar`.
+    """
+    for id_franja, hora_inicio, hora_fin in _franjas_fuera_de_grilla(cur):
+        try:
+            inicio = -(-_minutos(hora_inicio) // 30) * 30
+            fin = _minutos(hora_fin) // 30 * 30
+        except (ValueError, IndexError):
+            continue
+        if inicio >= fin:
+            continue
+        try:
+            cur.execute("UPDATE FranjaHoraria SET hora_inicio = ?, hora_fin = ? WHERE id_franja = ?",
+                        (f"{inicio // 60:02d}:{inicio % 60:02d}", f"{fin // 60:02d}:{fin % 60:02d}", id_franja))
+        except sqlite3.IntegrityError:
+            pass  # UNIQUE (id_medico, dia_semana, hora_inicio): ya hay una franja que empieza ahí
+
+
+def _m009_outbox_reclamado_en(cur):
+    """Hora del reclamo de cada mensaje del outbox, para recuperar solo los reclamos vencidos."""
+    _agregar_columna(cur, "OutboxEmail", "reclamado_en", "TEXT")
+
+
+# Posición + 1 = número de versión. Solo se agregan migraciones al final.
+MIGRACIONES = [
+    _m001_esquema_base,
+    _m002_indices_turno,
+    _m003_clave_slot,
+    _m004_outbox,
+    _m005_notificaciones,
+    _m006_busqueda_personas,
+    _m007_resumen_turnos,
+    _m008_franjas_en_grilla,
+    _m009_outbox_reclamado_en,
+]
+VERSION_ACTUAL = len(MIGRACIONES)
+
+# Lo que `verificar` espera encontrar en una base al día: tabla -> columnas
+COLUMNAS_ESPERADAS = {
+    "Historial": ("id_medico", "fecha", "observaciones"),
+    "Turno": ("asistio", "clave_slot"),
+    "Usuario": ("contrasenia",),
+    "OutboxEmail": ("estado", "proximo_intento", "reclamado_en"),
+    "RecordatorioEnviado": ("id_turno", "offset_minutos"),
+    "ResumenTurnoDiario": ("fecha", "id_medico", "reservados"),
+}
+INDICES_ESPERADOS = (
+    "idx_turno_medico_fecha", "idx_turno_paciente_fecha", "idx_turno_consultorio_fecha",
+    "idx_turno_fecha", "ux_turno_medico_slot", "ux_turno_paciente_slot",
+    "ux_turno_consultorio_slot", "idx_outbox_pendientes",
+)
+
+
+def version_de(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def aplicar_migraciones(conn):
+    """
+    Lleva la base a VERSION_ACTUAL. Devuelve la lista de versiones aplicadas
+    ([] si ya estaba al día). Si una migración falla se deshacen todas y se
+    relanza la excepción.
+    """
+    if version_de(conn) >= VERSION_ACTUAL:
+        return []
+    if conn.in_transaction:
+        conn.commit()
+    cur = conn.cursor()
+    # IMMEDIATE toma el lock de escritura antes de releer la versión: si otro
+    # puesto está migrando la misma base, se espera (busy_timeout) y después
+    # ya no queda nada pendiente.
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        version = version_de(conn)
+        aplicadas = []
+        for numero in range(version + 1, VERSION_ACTUAL + 1):
+            MIGRACIONES[numero - 1](cur)
+            aplicadas.append(numero)
+        cur.execute(f"PRAGMA user_version = {VERSION_ACTUAL:d}")
+        conn.commit()
+        return aplicadas
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def verificar(conn):
+    """Lista de problemas encontrados (vacía si la base está al día)."""
+    problemas = []
+    version = version_de(conn)
+    if version < VERSION_ACTUAL:
+        pendientes = ", ".join(f"{n} ({MIGRACIONES[n - 1].__name__})" for n in range(version + 1, VERSION_ACTUAL + 1))
+        problemas.append(f"Versión {version} de {VERSION_ACTUAL}; pendientes: {pendientes}")
+    elif version > VERSION_ACTUAL:
+        problemas.append(f"La base tiene versión {version}, posterior a la de este programa ({VERSION_ACTUAL})")
+    cur = conn.cursor()
+    for tabla, columnas in COLUMNAS_ESPERADAS.items():
+        existentes = _columnas(cur, tabla)
+        if not existentes:
+            problemas.append(f"Falta la tabla {tabla}")
+            continue
+        for columna in columnas:
+            if columna not in existentes:
+                problemas.append(f"Falta la columna {tabla}.{columna}")
+    cur.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    indices = {fila[0] for fila in cur.fetchall()}
+    for indice in INDICES_ESPERADOS:
+        if indice not in indices:
+            problemas.append(f"Falta el índice {indice}")
+    if "reservados" in _columnas(cur, "ResumenTurnoDiario"):
+        cur.execute("SELECT (SELECT COUNT(*) FROM Turno), (SELECT COALESCE(SUM(reservados), 0) FROM ResumenTurnoDiario)")
+        turnos, resumidos = cur.fetchone()
+        if turnos != resumidos:
+            problemas.append(f"ResumenTurnoDiario suma {resumidos} turnos y Turno tiene {turnos}; usar 'reconstruir'")
+    if _columnas(cur, "FranjaHoraria"):
+        for id_franja, hora_inicio, hora_fin in _franjas_fuera_de_grilla(cur):
+            problemas.append(f"La franja {id_franja} ({hora_inicio}-{hora_fin}) no está en la grilla de "
+                             "HH:00/HH:30; corregirla en Horarios del médico")
+    return problemas
+
+
+def reconstruir(conn):
+    """Recalcula el resumen diario de turnos y los índices de búsqueda en una transacción."""
+    if conn.in_transaction:
+        conn.commit()
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        _ejecutar(cur, SQL_RECONSTRUIR_RESUMEN_TURNOS)
+        cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'PacienteFTS'")
+        if cur.fetchone() is not None:
+            _ejecutar(cur, SQL_RECONSTRUIR_BUSQUEDA_PERSONAS)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def main(argv):
+    from .Conexion import DB_NAME
+    comando = argv[1] if len(argv) > 1 else "verificar"
+    ruta = pathlib.Path(argv[2]) if len(argv) > 2 else DB_NAME
+    if comando not in ("aplicar", "verificar", "reconstruir"):
+        print(__doc__)
+        return 2
+    conn = sqlite3.connect(ruta)
+    try:
+        conn.execute("PRAGMA busy_timeout = 5000")
+        if comando == "aplicar":
+            antes = version_de(conn)
+            aplicadas = aplicar_migraciones(conn)
+            if aplicadas:
+                print(f"{ruta}: versión {antes} -> {VERSION_ACTUAL} (migraciones {aplicadas})")
+            else:
+                print(f"{ruta}: ya está en la versión {antes}, no hay migraciones pendientes.")
+        elif comando == "reconstruir":
+            if version_de(conn) < VERSION_ACTUAL:
+                print(f"{ruta}: hay migraciones pendientes; usar 'aplicar' primero.")
+                return 1
+            reconstruir(conn)
+            print(f"{ruta}: tablas derivadas reconstruidas.")
+        problemas = verificar(conn)
+        for problema in problemas:
+            print(f"- {problema}")
+        if not problemas:
+            print(f"{ruta}: esquema al día (versión {VERSION_ACTUAL}).")
+        return 1 if problemas else 0
+    except sqlite3.Error as e:
+        print(f"Error al {comando} las migraciones: {e}")
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
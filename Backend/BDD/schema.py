@@ -104,12 +104,158 @@ CREATE TABLE IF NOT EXISTS Turno (
     id_consultorio INTEGER,
     fecha_hora DATETIME NOT NULL,
     motivo TEXT,
+    asistio INTEGER,
+    clave_slot INTEGER,
     FOREIGN KEY (id_paciente) REFERENCES Paciente(id_paciente),
     FOREIGN KEY (id_medico) REFERENCES Medico(id_medico),
     FOREIGN KEY (id_consultorio) REFERENCES Consultorio(id_consultorio)
 );
 """
 
+# Índices compuestos para las búsquedas de turnos por médico, paciente o
+# consultorio dentro de un rango de fecha_hora (agenda, solapamientos, reportes).
+SQL_CREAR_INDICES_TURNO = """
+CREATE INDEX IF NOT EXISTS idx_turno_medico_fecha ON Turno (id_medico, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_turno_paciente_fecha ON Turno (id_paciente, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_turno_consultorio_fecha ON Turno (id_consultorio, fecha_hora);
+CREATE INDEX IF NOT EXISTS idx_turno_fecha ON Turno (fecha_hora);
+"""
+
+# clave_slot = número de slot de 30 minutos (segundos Unix de fecha_hora / 1800).
+# Los índices únicos hacen que la base rechace, en la misma escritura, un segundo
+# turno del mismo médico, paciente o consultorio en el mismo slot.
+SQL_CREAR_INDICES_SLOT_TURNO = """
+CREATE UNIQUE INDEX IF NOT EXISTS ux_turno_medico_slot ON Turno (id_medico, clave_slot);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_turno_paciente_slot ON Turno (id_paciente, clave_slot);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_turno_consultorio_slot ON Turno (id_consultorio, clave_slot);
+"""
+
+# Completa clave_slot en turnos existentes. Si datos viejos ya tienen dos turnos
+# en el mismo slot para el mismo médico/paciente/consultorio, el más nuevo queda
+# con clave_slot NULL para que los índices únicos se puedan crear.
+SQL_COMPLETAR_CLAVE_SLOT = """
+UPDATE Turno SET clave_slot = CAST(strftime('%s', fecha_hora) AS INTEGER) / 1800
+WHERE clave_slot IS NULL
+  AND NOT EXISTS (
+    SELECT 1 FROM Turno E
+    WHERE E.id_turno < Turno.id_turno
+      AND CAST(strftime('%s', E.fecha_hora) AS INTEGER) / 1800 = CAST(strftime('%s', Turno.fecha_hora) AS INTEGER) / 1800
+      AND (E.id_medico = Turno.id_medico OR E.id_paciente = Turno.id_paciente OR E.id_consultorio = Turno.id_consultorio)
+  );
+"""
+
+# Búsqueda de pacientes y médicos por apellido, nombre o DNI con índices FTS5 de
+# contenido externo (no duplican los datos). remove_diacritics 2 pliega acentos y
+# diéresis ("Güemes" encuentra "guemes"); prefix='2 3' acelera las búsquedas por
+# prefijo mientras se escribe. Los triggers mantienen el índice sincronizado.
+SQL_CREAR_BUSQUEDA_PERSONAS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS PacienteFTS USING fts5(
+    apellido, nombre, dni,
+    content='Paciente', content_rowid='id_paciente',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS trg_paciente_fts_ai AFTER INSERT ON Paciente BEGIN
+    INSERT INTO PacienteFTS (rowid, apellido, nombre, dni) VALUES (new.id_paciente, new.apellido, new.nombre, new.dni);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_paciente_fts_ad AFTER DELETE ON Paciente BEGIN
+    INSERT INTO PacienteFTS (PacienteFTS, rowid, apellido, nombre, dni) VALUES ('delete', old.id_paciente, old.apellido, old.nombre, old.dni);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_paciente_fts_au AFTER UPDATE OF apellido, nombre, dni ON Paciente BEGIN
+    INSERT INTO PacienteFTS (PacienteFTS, rowid, apellido, nombre, dni) VALUES ('delete', old.id_paciente, old.apellido, old.nombre, old.dni);
+    INSERT INTO PacienteFTS (rowid, apellido, nombre, dni) VALUES (new.id_paciente, new.apellido, new.nombre, new.dni);
+END;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS MedicoFTS USING fts5(
+    apellido, nombre, dni,
+    content='Medico', content_rowid='id_medico',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS trg_medico_fts_ai AFTER INSERT ON Medico BEGIN
+    INSERT INTO MedicoFTS (rowid, apellido, nombre, dni) VALUES (new.id_medico, new.apellido, new.nombre, new.dni);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_medico_fts_ad AFTER DELETE ON Medico BEGIN
+    INSERT INTO MedicoFTS (MedicoFTS, rowid, apellido, nombre, dni) VALUES ('delete', old.id_medico, old.apellido, old.nombre, old.dni);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_medico_fts_au AFTER UPDATE OF apellido, nombre, dni ON Medico BEGIN
+    INSERT INTO MedicoFTS (MedicoFTS, rowid, apellido, nombre, dni) VALUES ('delete', old.id_medico, old.apellido, old.nombre, old.dni);
+    INSERT INTO MedicoFTS (rowid, apellido, nombre, dni) VALUES (new.id_medico, new.apellido, new.nombre, new.dni);
+END;
+
+CREATE INDEX IF NOT EXISTS idx_paciente_apellido_nombre ON Paciente (apellido, nombre);
+"""
+
+# Reconstruye los índices FTS desde las tablas (al crearlos sobre datos existentes).
+SQL_RECONSTRUIR_BUSQUEDA_PERSONAS = """
+INSERT INTO PacienteFTS (PacienteFTS) VALUES ('rebuild');
+INSERT INTO MedicoFTS (MedicoFTS) VALUES ('rebuild');
+"""
+
+# Resumen diario de turnos para los reportes: una fila por día, médico y
+# especialidad (la actual del médico) con la cantidad de turnos reservados,
+# asistidos, ausentes y pendientes. Los triggers lo mantienen al día con cada
+# alta, baja o modificación de Turno, así los reportes no recorren Turno.
+# Un médico sin especialidad conocida queda con id_especialidad 0.
+SQL_CREAR_RESUMEN_TURNOS = """
+CREATE TABLE IF NOT EXISTS ResumenTurnoDiario (
+    fecha TEXT NOT NULL,              -- 'YYYY-MM-DD' (primeros 10 caracteres de fecha_hora)
+    id_medico INTEGER NOT NULL,
+    id_especialidad INTEGER NOT NULL,
+    reservados INTEGER NOT NULL DEFAULT 0,
+    asistidos INTEGER NOT NULL DEFAULT 0,
+    ausentes INTEGER NOT NULL DEFAULT 0,
+    pendientes INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (fecha, id_medico, id_especialidad)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS trg_resumen_turno_ai AFTER INSERT ON Turno BEGIN
+    INSERT INTO ResumenTurnoDiario (fecha, id_medico, id_especialidad, reservados, asistidos, ausentes, pendientes)
+    VALUES (substr(new.fecha_hora, 1, 10), new.id_medico,
+            COALESCE((SELECT id_especialidad FROM Medico WHERE id_medico = new.id_medico), 0),
+            1, new.asistio IS 1, new.asistio IS 0, new.asistio IS NULL)
+    ON CONFLICT (fecha, id_medico, id_especialidad) DO UPDATE SET
+        reservados = reservados + 1, asistidos = asistidos + excluded.asistidos,
+        ausentes = ausentes + excluded.ausentes, pendientes = pendientes + excluded.pendientes;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_resumen_turno_ad AFTER DELETE ON Turno BEGIN
+    UPDATE ResumenTurnoDiario
+    SET reservados = reservados - 1, asistidos = asistidos - (old.asistio IS 1),
+        ausentes = ausentes - (old.asistio IS 0), pendientes = pendientes - (old.asistio IS NULL)
+    WHERE fecha = substr(old.fecha_hora, 1, 10) AND id_medico = old.id_medico;
+    DELETE FROM ResumenTurnoDiario
+    WHERE fecha = substr(old.fecha_hora, 1, 10) AND id_medico = old.id_medico AND reservados <= 0;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_resumen_turno_au AFTER UPDATE OF fecha_hora, id_medico, asistio ON Turno BEGIN
+    UPDATE ResumenTurnoDiario
+    SET reservados = reservados - 1, asistidos = asistidos - (old.asistio IS 1),
+        ausentes = ausentes - (old.asistio IS 0), pendientes = pendientes - (old.asistio IS NULL)
+    WHERE fecha = substr(old.fecha_hora, 1, 10) AND id_medico = old.id_medico;
+    DELETE FROM ResumenTurnoDiario
+    WHERE fecha = substr(old.fecha_hora, 1, 10) AND id_medico = old.id_medico AND reservados <= 0;
+    INSERT INTO ResumenTurnoDiario (fecha, id_medico, id_especialidad, reservados, asistidos, ausentes, pendientes)
+    VALUES (substr(new.fecha_hora, 1, 10), new.id_medico,
+            COALESCE((SELECT id_especialidad FROM Medico WHERE id_medico = new.id_medico), 0),
+            1, new.asistio IS 1, new.asistio IS 0, new.asistio IS NULL)
+    ON CONFLICT (fecha, id_medico, id_especialidad) DO UPDATE SET
+        reservados = reservados + 1, asistidos = asistidos + excluded.asistidos,
+        ausentes = ausentes + excluded.ausentes, pendientes = pendientes + excluded.pendientes;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_resumen_medico_au AFTER UPDATE OF id_especialidad ON Medico BEGIN
+    UPDATE ResumenTurnoDiario SET id_especialidad = COALESCE(new.id_especialidad, 0)
+    WHERE id_medico = new.id_medico;
+END;
+"""
+
+# Recalcula el resumen diario completo desde Turno (migración y comando
+# `python -m Backend.BDD.migraciones reconstruir`).
+SQL_RECONSTRUIR_RESUMEN_TURNOS = """
+DELETE FROM ResumenTurnoDiario;
+INSERT INTO ResumenTurnoDiario (fecha, id_medico, id_especialidad, reservados, asistidos, ausentes, pendientes)
+SELECT substr(T.fecha_hora, 1, 10), T.id_medico, COALESCE(M.id_especialidad, 0),
+       COUNT(*), SUM(T.asistio IS 1), SUM(T.asistio IS 0), SUM(T.asistio IS NULL)
+FROM Turno AS T
+LEFT JOIN Medico AS M ON M.id_medico = T.id_medico
+GROUP BY 1, 2, 3;
+"""
+
 SQL_CREAR_TABLA_HISTORIAL = """
 CREATE TABLE IF NOT EXISTS Historial (
     id_historial INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -139,6 +285,49 @@ CREATE TABLE IF NOT EXISTS Receta (
 );
 """
 
+# Outbox de emails: los mensajes se escriben en la misma transacción que el
+# turno y un despachador en segundo plano los entrega con reintentos.
+SQL_CREAR_TABLA_OUTBOX = """
+CREATE TABLE IF NOT EXISTS OutboxEmail (
+    id_mensaje INTEGER PRIMARY KEY AUTOINCREMENT,
+    destinatario TEXT NOT NULL,
+    asunto TEXT NOT NULL,
+    cuerpo TEXT NOT NULL,
+    tipo TEXT,
+    id_turno INTEGER,
+    estado TEXT NOT NULL DEFAULT 'pendiente',  -- pendiente | enviando | enviado | fallido
+    intentos INTEGER NOT NULL DEFAULT 0,
+    proximo_intento TEXT NOT NULL,
+    creado_en TEXT NOT NULL,
+    enviado_en TEXT,
+    ultimo_error TEXT,
+    reclamado_en TEXT  -- cuándo lo pasó a 'enviando' un despachador (ver DespachadorOutbox)
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_pendientes ON OutboxEmail (estado, proximo_intento);
+"""
+
+# Recordatorios ya encolados por el planificador de notificaciones: un registro
+# por turno y anticipación (en minutos). NotificacionTurno es la tabla anterior,
+# cuando solo había recordatorios de 24 h.
+SQL_CREAR_TABLAS_NOTIFICACION = """
+CREATE TABLE IF NOT EXISTS NotificacionTurno (
+    id_turno INTEGER PRIMARY KEY,
+    enviado_en TEXT
+);
+CREATE TABLE IF NOT EXISTS RecordatorioEnviado (
+    id_turno INTEGER NOT NULL,
+    offset_minutos INTEGER NOT NULL,
+    enviado_en TEXT,
+    PRIMARY KEY (id_turno, offset_minutos)
+);
+"""
+
+# Los recordatorios enviados antes de existir RecordatorioEnviado eran todos de 24 h
+SQL_COPIAR_NOTIFICACIONES_ANTERIORES = """
+INSERT OR IGNORE INTO RecordatorioEnviado (id_turno, offset_minutos, enviado_en)
+SELECT id_turno, 1440, enviado_en FROM NotificacionTurno;
+"""
+
 SQL_CREAR_TABLA_FRANJA_HORARIA = """
 CREATE TABLE IF NOT EXISTS FranjaHoraria (
     id_franja INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -161,7 +350,7 @@ SQL_INSERTAR_BARRIOS_DEFAULT = """
 INSERT OR IGNORE INTO Barrio (id_barrio, nombre) VALUES
     (1, 'ACOSTA'), (2, 'ALBERDI'), (3, 'ALTA CÓRDOBA'), (4, 'ALTAMIRA'), (5, 'ALTO ALBERDI'),
     (6, 'ALTO VERDE'), (7, 'AMEGHINO NORTE'), (8, 'AMEGHINO SUR'), (9, 'ARGUELLO'), (10, 'AYACUCHO'),
-    (11, 'BAJADA DE PIEDRA'), (12, 'BAJO GENERAL PAZ'), (13, 'BELLA VISTA'), (14, 'CENTRO'), (15, 'CERRO DE LAS ROSAS')
+    (11, 'BAJADA DE PIEDRA'), (12, 'BAJO GENERAL PAZ'), (13, 'BELLA VISTA'), (14, 'CENTRO'), (15, 'CERRO DE LAS ROSAS'),
     (16, 'GENERAL PAZ'), (17, 'GÜEMES'), (18, 'JARDÍN'), (19, 'JARDÍN ESPINOSA'), (20, 'JOSE IGNACIO DÍAZ'), 
     (21, 'LA FLORESTA'), (22, 'LOS NARANJOS'), (23, 'NUEVA CÓRDOBA'), (24, 'OBSERVATORIO'), (25, 'ROSEDAL'), (26, 'SAN FRANCISCO'),
     (27, 'SAN VICENTE'), (28, 'SANTA ISABEL'), (29, 'URCA'), (30, 'VILLA BELGRANO'), (31, 'VILLA EL LIBERTADOR');
@@ -178,9 +367,12 @@ SENTENCIAS_CREACION = [
     SQL_CREAR_TABLA_PACIENTE,
     SQL_CREAR_TABLA_MEDICO,
     SQL_CREAR_TABLA_TURNO,
+    SQL_CREAR_INDICES_TURNO,
+    SQL_CREAR_INDICES_SLOT_TURNO,
     SQL_CREAR_TABLA_HISTORIAL,
     SQL_CREAR_TABLA_RECETA,
     SQL_CREAR_TABLA_FRANJA_HORARIA,
+    SQL_CREAR_TABLA_OUTBOX,
     SQL_INSERTAR_OBRAS_SOCIALES_DEFAULT,
     SQL_INSERTAR_BARRIOS_DEFAULT
 ]
@@ -2,6 +2,7 @@ import sqlite3
 
 from Backend.BDD.Conexion import get_conexion
 from Backend.Model.Barrio import Barrio 
+from Backend.referencias import get_referencias
 
 class BarrioDAO:
     """
@@ -29,6 +30,7 @@ class BarrioDAO:
 
             cursor.execute(sql, valores)
             conn.commit()
+            get_referencias().invalidar('Barrio')
             print("Barrio creado exitosamente.")
             return cursor.lastrowid # Retorna el ID del nuevo barrio
 
@@ -43,38 +45,19 @@ class BarrioDAO:
 
     def obtener_todos_los_barrios(self):
         """
-        Retorna una lista de todos los barrios como objetos Barrio.
+        Retorna una lista de todos los barrios como objetos Barrio (desde el caché de referencias).
         """
-        conn = None
-        barrios = []
-        try:
-            conn = get_conexion()
-            cursor = conn.cursor()
-
-            sql = "SELECT * FROM Barrio"
-            cursor.execute(sql)
-            filas = cursor.fetchall()
-
-            for fila in filas:
-                barrio = Barrio(
-                    id_barrio=fila[0],
-                    nombre=fila[1]
-                )
-                barrios.append(barrio)
-
-            return barrios
-
-        except sqlite3.Error as e:
-            print(f"Error al obtener los barrios: {e}")
-            return []
-        finally:
-            if conn:
-                conn.close()
+        return get_referencias().todos('Barrio')
 
     def buscar_barrio_por_nombre(self, nombre):
         """
         Retorna un objeto Barrio dado su nombre exacto, o None si no existe.
+        Busca primero en el caché de referencias; si no está, confirma en la base
+        (pudo crearlo otro proceso) antes de responder None.
         """
+        barrio = get_referencias().por_nombre('Barrio', nombre)
+        if barrio:
+            return barrio
         conn = None
         try:
             conn = get_conexion()
@@ -82,6 +65,7 @@ class BarrioDAO:
             cursor.execute("SELECT id_barrio, nombre FROM Barrio WHERE nombre = ?", (nombre,))
             fila = cursor.fetchone()
             if fila:
+                get_referencias().invalidar('Barrio')
                 return Barrio(id_barrio=fila[0], nombre=fila[1])
             return None
         except sqlite3.Error as e:
@@ -103,32 +87,9 @@ class BarrioDAO:
 
     def obtener_barrio_por_id(self, id_barrio):
         """
-        Retorna un objeto Barrio dado su ID.
+        Retorna un objeto Barrio dado su ID (desde el caché de referencias).
         """
-        conn = None
-        try:
-            conn = get_conexion()
-            cursor = conn.cursor()
-
-            sql = "SELECT * FROM Barrio WHERE id_barrio = ?"
-            cursor.execute(sql, (id_barrio,))
-            fila = cursor.fetchone()
-
-            if fila:
-                barrio = Barrio(
-                    id_barrio=fila[0],
-                    nombre=fila[1]
-                )
-                return barrio
-            else:
-                return None
-
-        except sqlite3.Error as e:
-            print(f"Error al obtener el barrio por ID: {e}")
-            return None
-        finally:
-            if conn:
-                conn.close()
+        return get_referencias().por_id('Barrio', id_barrio)
 
     def actualizar_barrio(self, barrio):
         """
@@ -152,6 +113,7 @@ class BarrioDAO:
 
             cursor.execute(sql, valores)
             conn.commit()
+            get_referencias().invalidar('Barrio')
             print("Barrio actualizado exitosamente.")
             return True
 
@@ -177,6 +139,7 @@ class BarrioDAO:
             
             cursor.execute(sql, (id_barrio,))
             conn.commit()
+            get_referencias().invalidar('Barrio')
 
             if cursor.rowcount > 0:
                 print("Barrio eliminado exitosamente.")
@@ -3,6 +3,7 @@ import sqlite3
 from Backend.BDD.Conexion import get_conexion
 from Backend.Model.Consultorio import Consultorio
 from Backend.DAO.UsuarioDAO import UsuarioDAO
+from Backend.referencias import get_referencias
 
 class ConsultorioDAO:
     """
@@ -19,6 +20,7 @@ class ConsultorioDAO:
             cursor = conn.cursor()
             cursor.execute("INSERT INTO Consultorio (descripcion) VALUES (?)", (consultorio.descripcion,))
             conn.commit()
+            get_referencias().invalidar('Consultorio')
             return cursor.lastrowid, "Consultorio creado exitosamente."
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -36,6 +38,7 @@ class ConsultorioDAO:
             cursor = conn.cursor()
             cursor.execute("UPDATE Consultorio SET descripcion = ? WHERE id_consultorio = ?", (consultorio.descripcion, consultorio.id_consultorio))
             conn.commit()
+            get_referencias().invalidar('Consultorio')
             return cursor.rowcount > 0, ("Consultorio actualizado exitosamente." if cursor.rowcount > 0 else "No se encontró el consultorio.")
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -53,6 +56,7 @@ class ConsultorioDAO:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM Consultorio WHERE id_consultorio = ?", (id_consultorio,))
             conn.commit()
+            get_referencias().invalidar('Consultorio')
             return cursor.rowcount > 0, ("Consultorio eliminado exitosamente." if cursor.rowcount > 0 else "No se encontró el consultorio.")
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -61,30 +65,7 @@ class ConsultorioDAO:
             if conn: conn.close()
 
     def obtener_todos(self):
-        conn = None
-        try:
-            conn = get_conexion()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id_consultorio, descripcion FROM Consultorio ORDER BY id_consultorio")
-            return [Consultorio(id_consultorio=f[0], descripcion=f[1]) for f in cursor.fetchall()]
-        except sqlite3.Error as e:
-            print(f"Error al obtener consultorios: {e}")
-            return []
-        finally:
-            if conn: conn.close()
+        return get_referencias().todos('Consultorio')
 
     def obtener_por_id(self, id_consultorio: int):
-        conn = None
-        try:
-            conn = get_conexion()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id_consultorio, descripcion FROM Consultorio WHERE id_consultorio = ?", (id_consultorio,))
-            fila = cursor.fetchone()
-            if fila:
-                return Consultorio(id_consultorio=fila[0], descripcion=fila[1])
-            return None
-        except sqlite3.Error as e:
-            print(f"Error al obtener consultorio por ID: {e}")
-            return None
-        finally:
-            if conn: conn.close()
\ No newline at end of file
+        return get_referencias().por_id('Consultorio', id_consultorio)
@@ -2,6 +2,8 @@ import sqlite3
 from Backend.BDD.Conexion import get_conexion
 from Backend.Model.Especialidad import Especialidad
 from Backend.DAO.UsuarioDAO import UsuarioDAO
+from Backend.referencias import get_referencias
+from Backend.mapeo import mapear_filas
 
 class EspecialidadDAO:
     """
@@ -34,8 +36,7 @@ class EspecialidadDAO:
             query += " ORDER BY id_especialidad"
 
             cursor.execute(query, params)
-            filas = cursor.fetchall()
-            return [Especialidad(id_especialidad=f[0], nombre=f[1], descripcion=f[2]) for f in filas]
+            return mapear_filas(Especialidad, cursor)
         except sqlite3.Error as e:
             print(f"Error al buscar especialidades: {e}")
             return []
@@ -44,40 +45,12 @@ class EspecialidadDAO:
                 conn.close()
                 
     def obtener_todas_las_especialidades(self):
-        """Devuelve una lista con todas las especialidades registradas."""
-        conn = None
-        try:
-            conn = get_conexion()
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Especialidad ORDER BY nombre")
-            filas = cursor.fetchall()
-            return [Especialidad(id_especialidad=f[0], nombre=f[1], descripcion=f[2]) for f in filas]
-        except sqlite3.Error as e:
-            print(f"Error al obtener todas las especialidades: {e}")
-            return []
-        finally:
-            if conn:
-                conn.close()
-
+        """Devuelve una lista con todas las especialidades registradas, ordenadas por nombre."""
+        return sorted(get_referencias().todos('Especialidad'), key=lambda e: e.nombre)
 
     def buscar_por_nombre_exacto(self, nombre):
-        """Busca una especialidad por su nombre exacto (case-insensitive)."""
-        conn = None
-        try:
-            conn = get_conexion()
-            cursor = conn.cursor()
-            sql = "SELECT * FROM Especialidad WHERE nombre = ?"
-            cursor.execute(sql, (nombre,))
-            fila = cursor.fetchone()
-            if fila:
-                return Especialidad(id_especialidad=fila[0], nombre=fila[1], descripcion=fila[2])
-            return None
-        except sqlite3.Error as e:
-            print(f"Error al buscar especialidad por nombre: {e}")
-            return None
-        finally:
-            if conn:
-                conn.close()
+        """Busca una especialidad por su nombre exacto (desde el caché de referencias)."""
+        return get_referencias().por_nombre('Especialidad', nombre)
 
     def crear_especialidad(self, especialidad, usuario_actual):
         rol = UsuarioDAO().obtener_rol(usuario_actual)
@@ -96,6 +69,7 @@ class EspecialidadDAO:
             valores = (especialidad.nombre, especialidad.descripcion)
             cursor.execute(sql, valores)
             conn.commit()
+            get_referencias().invalidar('Especialidad')
             return cursor.lastrowid, "Especialidad creada exitosamente."
         except sqlite3.Error as e:
             if conn:
@@ -123,6 +97,7 @@ class EspecialidadDAO:
             valores = (especialidad.nombre, especialidad.descripcion, especialidad.id_especialidad)
             cursor.execute(sql, valores)
             conn.commit()
+            get_referencias().invalidar('Especialidad')
             return True, "Especialidad actualizada exitosamente."
         except sqlite3.Error as e:
             if conn:
@@ -134,36 +109,10 @@ class EspecialidadDAO:
                 conn.close()
 
     def get_all(self):
-        conn = None
-        try:
-            conn = get_conexion()
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Especialidad ORDER BY id_especialidad")
-            filas = cursor.fetchall()
-            return [Especialidad(id_especialidad=f[0], nombre=f[1], descripcion=f[2]) for f in filas]
-        except sqlite3.Error as e:
-            print(f"Error al obtener las especialidades: {e}")
-            return []
-        finally:
-            if conn:
-                conn.close()
+        return get_referencias().todos('Especialidad')
 
     def obtener_especialidad_por_id(self, id_especialidad):
-        conn = None
-        try:
-            conn = get_conexion()
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM Especialidad WHERE id_especialidad = ?", (id_especialidad,))
-            fila = cursor.fetchone()
-            if fila:
-                return Especialidad(id_especialidad=fila[0], nombre=fila[1], descripcion=fila[2])
-            return None
-        except sqlite3.Error as e:
-            print(f"Error al obtener la especialidad por ID: {e}")
-            return None
-        finally:
-            if conn:
-                conn.close()
+        return get_referencias().por_id('Especialidad', id_especialidad)
 
     def eliminar_especialidad(self, id_especialidad, usuario_actual):
         rol = UsuarioDAO().obtener_rol(usuario_actual)
@@ -176,6 +125,7 @@ class EspecialidadDAO:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM Especialidad WHERE id_especialidad = ?", (id_especialidad,))
             conn.commit()
+            get_referencias().invalidar('Especialidad')
             if cursor.rowcount > 0:
                 return True, "Especialidad eliminada exitosamente."
             else:
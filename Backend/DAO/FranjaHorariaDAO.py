@@ -3,8 +3,21 @@ import sqlite3
 # Mantenemos el estilo de importación que usa tu proyecto:
 from Backend.BDD.Conexion import get_conexion 
 from Backend.Model.FranjaHoraria import FranjaHoraria 
+from Backend.mapeo import mapear_filas
+from Backend.disponibilidad import get_motor
 from datetime import datetime, time
 
+MENSAJE_FUERA_DE_GRILLA = "La franja debe empezar y terminar en punto o y media (HH:00 o HH:30)."
+
+def _hora_en_grilla(hora):
+    """'HH:MM' (o 'HH:MM:SS') en punto o y media, como los inicios de turno de TurnoDAO."""
+    try:
+        partes = [int(p) for p in str(hora).split(":")]
+    except ValueError:
+        return False
+    return (len(partes) in (2, 3) and 0 <= partes[0] <= 23
+            and partes[1] in (0, 30) and all(p == 0 for p in partes[2:]))
+
 class FranjaHorariaDAO:
 
     def validar_franja_laboral(self, id_medico, dia_semana, inicio, fin):
@@ -42,6 +55,8 @@ class FranjaHorariaDAO:
 
     def insertar(self, franja):
         """Inserta una nueva franja horaria para un médico."""
+        if not (_hora_en_grilla(franja.hora_inicio) and _hora_en_grilla(franja.hora_fin)):
+            return None, MENSAJE_FUERA_DE_GRILLA
         conn = None
         try:
             conn = get_conexion()
@@ -50,6 +65,7 @@ class FranjaHorariaDAO:
             valores = (franja.id_medico, franja.dia_semana, franja.hora_inicio, franja.hora_fin)
             cursor.execute(sql, valores)
             conn.commit()
+            get_motor().invalidar_franjas(franja.id_medico)
             return cursor.lastrowid, "Franja horaria insertada exitosamente."
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -68,10 +84,7 @@ class FranjaHorariaDAO:
             sql = "SELECT * FROM FranjaHoraria WHERE id_medico = ?"
             cursor.execute(sql, (id_medico,))
 
-            for fila in cursor.fetchall():
-                franjas.append(FranjaHoraria(id_franja=fila[0], id_medico=fila[1], 
-                                           dia_semana=fila[2], hora_inicio=fila[3], 
-                                           hora_fin=fila[4]))
+            franjas = mapear_filas(FranjaHoraria, cursor)
             return franjas
         except sqlite3.Error as e:
             print(f"Error al obtener franjas por médico: {e}")
@@ -89,6 +102,7 @@ class FranjaHorariaDAO:
             sql = "DELETE FROM FranjaHoraria WHERE id_franja = ?"
             cursor.execute(sql, (id_franja,))
             conn.commit()
+            get_motor().invalidar_franjas()
             return cursor.rowcount > 0, "Franja horaria eliminada exitosamente." if cursor.rowcount > 0 else "No se encontró la franja horaria."
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -99,6 +113,8 @@ class FranjaHorariaDAO:
 
     def actualizar(self, id_franja, dia_semana, hora_inicio, hora_fin):
         """Actualiza una franja horaria existente."""
+        if not (_hora_en_grilla(hora_inicio) and _hora_en_grilla(hora_fin)):
+            return False, MENSAJE_FUERA_DE_GRILLA
         conn = None
         try:
             conn = get_conexion()
@@ -109,6 +125,7 @@ class FranjaHorariaDAO:
             """
             cursor.execute(sql, (dia_semana, hora_inicio, hora_fin, id_franja))
             conn.commit()
+            get_motor().invalidar_franjas()
             return cursor.rowcount > 0, "Franja horaria actualizada exitosamente." if cursor.rowcount > 0 else "No se encontró la franja horaria."
         except sqlite3.Error as e:
             if conn: conn.rollback()
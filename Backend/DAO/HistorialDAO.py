@@ -2,6 +2,7 @@ import sqlite3
 from datetime import datetime
 from Backend.BDD.Conexion import get_conexion
 from Backend.Model.Historial import Historial
+from Backend.mapeo import mapear_fila
 from Backend.DAO.UsuarioDAO import UsuarioDAO
 
 
@@ -58,14 +59,13 @@ class HistorialDAO:
         Obtiene todo el historial de un paciente, incluyendo el nombre del médico.
         Accesible por el paciente mismo o por médicos.
         """
-        rol = UsuarioDAO().obtener_rol(usuario_actual)
+        sesion = UsuarioDAO().obtener_sesion(usuario_actual)
+        rol = sesion.rol if sesion else None
         
         # Verificar permisos
         if rol == "Paciente":
             # Verificar que el paciente solo pueda ver su propio historial
-            from Backend.DAO.PacienteDAO import PacienteDAO
-            paciente = PacienteDAO().obtener_paciente_por_usuario(usuario_actual)
-            if not paciente or paciente.id_paciente != id_paciente:
+            if sesion.id_paciente is None or sesion.id_paciente != id_paciente:
                 return [], "Permiso denegado. Solo puede consultar su propio historial."
         elif rol not in ["Medico", "Administrador"]:
             return [], "Permiso denegado."
@@ -121,18 +121,7 @@ class HistorialDAO:
                 """,
                 (id_historial,)
             )
-            fila = cursor.fetchone()
-            
-            if fila:
-                return Historial(
-                    id_historial=fila[0],
-                    id_paciente=fila[1],
-                    id_medico=fila[2],
-                    fecha=fila[3],
-                    diagnostico=fila[4],
-                    observaciones=fila[5]
-                )
-            return None
+            return mapear_fila(Historial, cursor, cursor.fetchone())
         except sqlite3.Error as e:
             print(f"Error al obtener entrada de historial: {e}")
             return None
@@ -145,7 +134,8 @@ class HistorialDAO:
         Actualiza una entrada del historial.
         Solo el médico que creó la entrada puede modificarla.
         """
-        rol = UsuarioDAO().obtener_rol(usuario_actual)
+        sesion = UsuarioDAO().obtener_sesion(usuario_actual)
+        rol = sesion.rol if sesion else None
         if rol != "Medico":
             return False, "Permiso denegado. Solo médicos pueden modificar el historial."
 
@@ -155,14 +145,12 @@ class HistorialDAO:
             cursor = conn.cursor()
             
             # Verificar que el médico sea el autor de la entrada
-            from Backend.DAO.MedicoDAO import MedicoDAO
-            medico = MedicoDAO().obtener_medico_por_usuario(usuario_actual)
-            if not medico:
+            if sesion.id_medico is None:
                 return False, "Médico no encontrado."
             
             cursor.execute("SELECT id_medico FROM Historial WHERE id_historial = ?", (historial.id_historial,))
             fila = cursor.fetchone()
-            if not fila or fila[0] != medico.id_medico:
+            if not fila or fila[0] != sesion.id_medico:
                 return False, "Solo puede modificar sus propias entradas de historial."
             
             sql = """
@@ -4,6 +4,12 @@ from Backend.Model.Medico import Medico
 from Backend.Validaciones.validaciones import Validaciones
 from Backend.DAO.UsuarioDAO import UsuarioDAO
 from Backend.DAO.TurnoDAO import TurnoDAO
+from Backend.disponibilidad import get_motor
+from Backend.sesion import nombre_usuario, invalidar_sesiones
+from Backend.cache_entidades import cache_medicos
+from Backend.busqueda import consulta_fts, etiqueta_persona, LIMITE_BUSQUEDA, LIMITE_OPCIONES
+from Backend.paginacion import ConsultaPaginada, TAM_PAGINA, TAM_LOTE
+from Backend.mapeo import mapeador, mapear_fila, mapear_filas
 
 class MedicoDAO:
     """
@@ -40,6 +46,8 @@ class MedicoDAO:
             )
             cursor.execute(sql, valores)
             conn.commit()
+            cache_medicos.invalidar(cursor.lastrowid)
+            invalidar_sesiones(medico.usuario)
             return cursor.lastrowid, "Médico creado exitosamente."
         except sqlite3.IntegrityError as e:
             if "UNIQUE constraint failed: Medico.dni" in str(e):
@@ -101,6 +109,8 @@ class MedicoDAO:
             )
             cursor.execute(sql, valores)
             conn.commit()
+            cache_medicos.invalidar(medico.id_medico)
+            invalidar_sesiones()  # el usuario asociado pudo cambiar
             return True, "Médico actualizado exitosamente."
         except sqlite3.IntegrityError as e:
             return False, f"Error de integridad: {e}"
@@ -136,6 +146,9 @@ class MedicoDAO:
             # 5. Finalmente, eliminar el médico
             cursor.execute("DELETE FROM Medico WHERE id_medico = ?", (id_medico,))
             conn.commit()
+            get_motor().invalidar_medico(id_medico)
+            cache_medicos.invalidar(id_medico)
+            invalidar_sesiones()
             
             if cursor.rowcount > 0:
                 return True, "Médico y toda su información relacionada eliminados exitosamente."
@@ -153,27 +166,45 @@ class MedicoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM Medico ORDER BY apellido, nombre")
-            return [Medico(id_medico=f[0], usuario=f[1], matricula=f[2], nombre=f[3], apellido=f[4],
-                             tipo_dni=f[5], dni=f[6], calle=f[7], numero_calle=f[8], email=f[9],
-                             telefono=f[10], id_especialidad=f[11], id_barrio=f[12]) for f in cursor.fetchall()]
+            return mapear_filas(Medico, cursor)
         except sqlite3.Error as e:
             print(f"Error al obtener todos los médicos: {e}")
             return []
         finally:
             if conn: conn.close()
 
+    COLUMNAS_MEDICO = ('id_medico', 'usuario', 'matricula', 'nombre', 'apellido', 'tipo_dni', 'dni',
+                       'calle', 'numero_calle', 'email', 'telefono', 'id_especialidad', 'id_barrio')
+
+    def _consulta_medicos_completa(self):
+        return ConsultaPaginada("SELECT " + ", ".join(self.COLUMNAS_MEDICO) + " FROM Medico",
+                                columnas=self.COLUMNAS_MEDICO, id_columna='id_medico')
+
+    def obtener_medicos_pagina(self, despues_de_id=None, limite=TAM_PAGINA):
+        """Hasta `limite` médicos ordenados por id, a partir del siguiente a `despues_de_id`."""
+        mapear = mapeador(Medico, self.COLUMNAS_MEDICO)
+        return [mapear(f) for f in self._consulta_medicos_completa().pagina_por_id(despues_de_id, limite)]
+
+    def iter_medicos(self, tam_lote=TAM_LOTE):
+        """Generador de todos los médicos (por id) que lee de a `tam_lote` filas."""
+        mapear = mapeador(Medico, self.COLUMNAS_MEDICO)
+        for f in self._consulta_medicos_completa().iterar(tam_lote):
+            yield mapear(f)
+
     def obtener_medico_por_id(self, id_medico):
+        medico = cache_medicos.obtener(id_medico)
+        if medico:
+            return medico
+        marca = cache_medicos.marca()
         conn = None
         try:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM Medico WHERE id_medico = ?", (id_medico,))
-            fila = cursor.fetchone()
-            if fila:
-                return Medico(id_medico=fila[0], usuario=fila[1], matricula=fila[2], nombre=fila[3],
-                                apellido=fila[4], tipo_dni=fila[5], dni=fila[6], calle=fila[7],
-                                numero_calle=fila[8], email=fila[9], telefono=fila[10], 
-                                id_especialidad=fila[11], id_barrio=fila[12])
+            medico = mapear_fila(Medico, cursor, cursor.fetchone())
+            if medico:
+                cache_medicos.guardar(medico.id_medico, medico, medico.usuario, marca)
+                return medico
             return None
         except sqlite3.Error as e:
             print(f"Error al obtener médico por ID: {e}")
@@ -187,9 +218,7 @@ class MedicoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM Medico WHERE id_especialidad = ?", (id_especialidad,))
-            return [Medico(id_medico=f[0], usuario=f[1], matricula=f[2], nombre=f[3], apellido=f[4],
-                             tipo_dni=f[5], dni=f[6], calle=f[7], numero_calle=f[8], email=f[9],
-                             telefono=f[10], id_especialidad=f[11], id_barrio=f[12]) for f in cursor.fetchall()]
+            return mapear_filas(Medico, cursor)
         except sqlite3.Error as e:
             print(f"Error al obtener médicos por especialidad: {e}")
             return []
@@ -197,17 +226,20 @@ class MedicoDAO:
             if conn: conn.close()
             
     def obtener_medico_por_usuario(self, usuario):
+        usuario = nombre_usuario(usuario)
+        medico = cache_medicos.obtener_por_usuario(usuario)
+        if medico:
+            return medico
+        marca = cache_medicos.marca()
         conn = None
         try:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM Medico WHERE usuario = ?", (usuario,))
-            fila = cursor.fetchone()
-            if fila:
-                return Medico(id_medico=fila[0], usuario=fila[1], matricula=fila[2], nombre=fila[3],
-                                apellido=fila[4], tipo_dni=fila[5], dni=fila[6], calle=fila[7],
-                                numero_calle=fila[8], email=fila[9], telefono=fila[10], 
-                                id_especialidad=fila[11], id_barrio=fila[12])
+            medico = mapear_fila(Medico, cursor, cursor.fetchone())
+            if medico:
+                cache_medicos.guardar(medico.id_medico, medico, medico.usuario, marca)
+                return medico
             return None
         except sqlite3.Error as e:
             print(f"Error al obtener médico por usuario: {e}")
@@ -235,39 +267,118 @@ class MedicoDAO:
         finally:
             if conn: conn.close()
 
-    def buscar_medicos(self, especialidad=None, apellido=None, dni=None):
+    def consulta_medicos_con_especialidad(self):
+        """Listado de médicos con el nombre de su especialidad, para mostrar por páginas."""
+        sql = """
+            SELECT m.id_medico, m.nombre, m.apellido, m.dni, m.matricula,
+                   COALESCE(e.nombre, '') AS especialidad
+            FROM Medico m
+            LEFT JOIN Especialidad e ON m.id_especialidad = e.id_especialidad
+            """
+        return ConsultaPaginada(sql, columnas=('id_medico', 'nombre', 'apellido', 'dni', 'matricula', 'especialidad'),
+                                orden_defecto='apellido')
+
+    SQL_COLUMNAS_BUSQUEDA = """
+            SELECT m.id_medico, m.usuario, m.matricula, m.nombre, m.apellido, m.tipo_dni, m.dni, 
+                   m.calle, m.numero_calle, m.email, m.telefono, m.id_especialidad, m.id_barrio, e.nombre 
+    """
+
+    def buscar_medicos(self, especialidad=None, apellido=None, dni=None, limite=LIMITE_BUSQUEDA):
+        """
+        Busca médicos por apellido/nombre y/o DNI con el índice MedicoFTS (prefijos
+        de palabra, sin distinguir acentos) y opcionalmente por especialidad.
+        Resultados ordenados por relevancia, hasta `limite` filas.
+        """
+        consulta = consulta_fts((apellido, "apellido nombre"), (dni, "dni"))
         conn = None
         try:
             conn = get_conexion()
             cursor = conn.cursor()
-            sql = """
-            SELECT m.id_medico, m.usuario, m.matricula, m.nombre, m.apellido, m.tipo_dni, m.dni, 
-                   m.calle, m.numero_calle, m.email, m.telefono, m.id_especialidad, m.id_barrio, e.nombre 
-            FROM Medico m
+            if consulta is None:
+                return self._buscar_medicos_like(cursor, especialidad, None, None, limite)
+            sql = self.SQL_COLUMNAS_BUSQUEDA + """
+            FROM MedicoFTS f
+            JOIN Medico m ON m.id_medico = f.rowid
             LEFT JOIN Especialidad e ON m.id_especialidad = e.id_especialidad
-            WHERE 1=1
+            WHERE MedicoFTS MATCH ?
             """
-            params = []
+            params = [consulta]
             if especialidad:
                 sql += " AND e.nombre LIKE ?"
                 params.append(f"%{especialidad}%")
-            if apellido:
-                sql += " AND m.apellido LIKE ?"
-                params.append(f"%{apellido}%")
-            if dni:
-                sql += " AND m.dni LIKE ?"
-                params.append(f"%{dni}%")
-            
-            sql += " ORDER BY m.id_medico"
-            
-            cursor.execute(sql, params)
-            return cursor.fetchall()
+            sql += " ORDER BY f.rank, m.apellido, m.nombre LIMIT ?"
+            params.append(limite)
+            try:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+            except sqlite3.OperationalError as e:
+                print(f"Búsqueda FTS no disponible ({e}); se usa LIKE.")
+                return self._buscar_medicos_like(cursor, especialidad, apellido, dni, limite)
         except sqlite3.Error as e:
             print(f"Error al buscar médicos: {e}")
             return []
         finally:
             if conn: conn.close()
 
+    def buscar_opciones(self, texto, id_especialidad=None, limite=LIMITE_OPCIONES):
+        """
+        Pares (id_medico, etiqueta) para los combos de búsqueda: prefijos de
+        apellido, nombre o DNI vía MedicoFTS, opcionalmente de una especialidad.
+        """
+        consulta = consulta_fts((texto, "apellido nombre dni"))
+        filtro_esp = " AND m.id_especialidad = ?" if id_especialidad else ""
+        params_esp = [id_especialidad] if id_especialidad else []
+        conn = None
+        try:
+            conn = get_conexion()
+            cursor = conn.cursor()
+            if consulta is None:
+                cursor.execute("SELECT m.id_medico, m.apellido, m.nombre, m.dni FROM Medico m WHERE 1=1"
+                               + filtro_esp + " ORDER BY m.apellido, m.nombre LIMIT ?", params_esp + [limite])
+            else:
+                try:
+                    cursor.execute("""
+                        SELECT m.id_medico, m.apellido, m.nombre, m.dni
+                        FROM MedicoFTS f JOIN Medico m ON m.id_medico = f.rowid
+                        WHERE MedicoFTS MATCH ?""" + filtro_esp + """
+                        ORDER BY f.rank, m.apellido, m.nombre
+                        LIMIT ?
+                    """, [consulta] + params_esp + [limite])
+                except sqlite3.OperationalError:
+                    patron = f"{texto.strip()}%"
+                    cursor.execute("SELECT m.id_medico, m.apellido, m.nombre, m.dni FROM Medico m "
+                                   "WHERE (m.apellido LIKE ? OR m.nombre LIKE ? OR m.dni LIKE ?)" + filtro_esp
+                                   + " ORDER BY m.apellido, m.nombre LIMIT ?",
+                                   [patron, patron, patron] + params_esp + [limite])
+            return [(f[0], etiqueta_persona(f[1], f[2], f[3])) for f in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error al buscar opciones de médicos: {e}")
+            return []
+        finally:
+            if conn: conn.close()
+
+    def _buscar_medicos_like(self, cursor, especialidad, apellido, dni, limite):
+        """Búsqueda con LIKE: sin texto para FTS o en bases sin el índice FTS5."""
+        sql = self.SQL_COLUMNAS_BUSQUEDA + """
+            FROM Medico m
+            LEFT JOIN Especialidad e ON m.id_especialidad = e.id_especialidad
+            WHERE 1=1
+            """
+        params = []
+        if especialidad:
+            sql += " AND e.nombre LIKE ?"
+            params.append(f"%{especialidad}%")
+        if apellido:
+            sql += " AND m.apellido LIKE ?"
+            params.append(f"%{apellido}%")
+        if dni:
+            sql += " AND m.dni LIKE ?"
+            params.append(f"%{dni}%")
+        sql += " ORDER BY m.id_medico LIMIT ?"
+        params.append(limite)
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
     
     # --- MÉTODO NUEVO (Para el Panel de Reportes) ---
 
@@ -287,15 +398,7 @@ class MedicoDAO:
             """
             
             cursor.execute(sql)
-            
-            for fila in cursor.fetchall():
-                # Usamos el constructor de tu clase Model/Medico.py
-                medicos.append(Medico(
-                    id_medico=fila[0], usuario=fila[1], matricula=fila[2], 
-                    nombre=fila[3], apellido=fila[4], tipo_dni=fila[5], 
-                    dni=fila[6], calle=fila[7], numero_calle=fila[8], 
-                    email=fila[9], telefono=fila[10], id_especialidad=fila[11]
-                ))
+            medicos = mapear_filas(Medico, cursor)
             return medicos
             
         except sqlite3.Error as e:
@@ -1,7 +1,7 @@
 import sqlite3
 from Backend.BDD.Conexion import get_conexion
-from Backend.Model.ObraSocial import ObraSocial
 from Backend.DAO.UsuarioDAO import UsuarioDAO
+from Backend.referencias import get_referencias
 
 class ObraSocialDAO:
     def cargar_obra_social(self, obra_social, usuario_actual):
@@ -16,6 +16,7 @@ class ObraSocialDAO:
             valores = (obra_social.nombre,)
             cursor.execute(sql, valores)
             conn.commit()
+            get_referencias().invalidar('ObraSocial')
             return cursor.lastrowid, "Obra Social creada exitosamente."
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -35,6 +36,7 @@ class ObraSocialDAO:
             valores = (obra_social.nombre, obra_social.id_obra_social)
             cursor.execute(sql, valores)
             conn.commit()
+            get_referencias().invalidar('ObraSocial')
             return True, "Obra Social actualizada exitosamente."
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -53,6 +55,7 @@ class ObraSocialDAO:
             sql = "DELETE FROM ObraSocial WHERE id_obra_social = ?"
             cursor.execute(sql, (id_obra_social,))
             conn.commit()
+            get_referencias().invalidar('ObraSocial')
             if cursor.rowcount > 0:
                 return True, "Obra Social eliminada exitosamente."
             else:
@@ -64,28 +67,11 @@ class ObraSocialDAO:
             if conn: conn.close()
     
     def obtener_obra_social(self):
-        conn = None
-        obras_sociales = []
-        try:
-            conn = get_conexion()
-            cursor = conn.cursor()
-            sql = "SELECT * FROM ObraSocial ORDER BY id_obra_social"
-            cursor.execute(sql)
-            filas = cursor.fetchall()
-            for fila in filas:
-                os = ObraSocial(nombre=fila[1], id_obra_social=fila[0])
-                obras_sociales.append(os)
-            return obras_sociales
-        except sqlite3.Error as e:
-            print(f"Error al obtener todas las Obras Sociales: {e}")
-            return []
-        finally:
-            if conn: conn.close()
+        """Todas las obras sociales ordenadas por id (desde el caché de referencias)."""
+        return get_referencias().todos('ObraSocial')
 
     def buscar_obra_social_por_id(self, id_obra_social):
-        # ... (código existente sin cambios)
-        pass
+        return get_referencias().por_id('ObraSocial', id_obra_social)
 
     def buscar_obra_social_por_nombre(self, nombre):
-        # ... (código existente sin cambios)
-        pass
+        return get_referencias().por_nombre('ObraSocial', nombre)
@@ -3,7 +3,13 @@ from Backend.BDD.Conexion import get_conexion
 from Backend.Model.Paciente import Paciente
 from Backend.Validaciones.validaciones import Validaciones
 from Backend.DAO.UsuarioDAO import UsuarioDAO
-from Backend.DAO.TurnoDAO import TurnoDAO
+from Backend.DAO.TurnoDAO import TurnoDAO, _rango_dias
+from Backend.disponibilidad import get_motor
+from Backend.sesion import nombre_usuario, invalidar_sesiones
+from Backend.cache_entidades import cache_pacientes
+from Backend.busqueda import consulta_fts, etiqueta_persona, LIMITE_BUSQUEDA, LIMITE_OPCIONES
+from Backend.paginacion import ConsultaPaginada, TAM_PAGINA, TAM_LOTE
+from Backend.mapeo import mapeador, mapear_fila, mapear_filas
 
 class PacienteDAO:
     """
@@ -40,6 +46,8 @@ class PacienteDAO:
             )
             cursor.execute(sql, valores)
             conn.commit()
+            cache_pacientes.invalidar(cursor.lastrowid)
+            invalidar_sesiones(paciente.usuario)
             return cursor.lastrowid, "Paciente creado exitosamente."
         except sqlite3.IntegrityError as e:
             if "UNIQUE constraint failed: Paciente.dni" in str(e):
@@ -56,7 +64,7 @@ class PacienteDAO:
 
     def actualizar_paciente(self, paciente, usuario_actual):
         rol = UsuarioDAO().obtener_rol(usuario_actual)
-        if rol == "Paciente" and usuario_actual != paciente.usuario:
+        if rol == "Paciente" and nombre_usuario(usuario_actual) != paciente.usuario:
             return False, "Permiso denegado."
         if rol not in ["Paciente", "Administrador"]:
             return False, "Permiso denegado."
@@ -88,6 +96,8 @@ class PacienteDAO:
             )
             cursor.execute(sql, valores)
             conn.commit()
+            cache_pacientes.invalidar(paciente.id_paciente)
+            invalidar_sesiones()  # el usuario asociado pudo cambiar
             return True, "Paciente actualizado exitosamente."
         except sqlite3.IntegrityError as e:
             return False, "Error de integridad: El DNI o usuario ya existen."
@@ -110,7 +120,7 @@ class PacienteDAO:
                 return False, "El paciente no existe."
             
             usuario_paciente = fila[0]
-            if rol == "Paciente" and usuario_actual != usuario_paciente:
+            if rol == "Paciente" and nombre_usuario(usuario_actual) != usuario_paciente:
                 return False, "No tiene permisos para eliminar a otro paciente."
             if rol not in ["Paciente", "Administrador"]:
                 return False, "Permiso denegado."
@@ -128,6 +138,9 @@ class PacienteDAO:
             # 4. Finalmente, eliminar el paciente
             cursor.execute("DELETE FROM Paciente WHERE id_paciente = ?", (id_paciente,))
             conn.commit()
+            get_motor().invalidar_turnos()
+            cache_pacientes.invalidar(id_paciente)
+            invalidar_sesiones(usuario_paciente)
             return True, "Paciente y toda su información relacionada eliminados exitosamente."
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -141,29 +154,51 @@ class PacienteDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM Paciente ORDER BY apellido, nombre")
-            return [Paciente(id_paciente=f[0], id_barrio=f[1], usuario=f[2], nombre=f[3], apellido=f[4],
-                             fecha_nacimiento=f[5], tipo_dni=f[6], dni=f[7], email=f[8], telefono=f[9],
-                             id_obra_social=f[10], calle=f[11], numero_calle=f[12]) for f in cursor.fetchall()]
+            return mapear_filas(Paciente, cursor)
         except sqlite3.Error as e:
             print(f"Error al obtener todos los pacientes: {e}")
             return []
         finally:
             if conn: conn.close()
 
+    COLUMNAS_PACIENTE = ('id_paciente', 'id_barrio', 'usuario', 'nombre', 'apellido', 'fecha_nacimiento',
+                         'tipo_dni', 'dni', 'email', 'telefono', 'id_obra_social', 'calle', 'numero_calle')
+
+    def _consulta_pacientes_completa(self):
+        return ConsultaPaginada("SELECT " + ", ".join(self.COLUMNAS_PACIENTE) + " FROM Paciente",
+                                columnas=self.COLUMNAS_PACIENTE, id_columna='id_paciente')
+
+    def obtener_pacientes_pagina(self, despues_de_id=None, limite=TAM_PAGINA):
+        """Hasta `limite` pacientes ordenados por id, a partir del siguiente a `despues_de_id`."""
+        mapear = mapeador(Paciente, self.COLUMNAS_PACIENTE)
+        return [mapear(f) for f in self._consulta_pacientes_completa().pagina_por_id(despues_de_id, limite)]
+
+    def iter_pacientes(self, tam_lote=TAM_LOTE):
+        """Generador de todos los pacientes (por id) que lee de a `tam_lote` filas."""
+        mapear = mapeador(Paciente, self.COLUMNAS_PACIENTE)
+        for f in self._consulta_pacientes_completa().iterar(tam_lote):
+            yield mapear(f)
+
+    def consulta_pacientes(self):
+        """Listado de pacientes (id, nombre, apellido, dni) para mostrar por páginas."""
+        return ConsultaPaginada(
+            "SELECT id_paciente, nombre, apellido, dni FROM Paciente",
+            columnas=('id_paciente', 'nombre', 'apellido', 'dni'), orden_defecto='apellido')
+
     def buscar_paciente_por_id_paciente(self, id_paciente):
+        paciente = cache_pacientes.obtener(id_paciente)
+        if paciente:
+            return paciente
+        marca = cache_pacientes.marca()
         conn = None
         try:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM Paciente WHERE id_paciente = ?", (id_paciente,))
-            fila = cursor.fetchone()
-            if fila:
-                return Paciente(
-                    id_paciente=fila[0], id_barrio=fila[1], usuario=fila[2], nombre=fila[3], 
-                    apellido=fila[4], fecha_nacimiento=fila[5], tipo_dni=fila[6], dni=fila[7], 
-                    email=fila[8], telefono=fila[9], id_obra_social=fila[10], calle=fila[11], 
-                    numero_calle=fila[12]
-                )
+            paciente = mapear_fila(Paciente, cursor, cursor.fetchone())
+            if paciente:
+                cache_pacientes.guardar(paciente.id_paciente, paciente, paciente.usuario, marca)
+                return paciente
             return None
         except sqlite3.Error as e:
             print("Error al buscar paciente:", e)
@@ -173,16 +208,20 @@ class PacienteDAO:
                 conn.close()
 
     def obtener_paciente_por_usuario(self, usuario):
+        usuario = nombre_usuario(usuario)
+        paciente = cache_pacientes.obtener_por_usuario(usuario)
+        if paciente:
+            return paciente
+        marca = cache_pacientes.marca()
         conn = None
         try:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM Paciente WHERE usuario = ?", (usuario,))
-            fila = cursor.fetchone()
-            if fila:
-                return Paciente(id_paciente=fila[0], id_barrio=fila[1], usuario=fila[2], nombre=fila[3], apellido=fila[4],
-                                fecha_nacimiento=fila[5], tipo_dni=fila[6], dni=fila[7], email=fila[8], telefono=fila[9],
-                                id_obra_social=fila[10], calle=fila[11], numero_calle=fila[12])
+            paciente = mapear_fila(Paciente, cursor, cursor.fetchone())
+            if paciente:
+                cache_pacientes.guardar(paciente.id_paciente, paciente, paciente.usuario, marca)
+                return paciente
             return None
         except sqlite3.Error as e:
             print(f"Error al obtener paciente por usuario: {e}")
@@ -211,40 +250,126 @@ class PacienteDAO:
         finally:
             if conn: conn.close()
 
-    def buscar_pacientes(self, apellido=None, dni=None):
+    SQL_COLUMNAS_BUSQUEDA = """
+            SELECT p.id_paciente, p.usuario, p.nombre, p.apellido, p.tipo_dni, p.dni, 
+                   p.fecha_nacimiento, o.nombre, b.nombre, p.calle, p.numero_calle, p.email, p.telefono
+    """
+
+    def buscar_pacientes(self, apellido=None, dni=None, limite=LIMITE_BUSQUEDA):
+        """
+        Busca pacientes por apellido/nombre y/o DNI con el índice PacienteFTS: cada
+        palabra se busca como prefijo y sin distinguir acentos. Los resultados vienen
+        ordenados por relevancia (y apellido, nombre), hasta `limite` filas.
+        Sin filtros devuelve los primeros `limite` pacientes por apellido.
+        """
+        consulta = consulta_fts((apellido, "apellido nombre"), (dni, "dni"))
         conn = None
         try:
             conn = get_conexion()
             cursor = conn.cursor()
-            sql = """
-            SELECT p.id_paciente, p.usuario, p.nombre, p.apellido, p.tipo_dni, p.dni, 
-                   p.fecha_nacimiento, o.nombre, b.nombre, p.calle, p.numero_calle, p.email, p.telefono
-            FROM Paciente p
-            LEFT JOIN ObraSocial o ON p.id_obra_social = o.id_obra_social
-            LEFT JOIN Barrio b ON p.id_barrio = b.id_barrio
-            WHERE 1=1
-            """
-            params = []
-            if apellido:
-                sql += " AND p.apellido LIKE ?"
-                params.append(f"%{apellido}%")
-            if dni:
-                sql += " AND p.dni LIKE ?"
-                params.append(f"%{dni}%")
-            
-            sql += " ORDER BY p.apellido, p.nombre"
-            
-            cursor.execute(sql, params)
-            return cursor.fetchall()
+            if consulta is None:
+                cursor.execute(self.SQL_COLUMNAS_BUSQUEDA + """
+                FROM Paciente p
+                LEFT JOIN ObraSocial o ON p.id_obra_social = o.id_obra_social
+                LEFT JOIN Barrio b ON p.id_barrio = b.id_barrio
+                ORDER BY p.apellido, p.nombre
+                LIMIT ?
+                """, (limite,))
+                return cursor.fetchall()
+            try:
+                cursor.execute(self.SQL_COLUMNAS_BUSQUEDA + """
+                FROM PacienteFTS f
+                JOIN Paciente p ON p.id_paciente = f.rowid
+                LEFT JOIN ObraSocial o ON p.id_obra_social = o.id_obra_social
+                LEFT JOIN Barrio b ON p.id_barrio = b.id_barrio
+                WHERE PacienteFTS MATCH ?
+                ORDER BY f.rank, p.apellido, p.nombre
+                LIMIT ?
+                """, (consulta, limite))
+                return cursor.fetchall()
+            except sqlite3.OperationalError as e:
+                print(f"Búsqueda FTS no disponible ({e}); se usa LIKE.")
+                return self._buscar_pacientes_like(cursor, apellido, dni, limite)
         except sqlite3.Error as e:
             print(f"Error al buscar pacientes: {e}")
             return []
         finally:
             if conn: conn.close()
 
+    def buscar_opciones(self, texto, limite=LIMITE_OPCIONES):
+        """
+        Pares (id_paciente, etiqueta) para los combos de búsqueda: prefijos de
+        apellido, nombre o DNI vía PacienteFTS, hasta `limite` resultados.
+        Sin texto devuelve los primeros pacientes por apellido.
+        """
+        consulta = consulta_fts((texto, "apellido nombre dni"))
+        conn = None
+        try:
+            conn = get_conexion()
+            cursor = conn.cursor()
+            if consulta is None:
+                cursor.execute("SELECT id_paciente, apellido, nombre, dni FROM Paciente "
+                               "ORDER BY apellido, nombre LIMIT ?", (limite,))
+            else:
+                try:
+                    cursor.execute("""
+                        SELECT p.id_paciente, p.apellido, p.nombre, p.dni
+                        FROM PacienteFTS f JOIN Paciente p ON p.id_paciente = f.rowid
+                        WHERE PacienteFTS MATCH ?
+                        ORDER BY f.rank, p.apellido, p.nombre
+                        LIMIT ?
+                    """, (consulta, limite))
+                except sqlite3.OperationalError:
+                    patron = f"{texto.strip()}%"
+                    cursor.execute("SELECT id_paciente, apellido, nombre, dni FROM Paciente "
+                                   "WHERE apellido LIKE ? OR nombre LIKE ? OR dni LIKE ? "
+                                   "ORDER BY apellido, nombre LIMIT ?", (patron, patron, patron, limite))
+            return [(f[0], etiqueta_persona(f[1], f[2], f[3])) for f in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error al buscar opciones de pacientes: {e}")
+            return []
+        finally:
+            if conn: conn.close()
+
+    def _buscar_pacientes_like(self, cursor, apellido, dni, limite):
+        """Búsqueda anterior con LIKE, para bases sin el índice FTS5."""
+        sql = self.SQL_COLUMNAS_BUSQUEDA + """
+            FROM Paciente p
+            LEFT JOIN ObraSocial o ON p.id_obra_social = o.id_obra_social
+            LEFT JOIN Barrio b ON p.id_barrio = b.id_barrio
+            WHERE 1=1
+            """
+        params = []
+        if apellido:
+            sql += " AND p.apellido LIKE ?"
+            params.append(f"%{apellido}%")
+        if dni:
+            sql += " AND p.dni LIKE ?"
+            params.append(f"%{dni}%")
+        sql += " ORDER BY p.apellido, p.nombre LIMIT ?"
+        params.append(limite)
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
 
     # --- MÉTODOS DE REPORTES ---
 
+    def consulta_pacientes_atendidos(self, fecha_inicio, fecha_fin):
+        """
+        Reporte 3 como ConsultaPaginada: pacientes que asistieron a algún turno
+        en el rango de fechas (EXISTS en lugar de DISTINCT, así no se repiten).
+        """
+        sql = """
+            SELECT P.id_paciente, P.nombre, P.apellido, P.dni, P.email
+            FROM Paciente AS P
+            WHERE EXISTS (SELECT 1 FROM Turno AS T
+                          WHERE T.id_paciente = P.id_paciente AND T.asistio = 1
+                            AND T.fecha_hora >= ? AND T.fecha_hora < ?)
+            """
+        return ConsultaPaginada(sql, _rango_dias(fecha_inicio, fecha_fin),
+                                columnas=('id_paciente', 'nombre', 'apellido', 'dni', 'email'),
+                                orden_defecto='apellido')
+
     def reporte_pacientes_atendidos_por_fecha(self, fecha_inicio, fecha_fin):
         """
         Reporte 3: Pacientes únicos que asistieron (asistio = 1) 
@@ -261,13 +386,11 @@ class PacienteDAO:
             FROM Paciente AS P
             JOIN Turno AS T ON P.id_paciente = T.id_paciente
             WHERE T.asistio = 1 
-              AND DATE(T.fecha_hora) BETWEEN ? AND ?
+              AND T.fecha_hora >= ? AND T.fecha_hora < ?
             ORDER BY P.apellido, P.nombre
             """
-            cursor.execute(sql, (fecha_inicio, fecha_fin))
-            for fila in cursor.fetchall():
-                # (Ajustá esto si tu constructor de Paciente es diferente)
-                pacientes.append(Paciente(id_paciente=fila[0], nombre=fila[1], apellido=fila[2], dni=fila[3], email=fila[4]))
+            cursor.execute(sql, _rango_dias(fecha_inicio, fecha_fin))
+            pacientes = mapear_filas(Paciente, cursor)
             return pacientes
         except sqlite3.Error as e:
             print(f"Error en reporte de pacientes atendidos: {e}")
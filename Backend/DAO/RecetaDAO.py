@@ -4,12 +4,18 @@ from Backend.BDD.Conexion import get_conexion
 from Backend.Model.Receta import Receta
 from Backend.Validaciones.validaciones import Validaciones
 from Backend.DAO.UsuarioDAO import UsuarioDAO
+from Backend.sesion import nombre_usuario
+from Backend.paginacion import ConsultaPaginada, TAM_PAGINA, TAM_LOTE
+from Backend.mapeo import mapeador, mapear_fila, mapear_filas
 
 class RecetaDAO:
     """
     Gestiona las operaciones CRUD en la tabla Receta.
     """
 
+    # La columna `estado` de la tabla se guarda en el atributo `id_estado` del modelo
+    ALIAS_RECETA = {'estado': 'id_estado'}
+
     def crear_receta(self, receta, usuario_actual):
         """
         Inserta un nuevo objeto Receta en la base de datos.
@@ -87,17 +93,7 @@ class RecetaDAO:
             cursor.execute(sql)
             filas = cursor.fetchall()
 
-            for fila in filas:
-                # Columns: id_receta, id_paciente, id_medico, id_turno, estado, fecha, descripcion
-                receta = Receta(
-                    id_receta=fila[0],
-                    id_paciente=fila[1],
-                    id_medico=fila[2],
-                    id_estado=fila[4],
-                    fecha=fila[5],
-                    descripcion=fila[6]
-                )
-                recetas.append(receta)
+            recetas = mapear_filas(Receta, cursor, filas, alias=self.ALIAS_RECETA)
 
             return recetas
 
@@ -108,6 +104,30 @@ class RecetaDAO:
             if conn:
                 conn.close()
 
+    COLUMNAS_RECETA = ('id_receta', 'id_paciente', 'id_medico', 'estado', 'fecha', 'descripcion')
+
+    def consulta_recetas(self):
+        """Todas las recetas como ConsultaPaginada (por páginas o en lotes)."""
+        return ConsultaPaginada("SELECT " + ", ".join(self.COLUMNAS_RECETA) + " FROM Receta",
+                                columnas=self.COLUMNAS_RECETA, id_columna='id_receta')
+
+    def obtener_recetas_pagina(self, despues_de_id=None, limite=TAM_PAGINA):
+        """
+        Hasta `limite` recetas ordenadas por id, a partir de la siguiente a
+        `despues_de_id` (None = desde el principio).
+        """
+        mapear = mapeador(Receta, self.COLUMNAS_RECETA, self.ALIAS_RECETA)
+        return [mapear(f) for f in self.consulta_recetas().pagina_por_id(despues_de_id, limite)]
+
+    def iter_recetas(self, tam_lote=TAM_LOTE):
+        """
+        Generador de todas las recetas (por id) que lee de a `tam_lote` filas,
+        para recorrer la tabla completa sin cargarla en memoria.
+        """
+        mapear = mapeador(Receta, self.COLUMNAS_RECETA, self.ALIAS_RECETA)
+        for fila in self.consulta_recetas().iterar(tam_lote):
+            yield mapear(fila)
+
     def obtener_recetas_por_paciente(self, id_paciente):
         """
         Retorna una lista de recetas para un paciente específico.
@@ -122,16 +142,7 @@ class RecetaDAO:
             cursor.execute(sql, (id_paciente,))
             filas = cursor.fetchall()
 
-            for fila in filas:
-                receta = Receta(
-                    id_receta=fila[0],
-                    id_paciente=fila[1],
-                    id_medico=fila[2],
-                    id_estado=fila[4],
-                    fecha=fila[5],
-                    descripcion=fila[6]
-                )
-                recetas.append(receta)
+            recetas = mapear_filas(Receta, cursor, filas, alias=self.ALIAS_RECETA)
 
             return recetas
 
@@ -195,7 +206,7 @@ class RecetaDAO:
         finally:
             if conn:
                 conn.close()
-        if rol == "Medico" and usuario_actual != usuario_medico:
+        if rol == "Medico" and nombre_usuario(usuario_actual) != usuario_medico:
             print("Permiso denegado: solo el propio médico que emitió la receta puede actualizarla.")
             return False
         if rol not in ["Medico", "Administrador"]:
@@ -275,15 +286,7 @@ class RecetaDAO:
             fila = cursor.fetchone()
 
             if fila:
-                receta = Receta(
-                    id_receta=fila[0],
-                    id_paciente=fila[1],
-                    id_medico=fila[2],
-                    id_estado=fila[4],
-                    fecha=fila[5],
-                    descripcion=fila[6]
-                )
-                return receta
+                return mapear_fila(Receta, cursor, fila, alias=self.ALIAS_RECETA)
             else:
                 print("No se encontró la receta con el ID proporcionado.")
                 return None
@@ -359,16 +362,7 @@ class RecetaDAO:
             cursor.execute(sql, (id_medico,))
             filas = cursor.fetchall()
 
-            for fila in filas:
-                receta = Receta(
-                    id_receta=fila[0],
-                    id_paciente=fila[1],
-                    id_medico=fila[2],
-                    id_estado=fila[4],
-                    fecha=fila[5],
-                    descripcion=fila[6]
-                )
-                recetas.append(receta)
+            recetas = mapear_filas(Receta, cursor, filas, alias=self.ALIAS_RECETA)
 
             return recetas
 
@@ -393,16 +387,7 @@ class RecetaDAO:
             cursor.execute(sql, (fecha,))
             filas = cursor.fetchall()
 
-            for fila in filas:
-                receta = Receta(
-                    id_receta=fila[0],
-                    id_paciente=fila[1],
-                    id_medico=fila[2],
-                    id_estado=fila[4],
-                    fecha=fila[5],
-                    descripcion=fila[6]
-                )
-                recetas.append(receta)
+            recetas = mapear_filas(Receta, cursor, filas, alias=self.ALIAS_RECETA)
 
             return recetas
 
@@ -3,8 +3,13 @@ import random
 
 from Backend.BDD.Conexion import get_conexion
 from Backend.Model.Turno import Turno
+from Backend.Model.Consultorio import Consultorio
 from Backend.DAO.UsuarioDAO import UsuarioDAO
 from Backend.DAO.FranjaHorariaDAO import FranjaHorariaDAO
+from Backend.disponibilidad import get_motor
+from Backend.paginacion import ConsultaPaginada, TAM_PAGINA, TAM_LOTE
+from Backend.mapeo import mapeador, mapear_fila, mapear_filas
+from Backend.cache_reportes import reporte_cacheado
 import calendar
 from datetime import datetime, timedelta
 
@@ -24,6 +29,77 @@ def _add_one_month(dt_date):
     from datetime import date
     return date(year, month, day)
 
+DURACION_TURNO = timedelta(minutes=30)
+
+def _rango_dias(fecha_inicio, fecha_fin=None):
+    """Devuelve el rango semiabierto [desde, hasta) de fecha_hora que cubre los días dados.
+    Filtrar con `fecha_hora >= ? AND fecha_hora < ?` permite usar los índices de Turno,
+    a diferencia de DATE(fecha_hora), que obliga a recorrer toda la tabla."""
+    desde = str(fecha_inicio)[:10]
+    try:
+        ultimo = datetime.strptime(str(fecha_fin if fecha_fin is not None else fecha_inicio)[:10], "%Y-%m-%d")
+    except ValueError:
+        print("Formato de fecha inválido. Use YYYY-MM-DD.")
+        return desde, desde
+    return desde, (ultimo + timedelta(days=1)).strftime("%Y-%m-%d")
+
+def _parse_fecha_hora(valor):
+    """Convierte 'YYYY-MM-DD HH:MM[:SS]' (o un datetime) a datetime. Retorna None si es inválido."""
+    if isinstance(valor, datetime):
+        return valor
+    for formato in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M"):
+        try:
+            return datetime.strptime(str(valor), formato)
+        except ValueError:
+            pass
+    return None
+
+def _rango_solapamiento(inicio, fin):
+    """Límites para buscar turnos (de 30 min) que se solapan con [inicio, fin):
+    un turno se solapa si `fecha_hora > inicio - 30 min AND fecha_hora < fin`."""
+    return (inicio - DURACION_TURNO).strftime("%Y-%m-%d %H:%M:%S"), fin.strftime("%Y-%m-%d %H:%M:%S")
+
+def _en_grilla(inicio):
+    """Los turnos empiezan en punto o y media (HH:00 o HH:30)."""
+    return inicio.minute % 30 == 0 and inicio.second == 0
+
+def _clave_slot(inicio):
+    """Número de slot de 30 minutos de un turno (igual que la migración: segundos Unix / 1800)."""
+    return calendar.timegm(inicio.timetuple()) // 1800
+
+def _conflicto_de_slot(error):
+    """Traduce el IntegrityError de los índices únicos de slot a 'paciente', 'medico' o 'consultorio'."""
+    texto = str(error)
+    for columna, motivo in (("Turno.id_paciente", "paciente"), ("Turno.id_medico", "medico"), ("Turno.id_consultorio", "consultorio")):
+        if columna in texto and "clave_slot" in texto:
+            return motivo
+    return None
+
+MENSAJE_FUERA_DE_GRILLA = "El turno debe comenzar en punto o y media (HH:00 o HH:30)."
+
+def _encolar_notificacion(encolar):
+    """Ejecuta `encolar(modulo_notifications)` sin que un problema con los avisos impida la operación.
+    Retorna el módulo (para despertar al despachador después del commit) o None."""
+    try:
+        import Backend.notifications as notifications
+    except Exception:
+        # Si no se puede importar el módulo de notificaciones, ignoramos
+        return None
+    try:
+        encolar(notifications)
+        return notifications
+    except Exception as e:
+        print(f"Advertencia: no se pudo encolar el email del turno: {e}")
+        return None
+
+def _avisar_recordatorios(id_turno, fecha_hora=None):
+    """Avisa al planificador de recordatorios que un turno se creó, movió o canceló."""
+    try:
+        import Backend.notifications as notifications
+        notifications.recordatorios_turno_cambiado(id_turno, fecha_hora)
+    except Exception as e:
+        print(f"Advertencia: no se pudo actualizar el planificador de recordatorios: {e}")
+
 class TurnoDAO:
     """
     DAO para la entidad Turno.
@@ -50,6 +126,9 @@ class TurnoDAO:
             except ValueError:
                 return None, "Formato de fecha_hora inválido."
 
+        if not _en_grilla(inicio):
+            return None, MENSAJE_FUERA_DE_GRILLA
+
         # Validación: no permitir turnos con fecha mayor a 1 mes desde hoy
         hoy = datetime.now().date()
         fecha_max = _add_one_month(hoy)
@@ -72,54 +151,41 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
 
-            sql_paciente = "SELECT id_turno FROM Turno WHERE id_paciente = ? AND datetime(fecha_hora) < ? AND datetime(fecha_hora, '+30 minutes') > ?"
-            cursor.execute(sql_paciente, (turno.id_paciente, fin.strftime("%Y-%m-%d %H:%M:%S"), inicio.strftime("%Y-%m-%d %H:%M:%S")))
-            if cursor.fetchone():
-                return None, "El paciente ya tiene un turno asignado ese día y horario."
-
-            sql_medico = "SELECT id_turno FROM Turno WHERE id_medico = ? AND datetime(fecha_hora) < ? AND datetime(fecha_hora, '+30 minutes') > ?"
-            cursor.execute(sql_medico, (turno.id_medico, fin.strftime("%Y-%m-%d %H:%M:%S"), inicio.strftime("%Y-%m-%d %H:%M:%S")))
-            if cursor.fetchone():
-                return None, "El médico ya tiene un turno en ese horario."
+            # Tomar el lock de escritura antes de leer: la elección del consultorio y el
+            # INSERT ven el mismo estado y una reserva concurrente espera su turno.
+            cursor.execute("BEGIN IMMEDIATE")
 
             # Asignación aleatoria de consultorio según disponibilidad si no se indicó
             if turno.id_consultorio is None:
-                # Obtener consultorios disponibles para ese horario
-                cursor.execute("SELECT id_consultorio FROM Consultorio")
-                todos_cons = [row[0] for row in cursor.fetchall()]
-                disponibles = []
-                for cid in todos_cons:
-                    cursor.execute(
-                        "SELECT 1 FROM Turno WHERE id_consultorio = ? AND datetime(fecha_hora) < ? AND datetime(fecha_hora, '+30 minutes') > ?",
-                        (cid, fin.strftime("%Y-%m-%d %H:%M:%S"), inicio.strftime("%Y-%m-%d %H:%M:%S"))
-                    )
-                    if cursor.fetchone() is None:
-                        disponibles.append(cid)
+                disponibles = [c.id_consultorio for c in self._consultorios_libres(cursor, inicio, fin)]
                 if not disponibles:
+                    conn.rollback()
                     return None, "No hay consultorios disponibles en ese horario."
                 turno.id_consultorio = random.choice(disponibles)
-            else:
-                # Evitar doble asignación del consultorio en el mismo horario
-                sql_cons = "SELECT id_turno FROM Turno WHERE id_consultorio = ? AND datetime(fecha_hora) < ? AND datetime(fecha_hora, '+30 minutes') > ?"
-                cursor.execute(sql_cons, (turno.id_consultorio, fin.strftime("%Y-%m-%d %H:%M:%S"), inicio.strftime("%Y-%m-%d %H:%M:%S")))
-                if cursor.fetchone():
-                    return None, "El consultorio ya está asignado en ese horario."
-
-            sql = "INSERT INTO Turno (id_paciente, id_medico, id_consultorio, fecha_hora, motivo) VALUES (?, ?, ?, ?, ?)"
-            valores = (turno.id_paciente, turno.id_medico, turno.id_consultorio, inicio.strftime("%Y-%m-%d %H:%M:%S"), turno.motivo)
-            cursor.execute(sql, valores)
-            conn.commit()
-            new_id = cursor.lastrowid
-            # Notificar al paciente (no bloquear la creación si falla el email)
+
+            # Los índices únicos (médico|paciente|consultorio, clave_slot) rechazan el doble turno
+            sql = "INSERT INTO Turno (id_paciente, id_medico, id_consultorio, fecha_hora, motivo, clave_slot) VALUES (?, ?, ?, ?, ?, ?)"
+            valores = (turno.id_paciente, turno.id_medico, turno.id_consultorio, inicio.strftime("%Y-%m-%d %H:%M:%S"), turno.motivo, _clave_slot(inicio))
             try:
-                import Backend.notifications as notifications
-                try:
-                    notifications.send_turno_created(new_id)
-                except Exception as e:
-                    print(f"Advertencia: no se pudo enviar email de creación de turno: {e}")
-            except Exception:
-                # Si no se puede importar el módulo de notificaciones, ignoramos
-                pass
+                cursor.execute(sql, valores)
+            except sqlite3.IntegrityError as e:
+                conn.rollback()
+                motivo = _conflicto_de_slot(e)
+                if motivo is None:
+                    raise
+                return None, {
+                    'paciente': "El paciente ya tiene un turno asignado ese día y horario.",
+                    'medico': "El médico ya tiene un turno en ese horario.",
+                    'consultorio': "El consultorio ya está asignado en ese horario.",
+                }[motivo]
+            new_id = cursor.lastrowid
+            # El aviso al paciente queda en el outbox dentro de la misma transacción
+            notifications = _encolar_notificacion(lambda n: n.encolar_turnos_creados(cursor, [new_id]))
+            conn.commit()
+            get_motor().registrar_turno(turno.id_medico, valores[3])
+            if notifications:
+                notifications.despertar_despachador()
+            _avisar_recordatorios(new_id, valores[3])
             return new_id, "Turno creado exitosamente."
 
         except sqlite3.Error as e:
@@ -128,6 +194,188 @@ class TurnoDAO:
         finally:
             if conn: conn.close()
 
+    def crear_turnos_bulk(self, turnos, usuario_actual):
+        """
+        Crea muchos turnos de una vez (carga de agendas, reprogramaciones).
+        Valida todo el lote en memoria contra una única foto de franjas y turnos tomada
+        dentro de la transacción, inserta con executemany y encola los avisos por email.
+        Retorna una lista de tuplas (id_creado o None, mensaje), una por turno y en el mismo orden.
+        """
+        turnos = list(turnos)
+        if not turnos:
+            return []
+
+        rol = UsuarioDAO().obtener_rol(usuario_actual)
+        if rol not in ["Administrador", "Paciente"]:
+            return [(None, "Permiso denegado.")] * len(turnos)
+
+        resultados = [None] * len(turnos)
+        candidatos = []  # (indice, turno, inicio)
+        hoy = datetime.now().date()
+        fecha_max = _add_one_month(hoy)
+        for i, turno in enumerate(turnos):
+            if not all([turno, getattr(turno, 'id_paciente', None), getattr(turno, 'id_medico', None), getattr(turno, 'fecha_hora', None)]):
+                resultados[i] = (None, "Falta información requerida para crear el turno.")
+                continue
+            inicio = _parse_fecha_hora(turno.fecha_hora)
+            if inicio is None:
+                resultados[i] = (None, "Formato de fecha_hora inválido.")
+            elif not _en_grilla(inicio):
+                resultados[i] = (None, MENSAJE_FUERA_DE_GRILLA)
+            elif inicio.date() > fecha_max:
+                resultados[i] = (None, f"No se puede reservar un turno con más de un mes de anticipación. Fecha máxima permitida: {fecha_max.strftime('%Y-%m-%d')}")
+            else:
+                candidatos.append((i, turno, inicio))
+        if not candidatos:
+            return resultados
+
+        ids_medicos = sorted({t.id_medico for _, t, _ in candidatos})
+        marcas = ",".join("?" * len(ids_medicos))
+        desde, hasta = _rango_dias(min(c[2] for c in candidatos).strftime("%Y-%m-%d"),
+                                   max(c[2] for c in candidatos).strftime("%Y-%m-%d"))
+
+        conn = None
+        try:
+            conn = get_conexion()
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+
+            # Foto de franjas, consultorios y slots ocupados en la ventana del lote
+            cursor.execute(f"SELECT id_medico, dia_semana, hora_inicio, hora_fin FROM FranjaHoraria WHERE id_medico IN ({marcas})", ids_medicos)
+            franjas = {}
+            for id_medico, dia_semana, hora_inicio, hora_fin in cursor.fetchall():
+                franjas.setdefault((id_medico, dia_semana), []).append((hora_inicio, hora_fin))
+
+            cursor.execute("SELECT id_consultorio FROM Consultorio ORDER BY id_consultorio")
+            consultorios = [fila[0] for fila in cursor.fetchall()]
+
+            # Un paciente, médico o consultorio inexistente haría fallar la clave
+            # foránea de todo el executemany: se rechaza solo ese ítem
+            ids_pacientes = sorted({t.id_paciente for _, t, _ in candidatos})
+            cursor.execute(f"SELECT id_paciente FROM Paciente WHERE id_paciente IN ({','.join('?' * len(ids_pacientes))})", ids_pacientes)
+            pacientes = {fila[0] for fila in cursor.fetchall()}
+            cursor.execute(f"SELECT id_medico FROM Medico WHERE id_medico IN ({marcas})", ids_medicos)
+            medicos = {fila[0] for fila in cursor.fetchall()}
+
+            cursor.execute("SELECT id_medico, id_paciente, id_consultorio, clave_slot FROM Turno "
+                           "WHERE fecha_hora >= ? AND fecha_hora < ? AND clave_slot IS NOT NULL", (desde, hasta))
+            ocupados_medico, ocupados_paciente, ocupados_consultorio = set(), set(), set()
+            for id_medico, id_paciente, id_consultorio, slot in cursor.fetchall():
+                ocupados_medico.add((id_medico, slot))
+                ocupados_paciente.add((id_paciente, slot))
+                if id_consultorio is not None:
+                    ocupados_consultorio.add((id_consultorio, slot))
+
+            filas = []
+            aceptados = []  # (indice, turno, fecha_hora, slot)
+            for i, turno, inicio in candidatos:
+                slot = _clave_slot(inicio)
+                hora_inicio = inicio.strftime("%H:%M")
+                hora_fin = (inicio + DURACION_TURNO).strftime("%H:%M")
+                if turno.id_paciente not in pacientes:
+                    resultados[i] = (None, "El paciente indicado no existe.")
+                    continue
+                if turno.id_medico not in medicos:
+                    resultados[i] = (None, "El médico indicado no existe.")
+                    continue
+                if not any(f_ini <= hora_inicio and f_fin >= hora_fin for f_ini, f_fin in franjas.get((turno.id_medico, inicio.weekday() + 1), [])):
+                    resultados[i] = (None, "El médico no trabaja en ese horario o la hora solicitada está fuera de su franja laboral.")
+                    continue
+                if (turno.id_paciente, slot) in ocupados_paciente:
+                    resultados[i] = (None, "El paciente ya tiene un turno asignado ese día y horario.")
+                    continue
+                if (turno.id_medico, slot) in ocupados_medico:
+                    resultados[i] = (None, "El médico ya tiene un turno en ese horario.")
+                    continue
+                id_consultorio = turno.id_consultorio
+                if id_consultorio is None:
+                    disponibles = [c for c in consultorios if (c, slot) not in ocupados_consultorio]
+                    if not disponibles:
+                        resultados[i] = (None, "No hay consultorios disponibles en ese horario.")
+                        continue
+                    id_consultorio = random.choice(disponibles)
+                elif id_consultorio not in consultorios:
+                    resultados[i] = (None, "El consultorio indicado no existe.")
+                    continue
+                elif (id_consultorio, slot) in ocupados_consultorio:
+                    resultados[i] = (None, "El consultorio ya está asignado en ese horario.")
+                    continue
+
+                # Lo aceptado ocupa el slot para el resto del lote
+                ocupados_paciente.add((turno.id_paciente, slot))
+                ocupados_medico.add((turno.id_medico, slot))
+                ocupados_consultorio.add((id_consultorio, slot))
+                turno.id_consultorio = id_consultorio
+                fecha_hora = inicio.strftime("%Y-%m-%d %H:%M:%S")
+                filas.append((turno.id_paciente, turno.id_medico, id_consultorio, fecha_hora, turno.motivo, slot))
+                aceptados.append((i, turno, fecha_hora, slot))
+
+            if not filas:
+                conn.rollback()
+                return resultados
+
+            cursor.executemany("INSERT INTO Turno (id_paciente, id_medico, id_consultorio, fecha_hora, motivo, clave_slot) VALUES (?, ?, ?, ?, ?, ?)", filas)
+
+            # Recuperar los ids generados con una sola consulta, por (médico, slot)
+            cursor.execute(f"SELECT id_turno, id_medico, clave_slot FROM Turno WHERE id_medico IN ({marcas}) AND fecha_hora >= ? AND fecha_hora < ?",
+                           (*ids_medicos, desde, hasta))
+            ids = {(fila[1], fila[2]): fila[0] for fila in cursor.fetchall()}
+            creados = [ids.get((turno.id_medico, slot)) for _, turno, _, slot in aceptados]
+            notifications = _encolar_notificacion(lambda n: n.encolar_turnos_creados(cursor, creados))
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn: conn.rollback()
+            for i, _, _ in candidatos:
+                if resultados[i] is None:
+                    resultados[i] = (None, f"Error al crear el turno: {e}")
+            return resultados
+        finally:
+            if conn: conn.close()
+
+        motor = get_motor()
+        for i, turno, fecha_hora, slot in aceptados:
+            resultados[i] = (ids.get((turno.id_medico, slot)), "Turno creado exitosamente.")
+            motor.registrar_turno(turno.id_medico, fecha_hora)
+            _avisar_recordatorios(resultados[i][0], fecha_hora)
+        if notifications:
+            notifications.despertar_despachador()
+        return resultados
+
+    def _consultorios_libres(self, cursor, inicio, fin):
+        """Consultorios sin turnos que se solapen con [inicio, fin), en una sola consulta."""
+        sql = """
+        SELECT C.id_consultorio, C.descripcion
+        FROM Consultorio C
+        WHERE NOT EXISTS (
+            SELECT 1 FROM Turno T
+            WHERE T.id_consultorio = C.id_consultorio
+              AND T.fecha_hora > ? AND T.fecha_hora < ?
+        )
+        ORDER BY C.id_consultorio
+        """
+        cursor.execute(sql, _rango_solapamiento(inicio, fin))
+        return [Consultorio(id_consultorio=f[0], descripcion=f[1]) for f in cursor.fetchall()]
+
+    def consultorios_libres(self, inicio, fin=None):
+        """
+        Retorna la lista de consultorios (objetos Consultorio) libres entre inicio y fin.
+        inicio/fin aceptan datetime o 'YYYY-MM-DD HH:MM[:SS]'; si fin es None se usa un turno de 30 minutos.
+        """
+        inicio = _parse_fecha_hora(inicio)
+        fin = _parse_fecha_hora(fin) if fin is not None else (inicio + DURACION_TURNO if inicio else None)
+        if inicio is None or fin is None:
+            print("Formato de fecha_hora inválido.")
+            return []
+        conn = None
+        try:
+            conn = get_conexion()
+            return self._consultorios_libres(conn.cursor(), inicio, fin)
+        except sqlite3.Error as e:
+            print(f"Error al obtener consultorios libres: {e}")
+            return []
+        finally:
+            if conn: conn.close()
+
     def obtener_todos_los_turnos(self): 
         conn = None
         turnos = []
@@ -135,8 +383,7 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno")
-            for fila in cursor.fetchall():
-                turnos.append(Turno(id_turno=fila[0], id_paciente=fila[1], id_medico=fila[2], id_consultorio=fila[3], fecha_hora=fila[4], motivo=fila[5], asistio=fila[6]))
+            turnos = mapear_filas(Turno, cursor)
             return turnos
         except sqlite3.Error as e:
             print(f"Error al obtener los turnos: {e}")
@@ -144,6 +391,24 @@ class TurnoDAO:
         finally:
             if conn: conn.close()
 
+    COLUMNAS_TURNO = ('id_turno', 'id_paciente', 'id_medico', 'id_consultorio', 'fecha_hora', 'motivo', 'asistio')
+
+    def consulta_turnos(self):
+        """Todos los turnos como ConsultaPaginada (por páginas o en lotes)."""
+        return ConsultaPaginada("SELECT " + ", ".join(self.COLUMNAS_TURNO) + " FROM Turno",
+                                columnas=self.COLUMNAS_TURNO, id_columna='id_turno')
+
+    def obtener_turnos_pagina(self, despues_de_id=None, limite=TAM_PAGINA):
+        """Hasta `limite` turnos ordenados por id, a partir del siguiente a `despues_de_id`."""
+        mapear = mapeador(Turno, self.COLUMNAS_TURNO)
+        return [mapear(f) for f in self.consulta_turnos().pagina_por_id(despues_de_id, limite)]
+
+    def iter_turnos(self, tam_lote=TAM_LOTE):
+        """Generador de todos los turnos (por id) que lee de a `tam_lote` filas."""
+        mapear = mapeador(Turno, self.COLUMNAS_TURNO)
+        for fila in self.consulta_turnos().iterar(tam_lote):
+            yield mapear(fila)
+
     def obtener_turnos_por_paciente(self, id_paciente):
         conn = None
         turnos = []
@@ -151,8 +416,7 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno WHERE id_paciente = ?", (id_paciente,))
-            for fila in cursor.fetchall():
-                turnos.append(Turno(id_turno=fila[0], id_paciente=fila[1], id_medico=fila[2], id_consultorio=fila[3], fecha_hora=fila[4], motivo=fila[5], asistio=fila[6]))
+            turnos = mapear_filas(Turno, cursor)
             return turnos
         except sqlite3.Error as e:
             print(f"Error al obtener los turnos por paciente: {e}")
@@ -167,8 +431,7 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno WHERE id_medico = ?", (id_medico,))
-            for fila in cursor.fetchall():
-                turnos.append(Turno(id_turno=fila[0], id_paciente=fila[1], id_medico=fila[2], id_consultorio=fila[3], fecha_hora=fila[4], motivo=fila[5], asistio=fila[6]))
+            turnos = mapear_filas(Turno, cursor)
             return turnos
         except sqlite3.Error as e:
             print(f"Error al obtener los turnos por médico: {e}")
@@ -182,38 +445,26 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             rol = UsuarioDAO().obtener_rol(usuario_actual)
-
-            # Obtener datos del turno antes de borrarlo para notificar
-            turno_obj = None
-            try:
-                turno_obj = self.obtener_turno_por_id(id_turno)
-            except Exception:
-                turno_obj = None
-
-            if rol == "Administrador":
-                cursor.execute("DELETE FROM Turno WHERE id_turno = ?", (id_turno,))
-            elif rol in ["Paciente", "Medico"]:
-                cursor.execute("DELETE FROM Turno WHERE id_turno = ?", (id_turno,))
-            else:
+            if rol not in ["Administrador", "Paciente", "Medico"]:
                 print("Permiso denegado.")
                 return False
 
-            conn.commit()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT id_medico, fecha_hora FROM Turno WHERE id_turno = ?", (id_turno,))
+            anterior = cursor.fetchone()
+            notifications = None
+            if anterior:
+                # El aviso se arma con los datos del turno antes de borrarlo, en la misma transacción
+                quien = 'el administrador' if rol == 'Administrador' else ('el paciente' if rol == 'Paciente' else 'el médico')
+                notifications = _encolar_notificacion(lambda n: n.encolar_turno_cancelado(cursor, id_turno, quien=quien))
+            cursor.execute("DELETE FROM Turno WHERE id_turno = ?", (id_turno,))
             deleted = cursor.rowcount > 0
+            conn.commit()
             if deleted:
-                # Notificar al paciente sobre la cancelación (usando el objeto turno obtenido antes de borrarlo)
-                try:
-                    import Backend.notifications as notifications
-                    quien = 'el administrador' if rol == 'Administrador' else ('el paciente' if rol == 'Paciente' else 'el médico')
-                    try:
-                        if turno_obj:
-                            notifications.send_turno_cancelled(turno_obj, quien=quien)
-                        else:
-                            notifications.send_turno_cancelled(id_turno, quien=quien)
-                    except Exception as e:
-                        print(f"Advertencia: no se pudo enviar email de cancelación de turno: {e}")
-                except Exception:
-                    pass
+                get_motor().liberar_turno(anterior[0], anterior[1])
+                if notifications:
+                    notifications.despertar_despachador()
+                _avisar_recordatorios(id_turno)
             return deleted
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -241,6 +492,10 @@ class TurnoDAO:
                 print("Formato de fecha_hora inválido.")
                 return False
 
+        if not _en_grilla(inicio):
+            print(MENSAJE_FUERA_DE_GRILLA)
+            return False
+
         # Validación: no permitir turnos con fecha mayor a 1 mes desde hoy
         hoy = datetime.now().date()
         fecha_max = _add_one_month(hoy)
@@ -264,22 +519,33 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
 
-            sql_paciente = "SELECT id_turno FROM Turno WHERE id_paciente = ? AND id_turno != ? AND datetime(fecha_hora) < ? AND datetime(fecha_hora, '+30 minutes') > ?"
-            cursor.execute(sql_paciente, (turno.id_paciente, turno.id_turno, fin.strftime("%Y-%m-%d %H:%M:%S"), inicio.strftime("%Y-%m-%d %H:%M:%S")))
-            if cursor.fetchone():
-                print("El paciente ya tiene un turno que se solapa.")
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT id_medico, fecha_hora FROM Turno WHERE id_turno = ?", (turno.id_turno,))
+            anterior = cursor.fetchone()
+            if anterior is None:
+                conn.rollback()
+                print("No se encontró el turno a actualizar.")
                 return False
 
-            sql_medico = "SELECT id_turno FROM Turno WHERE id_medico = ? AND id_turno != ? AND datetime(fecha_hora) < ? AND datetime(fecha_hora, '+30 minutes') > ?"
-            cursor.execute(sql_medico, (turno.id_medico, turno.id_turno, fin.strftime("%Y-%m-%d %H:%M:%S"), inicio.strftime("%Y-%m-%d %H:%M:%S")))
-            if cursor.fetchone():
-                print("El médico ya tiene un turno que se solapa.")
+            sql = "UPDATE Turno SET id_paciente = ?, id_medico = ?, id_consultorio = ?, fecha_hora = ?, motivo = ?, clave_slot = ? WHERE id_turno = ?"
+            valores = (turno.id_paciente, turno.id_medico, turno.id_consultorio, inicio.strftime("%Y-%m-%d %H:%M:%S"), turno.motivo, _clave_slot(inicio), turno.id_turno)
+            try:
+                cursor.execute(sql, valores)
+            except sqlite3.IntegrityError as e:
+                conn.rollback()
+                motivo = _conflicto_de_slot(e)
+                if motivo is None:
+                    raise
+                print({
+                    'paciente': "El paciente ya tiene un turno que se solapa.",
+                    'medico': "El médico ya tiene un turno que se solapa.",
+                    'consultorio': "El consultorio ya está asignado en ese horario.",
+                }[motivo])
                 return False
-
-            sql = "UPDATE Turno SET id_paciente = ?, id_medico = ?, id_consultorio = ?, fecha_hora = ?, motivo = ? WHERE id_turno = ?"
-            valores = (turno.id_paciente, turno.id_medico, turno.id_consultorio, inicio.strftime("%Y-%m-%d %H:%M:%S"), turno.motivo, turno.id_turno)
-            cursor.execute(sql, valores)
             conn.commit()
+            get_motor().liberar_turno(anterior[0], anterior[1])
+            get_motor().registrar_turno(turno.id_medico, valores[3])
+            _avisar_recordatorios(turno.id_turno, valores[3])
             return True
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -294,10 +560,7 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute("SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno WHERE id_turno = ?", (id_turno,))
-            fila = cursor.fetchone()
-            if fila:
-                return Turno(id_turno=fila[0], id_paciente=fila[1], id_medico=fila[2], id_consultorio=fila[3], fecha_hora=fila[4], motivo=fila[5], asistio=fila[6])
-            return None
+            return mapear_fila(Turno, cursor, cursor.fetchone())
         except sqlite3.Error as e:
             print(f"Error al obtener turno por ID: {e}")
             return None
@@ -311,6 +574,7 @@ class TurnoDAO:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM Turno WHERE id_paciente = ?", (id_paciente,))
             conn.commit()
+            get_motor().invalidar_turnos()
             return True
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -326,6 +590,7 @@ class TurnoDAO:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM Turno WHERE id_medico = ?", (id_medico,))
             conn.commit()
+            get_motor().invalidar_medico(id_medico)
             return True
         except sqlite3.Error as e:
             if conn: conn.rollback()
@@ -340,9 +605,8 @@ class TurnoDAO:
         try:
             conn = get_conexion()
             cursor = conn.cursor()
-            cursor.execute("SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno WHERE DATE(fecha_hora) = ?", (fecha,))
-            for fila in cursor.fetchall():
-                turnos.append(Turno(id_turno=fila[0], id_paciente=fila[1], id_medico=fila[2], id_consultorio=fila[3], fecha_hora=fila[4], motivo=fila[5], asistio=fila[6]))
+            cursor.execute("SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno WHERE fecha_hora >= ? AND fecha_hora < ?", _rango_dias(fecha))
+            turnos = mapear_filas(Turno, cursor)
             return turnos
         except sqlite3.Error as e:
             print(f"Error al obtener los turnos por fecha: {e}")
@@ -356,9 +620,8 @@ class TurnoDAO:
         try:
             conn = get_conexion()
             cursor = conn.cursor()
-            cursor.execute("SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno WHERE id_medico = ? AND DATE(fecha_hora) = ?", (id_medico, fecha))
-            for fila in cursor.fetchall():
-                turnos.append(Turno(id_turno=fila[0], id_paciente=fila[1], id_medico=fila[2], id_consultorio=fila[3], fecha_hora=fila[4], motivo=fila[5], asistio=fila[6]))
+            cursor.execute("SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno WHERE id_medico = ? AND fecha_hora >= ? AND fecha_hora < ?", (id_medico, *_rango_dias(fecha)))
+            turnos = mapear_filas(Turno, cursor)
             return turnos
         except sqlite3.Error as e:
             print(f"Error al obtener los turnos por médico y fecha: {e}")
@@ -372,9 +635,8 @@ class TurnoDAO:
         try:
             conn = get_conexion()
             cursor = conn.cursor()
-            cursor.execute("SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno WHERE id_paciente = ? AND DATE(fecha_hora) = ?", (id_paciente, fecha))
-            for fila in cursor.fetchall():
-                turnos.append(Turno(id_turno=fila[0], id_paciente=fila[1], id_medico=fila[2], id_consultorio=fila[3], fecha_hora=fila[4], motivo=fila[5], asistio=fila[6]))
+            cursor.execute("SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno WHERE id_paciente = ? AND fecha_hora >= ? AND fecha_hora < ?", (id_paciente, *_rango_dias(fecha)))
+            turnos = mapear_filas(Turno, cursor)
             return turnos
         except sqlite3.Error as e:
             print(f"Error al obtener los turnos por paciente y fecha: {e}")
@@ -382,6 +644,75 @@ class TurnoDAO:
         finally:
             if conn: conn.close()
 
+    COLUMNAS_GRILLA = ('id_turno', 'paciente', 'medico', 'especialidad', 'consultorio',
+                       'fecha', 'hora', 'estado', 'asistio', 'fecha_hora')
+
+    @staticmethod
+    def _sql_grilla_turnos(fecha=None, id_medico=None, id_paciente=None):
+        """SELECT (sin ORDER BY) y parámetros de la grilla de turnos con sus filtros."""
+        sql = """
+            SELECT T.id_turno AS id_turno,
+                   COALESCE(P.nombre || ' ' || P.apellido, 'N/A') AS paciente,
+                   COALESCE(M.nombre || ' ' || M.apellido, 'N/A') AS medico,
+                   COALESCE(E.nombre, 'N/A') AS especialidad,
+                   COALESCE(C.descripcion, CAST(T.id_consultorio AS TEXT), '') AS consultorio,
+                   substr(T.fecha_hora, 1, 10) AS fecha,
+                   substr(T.fecha_hora, 12) AS hora,
+                   CASE WHEN T.asistio IS NULL THEN 'Pendiente'
+                        WHEN T.asistio = 1 THEN 'Asistió'
+                        ELSE 'Inasistencia' END AS estado,
+                   T.asistio AS asistio,
+                   T.fecha_hora AS fecha_hora
+            FROM Turno T
+            LEFT JOIN Paciente P ON T.id_paciente = P.id_paciente
+            LEFT JOIN Medico M ON T.id_medico = M.id_medico
+            LEFT JOIN Especialidad E ON M.id_especialidad = E.id_especialidad
+            LEFT JOIN Consultorio C ON T.id_consultorio = C.id_consultorio
+            WHERE 1=1
+            """
+        params = []
+        if fecha:
+            sql += " AND T.fecha_hora >= ? AND T.fecha_hora < ?"
+            params.extend(_rango_dias(fecha))
+        if id_medico is not None:
+            sql += " AND T.id_medico = ?"
+            params.append(id_medico)
+        if id_paciente is not None:
+            sql += " AND T.id_paciente = ?"
+            params.append(id_paciente)
+        return sql, params
+
+    def consulta_grilla_turnos(self, fecha=None, id_medico=None, id_paciente=None):
+        """
+        Igual que obtener_grilla_turnos pero como ConsultaPaginada, para mostrarla
+        por páginas (ver GUI/tabla_paginada.py). Por defecto ordena por fecha_hora.
+        """
+        sql, params = self._sql_grilla_turnos(fecha, id_medico, id_paciente)
+        return ConsultaPaginada(sql, params, columnas=self.COLUMNAS_GRILLA, id_columna='id_turno',
+                                ordenables=('id_turno', 'paciente', 'medico', 'especialidad',
+                                            'consultorio', 'estado', 'fecha_hora'),
+                                orden_defecto='fecha_hora')
+
+    def obtener_grilla_turnos(self, fecha=None, id_medico=None, id_paciente=None):
+        """
+        Filas desnormalizadas para la grilla de turnos, resueltas en un único JOIN.
+        Filtra opcionalmente por fecha ('YYYY-MM-DD'), médico y/o paciente.
+        Retorna tuplas (id_turno, paciente, medico, especialidad, consultorio, fecha, hora, estado, asistio, fecha_hora).
+        """
+        conn = None
+        try:
+            conn = get_conexion()
+            cursor = conn.cursor()
+            sql, params = self._sql_grilla_turnos(fecha, id_medico, id_paciente)
+            sql += " ORDER BY T.fecha_hora, T.id_turno"
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error al obtener la grilla de turnos: {e}")
+            return []
+        finally:
+            if conn: conn.close()
+
     def contar_turnos_por_medico(self, id_medico):
         conn = None
         try:
@@ -417,11 +748,10 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             cursor.execute(
-                "SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno WHERE DATE(fecha_hora) BETWEEN ? AND ?",
-                (fecha_inicio, fecha_fin)
+                "SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio FROM Turno WHERE fecha_hora >= ? AND fecha_hora < ?",
+                _rango_dias(fecha_inicio, fecha_fin)
             )
-            for fila in cursor.fetchall():
-                turnos.append(Turno(id_turno=fila[0], id_paciente=fila[1], id_medico=fila[2], id_consultorio=fila[3], fecha_hora=fila[4], motivo=fila[5], asistio=fila[6]))
+            turnos = mapear_filas(Turno, cursor)
             return turnos
         except sqlite3.Error as e:
             print(f"Error al obtener los turnos entre fechas: {e}")
@@ -436,13 +766,13 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             if fecha is None:
-                cursor.execute("UPDATE Turno SET asistio = 0 WHERE DATE(fecha_hora) < DATE('now') AND asistio IS NULL")
+                cursor.execute("UPDATE Turno SET asistio = 0 WHERE fecha_hora < DATE('now') AND asistio IS NULL")
                 cursor.execute("SELECT strftime('%H:%M', 'now')")
                 hora_actual = cursor.fetchone()[0]
                 if hora_actual >= '14:00':
-                    cursor.execute("UPDATE Turno SET asistio = 0 WHERE DATE(fecha_hora) = DATE('now') AND asistio IS NULL")
+                    cursor.execute("UPDATE Turno SET asistio = 0 WHERE fecha_hora >= DATE('now') AND fecha_hora < DATE('now', '+1 day') AND asistio IS NULL")
             else:
-                cursor.execute("UPDATE Turno SET asistio = 0 WHERE DATE(fecha_hora) = ? AND asistio IS NULL", (fecha,))
+                cursor.execute("UPDATE Turno SET asistio = 0 WHERE fecha_hora >= ? AND fecha_hora < ? AND asistio IS NULL", _rango_dias(fecha))
             conn.commit()
             return True
         except sqlite3.Error as e:
@@ -457,7 +787,8 @@ class TurnoDAO:
     # -------------------------------------------------
     def marcar_asistencia(self, id_turno, asistio, usuario_actual):
         """Marca asistencia (True) o inasistencia (False) para un turno. Solo Médico o Administrador."""
-        rol = UsuarioDAO().obtener_rol(usuario_actual)
+        sesion = UsuarioDAO().obtener_sesion(usuario_actual)
+        rol = sesion.rol if sesion else None
         if rol not in ["Medico", "Administrador"]:
             return False, "Permiso denegado."
         conn = None
@@ -466,11 +797,9 @@ class TurnoDAO:
             cursor = conn.cursor()
             if rol == "Medico":
                 # validar que el turno pertenezca al médico
-                from Backend.DAO.MedicoDAO import MedicoDAO
-                med = MedicoDAO().obtener_medico_por_usuario(usuario_actual)
                 cursor.execute("SELECT id_medico FROM Turno WHERE id_turno = ?", (id_turno,))
                 fila = cursor.fetchone()
-                if not fila or fila[0] != (med.id_medico if med else None):
+                if not fila or fila[0] != sesion.id_medico:
                     return False, "Solo puede marcar asistencia de sus propios turnos."
             cursor.execute("UPDATE Turno SET asistio = ? WHERE id_turno = ?", (1 if asistio else 0, id_turno))
             conn.commit()
@@ -481,6 +810,7 @@ class TurnoDAO:
         finally:
             if conn: conn.close()
 
+    @reporte_cacheado
     def obtener_resumen_asistencia_por_mes(self):
         """Devuelve lista de (mes 'YYYY-MM', asistencias, inasistencias)."""
         conn = None
@@ -489,10 +819,10 @@ class TurnoDAO:
             cursor = conn.cursor()
             cursor.execute(
                 """
-                SELECT strftime('%Y-%m', fecha_hora) AS mes,
-                       SUM(CASE WHEN asistio = 1 THEN 1 ELSE 0 END) AS asistencias,
-                       SUM(CASE WHEN asistio = 0 THEN 1 ELSE 0 END) AS inasistencias
-                FROM Turno
+                SELECT substr(fecha, 1, 7) AS mes,
+                       SUM(asistidos) AS asistencias,
+                       SUM(ausentes) AS inasistencias
+                FROM ResumenTurnoDiario
                 GROUP BY mes
                 ORDER BY mes
                 """
@@ -510,64 +840,13 @@ class TurnoDAO:
         """
         Calcula los slots libres (30 min) combinando franjas laborales y turnos ocupados.
         Retorna una lista de strings con los horarios disponibles ('HH:MM').
+        Delegado en el motor de disponibilidad (Backend/disponibilidad.py).
         """
-        DURACION_MINUTOS = 30
-        
         try:
-            # Convertir la fecha solicitada a día de la semana (1-7)
-            fecha_dt = datetime.strptime(fecha, "%Y-%m-%d")
-            dia_semana_py = fecha_dt.weekday() + 1 # Lunes=1
+            return get_motor().horarios_libres(id_medico, fecha)
         except ValueError:
             print("Formato de fecha de entrada inválido. Use YYYY-MM-DD.")
-            return [] # Retorna lista vacía si la fecha es mala
-
-        conn = None
-        try:
-            conn = get_conexion()
-            cursor = conn.cursor()
-            
-            # 1. Obtener Franjas de Trabajo (Las "Franjas Largas")
-            sql_franja = "SELECT hora_inicio, hora_fin FROM FranjaHoraria WHERE id_medico = ? AND dia_semana = ?"
-            cursor.execute(sql_franja, (id_medico, dia_semana_py))
-            franjas_trabajo = cursor.fetchall()
-            
-            if not franjas_trabajo:
-                 print(f"Debug: No se encontraron franjas laborales para el médico {id_medico} el día {dia_semana_py}.")
-                 return [] # El médico no trabaja ese día
-            
-            # 2. Obtener Horarios Reservados (Las "Excepciones")
-            sql_reservados = "SELECT strftime('%H:%M', fecha_hora) FROM Turno WHERE id_medico = ? AND DATE(fecha_hora) = ?"
-            cursor.execute(sql_reservados, (id_medico, fecha))
-            # Usamos un 'set' para que la búsqueda sea ultra-rápida
-            turnos_reservados = {row[0] for row in cursor.fetchall()} 
-            
-            horarios_libres = []
-            
-            # 3. Calcular Slots Libres (Lógica Python)
-            for inicio_str, fin_str in franjas_trabajo:
-                
-                # Convertimos los strings de hora a objetos datetime para poder sumarles tiempo
-                hora_actual = datetime.strptime(f"{fecha} {inicio_str}", "%Y-%m-%d %H:%M")
-                hora_fin = datetime.strptime(f"{fecha} {fin_str}", "%Y-%m-%d %H:%M")
-                
-                # Iteramos cada slot de 30 minutos
-                while hora_actual < hora_fin:
-                    slot_inicio_str = hora_actual.strftime('%H:%M')
-                    
-                    # Si el slot NO está en la lista de reservados, lo agregamos
-                    if slot_inicio_str not in turnos_reservados:
-                        horarios_libres.append(slot_inicio_str)
-                        
-                    # Avanzamos al siguiente slot
-                    hora_actual += timedelta(minutes=DURACION_MINUTOS) 
-                    
-            print(f"Debug: Horarios libres encontrados: {horarios_libres}")
-            return horarios_libres
-        except sqlite3.Error as e:
-            print(f"Error al calcular disponibilidad: {e}")
             return []
-        finally:
-            if conn: conn.close()
 
     def calcular_horarios_con_estado(self, id_medico, fecha):
         """
@@ -575,10 +854,25 @@ class TurnoDAO:
         Retorna una lista de tuplas: (hora 'HH:MM', ocupado_bool, dict_info)
         dict_info puede contener: {'id_turno':..., 'id_paciente':..., 'paciente_nombre':...} cuando esté ocupado, o None cuando esté libre.
         """
-        DURACION_MINUTOS = 30
         try:
-            fecha_dt = datetime.strptime(fecha, "%Y-%m-%d")
-            dia_semana_py = fecha_dt.weekday() + 1
+            return get_motor().horarios_con_estado(id_medico, fecha)
+        except ValueError:
+            print("Formato de fecha de entrada inválido. Use YYYY-MM-DD.")
+            return []
+
+    def buscar_proximos_horarios_libres(self, id_especialidad=None, ids_medicos=None, fecha_desde=None, fecha_hasta=None, cantidad=10):
+        """
+        Busca los primeros `cantidad` slots libres entre todos los médicos de una especialidad
+        (o de la lista `ids_medicos`) dentro de la ventana de reserva (hasta un mes desde hoy).
+        Se resuelve con un número fijo de consultas, sin importar cuántos médicos o días abarque.
+        Retorna una lista de dicts {'fecha', 'hora', 'id_medico', 'medico'} ordenada por fecha y hora.
+        """
+        ahora = datetime.now()
+        hoy = ahora.date()
+        fecha_max = _add_one_month(hoy)
+        try:
+            desde = max(datetime.strptime(str(fecha_desde), "%Y-%m-%d").date(), hoy) if fecha_desde else hoy
+            hasta = min(datetime.strptime(str(fecha_hasta), "%Y-%m-%d").date(), fecha_max) if fecha_hasta else fecha_max
         except ValueError:
             print("Formato de fecha de entrada inválido. Use YYYY-MM-DD.")
             return []
@@ -587,43 +881,30 @@ class TurnoDAO:
         try:
             conn = get_conexion()
             cursor = conn.cursor()
-
-            # Obtener franjas laborales
-            sql_franja = "SELECT hora_inicio, hora_fin FROM FranjaHoraria WHERE id_medico = ? AND dia_semana = ?"
-            cursor.execute(sql_franja, (id_medico, dia_semana_py))
-            franjas_trabajo = cursor.fetchall()
-            if not franjas_trabajo:
+            if ids_medicos:
+                ids = list(ids_medicos)
+                cursor.execute(f"SELECT id_medico, nombre, apellido FROM Medico WHERE id_medico IN ({','.join('?' * len(ids))})", ids)
+            elif id_especialidad is not None:
+                cursor.execute("SELECT id_medico, nombre, apellido FROM Medico WHERE id_especialidad = ?", (id_especialidad,))
+            else:
                 return []
-
-            # Obtener turnos reservados con la hora exacta (HH:MM) y datos de paciente
-            # Traemos también el nombre del paciente para mostrarlo en la UI
-            sql_reservados = ("SELECT T.id_turno, T.id_paciente, P.nombre, P.apellido, strftime('%H:%M', T.fecha_hora) as hora "
-                              "FROM Turno T LEFT JOIN Paciente P ON T.id_paciente = P.id_paciente "
-                              "WHERE T.id_medico = ? AND DATE(T.fecha_hora) = ?")
-            cursor.execute(sql_reservados, (id_medico, fecha))
-            reservados = {row[4]: {'id_turno': row[0], 'id_paciente': row[1], 'paciente_nombre': f"{row[2]} {row[3]}".strip()} for row in cursor.fetchall()}
-
-            horarios = []
-            for inicio_str, fin_str in franjas_trabajo:
-                hora_actual = datetime.strptime(f"{fecha} {inicio_str}", "%Y-%m-%d %H:%M")
-                hora_fin = datetime.strptime(f"{fecha} {fin_str}", "%Y-%m-%d %H:%M")
-                while hora_actual < hora_fin:
-                    slot_inicio_str = hora_actual.strftime('%H:%M')
-                    info = None
-                    ocupado = False
-                    if slot_inicio_str in reservados:
-                        ocupado = True
-                        info = reservados[slot_inicio_str]
-                    horarios.append((slot_inicio_str, ocupado, info))
-                    hora_actual += timedelta(minutes=DURACION_MINUTOS)
-
-            return horarios
+            medicos = {fila[0]: f"{fila[1]} {fila[2]}" for fila in cursor.fetchall()}
         except sqlite3.Error as e:
-            print(f"Error al calcular disponibilidad con estado: {e}")
+            print(f"Error al buscar próximos horarios libres: {e}")
             return []
         finally:
             if conn: conn.close()
+
+        libres = get_motor().buscar_libres(list(medicos), desde, hasta, cantidad, no_antes_de=ahora)
+        return [{'fecha': fecha, 'hora': hora, 'id_medico': id_medico, 'medico': medicos[id_medico]}
+                for fecha, hora, id_medico in libres]
+
     # --- MÉTODOS DE REPORTES ---
+    # Los reportes de cantidades leen ResumenTurnoDiario (una fila por día y
+    # médico, mantenida por triggers sobre Turno; ver schema.py), así su costo
+    # depende de los días del rango y no de cuántos turnos hay en la historia.
+    # Además los resultados quedan en caché hasta que cambie la base
+    # (Backend/cache_reportes.py).
 
     def reporte_turnos_por_medico_y_periodo(self, id_medico, fecha_inicio, fecha_fin):
         """
@@ -635,16 +916,14 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             sql = """
-            SELECT * FROM Turno 
-            WHERE id_medico = ? 
-              AND DATE(fecha_hora) BETWEEN ? AND ?
+            SELECT id_turno, id_paciente, id_medico, id_consultorio, fecha_hora, motivo, asistio
+            FROM Turno
+            WHERE id_medico = ?
+              AND fecha_hora >= ? AND fecha_hora < ?
             ORDER BY fecha_hora
             """
-            cursor.execute(sql, (id_medico, fecha_inicio, fecha_fin))
-            for fila in cursor.fetchall():
-                # Asumo la estructura de tu constructor de Turno
-                turnos.append(Turno(id_turno=fila[0], id_paciente=fila[1], id_medico=fila[2], 
-                                  id_consultorio=fila[3], fecha_hora=fila[4], motivo=fila[5], asistio=fila[6]))
+            cursor.execute(sql, (id_medico, *_rango_dias(fecha_inicio, fecha_fin)))
+            turnos = mapear_filas(Turno, cursor)
             return turnos
         except sqlite3.Error as e:
             print(f"Error en reporte de turnos por médico: {e}")
@@ -652,21 +931,19 @@ class TurnoDAO:
         finally:
             if conn: conn.close()
 
+    @reporte_cacheado
     def reporte_cantidad_turnos_por_especialidad(self):
         """
         Reporte 2: Cantidad de turnos agrupados por especialidad.
-        Usa JOIN para conectar Turno -> Medico -> Especialidad.
         """
         conn = None
         try:
             conn = get_conexion()
             cursor = conn.cursor()
-            # Esta es una consulta compleja que une 3 tablas
             sql = """
-            SELECT E.nombre, COUNT(T.id_turno) AS Cantidad
-            FROM Turno AS T
-            JOIN Medico AS M ON T.id_medico = M.id_medico
-            JOIN Especialidad AS E ON M.id_especialidad = E.id_especialidad
+            SELECT E.nombre, SUM(R.reservados) AS Cantidad
+            FROM ResumenTurnoDiario AS R
+            JOIN Especialidad AS E ON R.id_especialidad = E.id_especialidad
             GROUP BY E.nombre
             ORDER BY Cantidad DESC
             """
@@ -678,6 +955,7 @@ class TurnoDAO:
         finally:
             if conn: conn.close()
 
+    @reporte_cacheado
     def reporte_cantidad_turnos_por_especialidad_periodo(self, fecha_inicio, fecha_fin):
         """
         Reporte: Cantidad de turnos por especialidad dentro de un rango de fechas.
@@ -688,15 +966,14 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             sql = (
-                "SELECT E.nombre, COUNT(T.id_turno) AS Cantidad\n"
-                "FROM Turno AS T\n"
-                "JOIN Medico AS M ON T.id_medico = M.id_medico\n"
-                "JOIN Especialidad AS E ON M.id_especialidad = E.id_especialidad\n"
-                "WHERE DATE(T.fecha_hora) BETWEEN ? AND ?\n"
+                "SELECT E.nombre, SUM(R.reservados) AS Cantidad\n"
+                "FROM ResumenTurnoDiario AS R\n"
+                "JOIN Especialidad AS E ON R.id_especialidad = E.id_especialidad\n"
+                "WHERE R.fecha >= ? AND R.fecha < ?\n"
                 "GROUP BY E.nombre\n"
                 "ORDER BY Cantidad DESC"
             )
-            cursor.execute(sql, (fecha_inicio, fecha_fin))
+            cursor.execute(sql, _rango_dias(fecha_inicio, fecha_fin))
             return cursor.fetchall()
         except sqlite3.Error as e:
             print(f"Error en reporte de turnos por especialidad (periodo): {e}")
@@ -704,6 +981,7 @@ class TurnoDAO:
         finally:
             if conn: conn.close()
 
+    @reporte_cacheado
     def reporte_asistencia_por_periodo(self, fecha_inicio, fecha_fin):
         """Devuelve tupla (asistencias, inasistencias, pendientes) para el rango de fechas dado."""
         conn = None
@@ -711,14 +989,12 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             sql = (
-                "SELECT\n"
-                "  SUM(CASE WHEN asistio = 1 THEN 1 ELSE 0 END) AS Asistencias,\n"
-                "  SUM(CASE WHEN asistio = 0 THEN 1 ELSE 0 END) AS Inasistencias,\n"
-                "  SUM(CASE WHEN asistio IS NULL THEN 1 ELSE 0 END) AS Pendientes\n"
-                "FROM Turno\n"
-                "WHERE DATE(fecha_hora) BETWEEN ? AND ?"
+                "SELECT SUM(asistidos) AS Asistencias, SUM(ausentes) AS Inasistencias,\n"
+                "       SUM(pendientes) AS Pendientes\n"
+                "FROM ResumenTurnoDiario\n"
+                "WHERE fecha >= ? AND fecha < ?"
             )
-            cursor.execute(sql, (fecha_inicio, fecha_fin))
+            cursor.execute(sql, _rango_dias(fecha_inicio, fecha_fin))
             return cursor.fetchone()
         except sqlite3.Error as e:
             print(f"Error en reporte de asistencias por periodo: {e}")
@@ -726,6 +1002,7 @@ class TurnoDAO:
         finally:
             if conn: conn.close()
 
+    @reporte_cacheado
     def reporte_asistencia_global(self):
         """
         Reporte 4: Conteo global de asistencias vs. inasistencias.
@@ -735,16 +1012,36 @@ class TurnoDAO:
             conn = get_conexion()
             cursor = conn.cursor()
             sql = """
-            SELECT
-                SUM(CASE WHEN asistio = 1 THEN 1 ELSE 0 END) AS Asistencias,
-                SUM(CASE WHEN asistio = 0 THEN 1 ELSE 0 END) AS Inasistencias,
-                SUM(CASE WHEN asistio IS NULL THEN 1 ELSE 0 END) AS Pendientes
-            FROM Turno
+            SELECT SUM(asistidos) AS Asistencias, SUM(ausentes) AS Inasistencias,
+                   SUM(pendientes) AS Pendientes
+            FROM ResumenTurnoDiario
             """
             cursor.execute(sql)
             return cursor.fetchone() # Retorna una tupla (asist, inasist, pend)
         except sqlite3.Error as e:
             print(f"Error en reporte de asistencias: {e}")
             return []
+        finally:
+            if conn: conn.close()
+
+    @reporte_cacheado
+    def reporte_turnos_por_dia(self):
+        """Devuelve lista de (fecha 'YYYY-MM-DD', cantidad de turnos), ordenada por fecha."""
+        conn = None
+        try:
+            conn = get_conexion()
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT fecha, SUM(reservados) AS cantidad
+                FROM ResumenTurnoDiario
+                GROUP BY fecha
+                ORDER BY fecha
+                """
+            )
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error en reporte de turnos por día: {e}")
+            return []
         finally:
             if conn: conn.close()
\ No newline at end of file
@@ -1,6 +1,7 @@
 import sqlite3
 from Backend.BDD.Conexion import get_conexion
 from Backend.Model.Usuario import Usuario
+from Backend.sesion import obtener_sesion, invalidar_sesiones
 
 class UsuarioDAO:
     def crear_usuario(self, usuario, contrasena, rol):
@@ -13,6 +14,7 @@ class UsuarioDAO:
                 VALUES (?, ?, ?)
             """, (usuario, contrasena, rol))
             conn.commit()
+            invalidar_sesiones(usuario)
             return True, "Usuario creado correctamente."
         except sqlite3.IntegrityError:
             return False, "El nombre de usuario ya está registrado."
@@ -30,6 +32,7 @@ class UsuarioDAO:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM Usuario WHERE usuario = ?", (usuario,))
             conn.commit()
+            invalidar_sesiones(usuario)
             return cursor.rowcount > 0
         except sqlite3.Error:
             if conn: conn.rollback()
@@ -37,14 +40,6 @@ class UsuarioDAO:
         finally:
             if conn: conn.close()
 
-    def obtener_rol(self, usuario):
-        conn = get_conexion()
-        cursor = conn.cursor()
-        cursor.execute("SELECT rol FROM Usuario WHERE usuario = ?", (usuario,))
-        fila = cursor.fetchone()
-        conn.close()
-        return fila[0] if fila else None
-
     def obtener_usuario(self, usuario):
         """
         Retorna un objeto Usuario dado el nombre de usuario.
@@ -89,24 +84,25 @@ class UsuarioDAO:
             if conn:
                 conn.close()
 
-    def obtener_rol(self, usuario):
+    def iniciar_sesion(self, usuario, contrasenia):
         """
-        Retorna el rol de un usuario.
+        Autentica al usuario y crea su Sesion (rol, id_medico, id_paciente).
+        Retorna la Sesion si las credenciales son válidas, None si no.
         """
-        conn = None
-        try:
-            conn = get_conexion()
-            cursor = conn.cursor()
-            sql = "SELECT rol FROM Usuario WHERE usuario = ?"
-            cursor.execute(sql, (usuario,))
-            fila = cursor.fetchone()
-            if fila:
-                return fila[0]
-            else:
-                return None
-        except sqlite3.Error as e:
-            print(f"Error al obtener rol: {e}")
+        if not self.autenticar_usuario(usuario, contrasenia):
             return None
-        finally:
-            if conn:
-                conn.close()
+        invalidar_sesiones(usuario)
+        return obtener_sesion(usuario)
+
+    def obtener_sesion(self, usuario_actual):
+        """
+        Retorna la Sesion de un usuario (nombre o Sesion), cacheada con TTL.
+        """
+        return obtener_sesion(usuario_actual)
+
+    def obtener_rol(self, usuario):
+        """
+        Retorna el rol de un usuario (nombre o Sesion) desde el caché de sesiones.
+        """
+        sesion = obtener_sesion(usuario)
+        return sesion.rol if sesion else None
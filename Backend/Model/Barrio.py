@@ -1,4 +1,6 @@
 class Barrio:
+    __slots__ = ('id_barrio', 'nombre')
+
     def __init__(self, id_barrio=None, nombre=None):
         self.id_barrio = id_barrio # PK
         self.nombre = nombre
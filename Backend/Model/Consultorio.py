@@ -1,4 +1,6 @@
 class Consultorio:
+    __slots__ = ('id_consultorio', 'descripcion')
+
     def __init__(self, id_consultorio=None, descripcion=None):
         self.id_consultorio = id_consultorio # PK
         self.descripcion = descripcion
@@ -1,4 +1,6 @@
 class Especialidad:
+    __slots__ = ('id_especialidad', 'nombre', 'descripcion')
+
     def __init__(self, id_especialidad=None, nombre=None, descripcion=None):
         self.id_especialidad = id_especialidad # PK
         self.nombre = nombre
@@ -1,4 +1,6 @@
 class Estado:
+    __slots__ = ('id_estado', 'nombre')
+
     def __init__(self, id_estado=None, nombre=None):
         self.id_estado = id_estado # PK
         self.nombre = nombre
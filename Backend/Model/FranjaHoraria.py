@@ -4,6 +4,8 @@ class FranjaHoraria:
     """
     Representa el Modelo de una franja horaria laboral de un médico.
     """
+    __slots__ = ('id_franja', 'id_medico', 'dia_semana', 'hora_inicio', 'hora_fin')
+
     def __init__(self, id_franja=None, id_medico=None, dia_semana=None, 
                  hora_inicio=None, hora_fin=None):
         self.id_franja = id_franja
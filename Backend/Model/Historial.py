@@ -1,4 +1,7 @@
 class Historial:
+    __slots__ = ('id_historial', 'id_paciente', 'id_medico', 'fecha', 'diagnostico',
+                 'observaciones')
+
     def __init__(self, id_historial=None, id_paciente=None, id_medico=None, 
                  fecha=None, diagnostico=None, observaciones=None):
         self.id_historial = id_historial # PK
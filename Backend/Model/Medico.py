@@ -1,6 +1,9 @@
 # En Model/Medico.py
 
 class Medico:
+    __slots__ = ('id_medico', 'usuario', 'matricula', 'nombre', 'apellido', 'tipo_dni', 'dni',
+                 'calle', 'numero_calle', 'id_barrio', 'email', 'telefono', 'id_especialidad')
+
     def __init__(self, id_medico=None, usuario=None, matricula=None, nombre=None, apellido=None, 
                  tipo_dni=None, dni=None, calle=None, numero_calle=None, id_barrio=None, email=None, 
                  telefono=None, id_especialidad=None):
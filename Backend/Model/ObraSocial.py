@@ -1,4 +1,6 @@
 class ObraSocial:
+    __slots__ = ('id_obra_social', 'nombre')
+
     def __init__(self, nombre, id_obra_social=None):
         self.id_obra_social = id_obra_social
         self.nombre = nombre
@@ -1,4 +1,8 @@
 class Paciente:
+    __slots__ = ('id_paciente', 'id_barrio', 'id_obra_social', 'usuario', 'tipo_dni', 'nombre',
+                 'apellido', 'fecha_nacimiento', 'dni', 'email', 'telefono', 'calle',
+                 'numero_calle')
+
     def __init__(self, id_paciente=None, id_barrio=None, id_obra_social=None, usuario=None,
                  nombre=None, apellido=None, fecha_nacimiento=None, tipo_dni=None,
                  dni=None, email=None, telefono=None, calle=None, numero_calle=None):
@@ -1,4 +1,6 @@
 class Receta:
+    __slots__ = ('id_receta', 'id_paciente', 'id_medico', 'id_estado', 'fecha', 'descripcion')
+
     def __init__(self, id_receta=None, id_paciente=None, id_medico=None, id_estado=None,
                  fecha=None, descripcion=None):
         self.id_receta = id_receta      # PK
@@ -1,4 +1,6 @@
 class TipoDni:
+    __slots__ = ('tipo_dni', 'tipo')
+
     def __init__(self, tipo_dni=None, tipo=None):
         self.tipo_dni = tipo_dni # PK
         self.tipo = tipo
@@ -1,4 +1,7 @@
 class Turno:
+    __slots__ = ('id_turno', 'id_paciente', 'id_medico', 'id_consultorio', 'fecha_hora', 'motivo',
+                 'asistio')
+
     def __init__(self, id_turno=None, id_paciente=None, id_medico=None, id_consultorio=None, fecha_hora=None, 
                  motivo=None, asistio=None):
         
@@ -1,4 +1,6 @@
 class Usuario:
+    __slots__ = ('usuario', 'contrasenia', 'rol')
+
     def __init__(self, usuario=None, contrasenia=None, rol=None):
         self.usuario = usuario          # PK (Usado como FK en Paciente y Medico)
         self.contrasenia = contrasenia  # Varchar NN
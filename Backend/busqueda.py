@@ -0,0 +1,33 @@
+"""
+Armado de consultas FTS5 para las búsquedas de pacientes y médicos.
+
+El texto que escribe el usuario se parte en palabras y cada una se busca como
+prefijo ("gom" encuentra "Gómez") dentro de las columnas indicadas. Las
+palabras van entre comillas para que caracteres como '-', '*' o ':' no se
+interpreten como operadores de FTS5.
+"""
+import re
+
+LIMITE_BUSQUEDA = 200
+LIMITE_OPCIONES = 20  # opciones que muestra un combo de búsqueda
+
+_PALABRA = re.compile(r"\w+", re.UNICODE)
+
+
+def consulta_fts(*filtros):
+    """
+    Recibe pares (texto, columnas) y arma la expresión MATCH combinándolos con AND.
+    Ej: consulta_fts(("gomez ju", "apellido nombre"), ("30", "dni"))
+        -> '{apellido nombre} : "gomez"* AND {apellido nombre} : "ju"* AND {dni} : "30"*'
+    Retorna None si no hay ninguna palabra para buscar.
+    """
+    terminos = []
+    for texto, columnas in filtros:
+        for palabra in _PALABRA.findall(str(texto or "")):
+            terminos.append(f'{{{columnas}}} : "{palabra}"*')
+    return " AND ".join(terminos) if terminos else None
+
+
+def etiqueta_persona(apellido, nombre, dni):
+    """Texto con el que se muestra un paciente o médico en los combos."""
+    return f"{apellido}, {nombre} (DNI: {dni})"
@@ -0,0 +1,143 @@
+"""
+Caché LRU (mapa de identidad) para las lecturas por clave de Paciente y Medico.
+
+`buscar_paciente_por_id_paciente`, `obtener_paciente_por_usuario`,
+`obtener_medico_por_id` y `obtener_medico_por_usuario` son las lecturas más
+frecuentes (notificaciones, grillas, permisos de historial, recetas). Cada
+caché guarda hasta MAX_ENTRADAS objetos por id, con un índice usuario -> id, y
+descarta el menos usado cuando se llena.
+
+Coherencia:
+- Escritura en este proceso: los métodos crear_/actualizar_/eliminar_ de
+  PacienteDAO y MedicoDAO invalidan la entrada afectada después del commit.
+- Escritura desde otra conexión (otro proceso u otro hilo): se detecta con
+  `PRAGMA data_version`, que cambia en la conexión del hilo cada vez que otra
+  conexión confirma cambios en la base. En ese caso se vacía el caché entero,
+  porque SQLite no dice qué tabla cambió. También se vacía la primera vez que
+  consulta cada hilo, que todavía no tiene una versión con qué comparar.
+"""
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from Backend.BDD.Conexion import get_conexion
+
+MAX_ENTRADAS = int(os.environ.get('CACHE_ENTIDADES_MAX', 1000))
+
+
+def version_datos(conn):
+    """`PRAGMA data_version` de una conexión, o None si no se pudo leer."""
+    try:
+        return conn.execute("PRAGMA data_version").fetchone()[0]
+    except sqlite3.Error:
+        return None
+
+
+class CacheEntidades:
+    def __init__(self, nombre, max_entradas=MAX_ENTRADAS):
+        self.nombre = nombre
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()  # id -> objeto, del menos al más usado
+        self._por_usuario = {}  # usuario -> id
+        self._local = threading.local()  # (conexión, data_version) vistas por cada hilo
+        self._aciertos = 0
+        self._fallos = 0
+        self._vaciados_externos = 0
+        self._invalidaciones = 0  # sube con cada invalidación; ver marca()
+
+    # ---------------- coherencia entre conexiones ----------------
+    def _verificar_version(self):
+        conn = get_conexion()
+        if conn is None:
+            return
+        real = getattr(conn, '_real', conn)
+        version = version_datos(real)
+        anterior = getattr(self._local, 'vista', None)
+        self._local.vista = (real, version)
+        # La primera vez que consulta un hilo no se sabe qué cambió otro proceso
+        # desde que se guardaron las entradas: se vacía igual (una vez por hilo)
+        if anterior is None or anterior[0] is not real or anterior[1] != version or version is None:
+            with self._lock:
+                if self._entradas:
+                    self._vaciados_externos += 1
+                self._invalidaciones += 1
+                self._entradas.clear()
+                self._por_usuario.clear()
+
+    # ---------------- lecturas ----------------
+    def obtener(self, id_valor):
+        """Objeto cacheado con ese id, o None (cuenta acierto/fallo)."""
+        self._verificar_version()
+        with self._lock:
+            objeto = self._entradas.get(id_valor)
+            if objeto is None:
+                self._fallos += 1
+                return None
+            self._entradas.move_to_end(id_valor)
+            self._aciertos += 1
+            return objeto
+
+    def obtener_por_usuario(self, usuario):
+        self._verificar_version()
+        with self._lock:
+            id_valor = self._por_usuario.get(usuario)
+            objeto = self._entradas.get(id_valor) if id_valor is not None else None
+            if objeto is None:
+                self._fallos += 1
+                return None
+            self._entradas.move_to_end(id_valor)
+            self._aciertos += 1
+            return objeto
+
+    # ---------------- escrituras ----------------
+    def marca(self):
+        """Tomar antes de leer de la base; guardar() descarta lo leído si hubo invalidaciones."""
+        with self._lock:
+            return self._invalidaciones
+
+    def guardar(self, id_valor, objeto, usuario=None, marca=None):
+        with self._lock:
+            if marca is not None and marca != self._invalidaciones:
+                return  # se invalidó mientras se leía: el objeto puede estar viejo
+            self._entradas[id_valor] = objeto
+            self._entradas.move_to_end(id_valor)
+            if usuario is not None:
+                self._por_usuario[usuario] = id_valor
+            while len(self._entradas) > self.max_entradas:
+                _, viejo = self._entradas.popitem(last=False)
+                self._por_usuario.pop(getattr(viejo, 'usuario', None), None)
+
+    def invalidar(self, id_valor=None):
+        """Quita una entrada (o todas si no se indica id)."""
+        with self._lock:
+            self._invalidaciones += 1
+            if id_valor is None:
+                self._entradas.clear()
+                self._por_usuario.clear()
+                return
+            objeto = self._entradas.pop(id_valor, None)
+            if objeto is not None:
+                self._por_usuario.pop(getattr(objeto, 'usuario', None), None)
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self._aciertos + self._fallos
+            return {
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'aciertos': self._aciertos,
+                'fallos': self._fallos,
+                'tasa_aciertos': round(self._aciertos / consultas, 3) if consultas else None,
+                'vaciados_externos': self._vaciados_externos,
+            }
+
+
+cache_pacientes = CacheEntidades('Paciente')
+cache_medicos = CacheEntidades('Medico')
+
+
+def estadisticas():
+    """Tamaño y tasa de aciertos de los cachés de Paciente y Medico."""
+    return {c.nombre: c.estadisticas() for c in (cache_pacientes, cache_medicos)}
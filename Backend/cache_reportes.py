@@ -0,0 +1,164 @@
+"""
+Caché LRU de resultados de reportes y de sus gráficos.
+
+Los reportes se piden una y otra vez con el mismo rango de fechas; mientras
+nadie escriba en la base el resultado no cambia, así que no hace falta volver
+a ejecutar la consulta de agregación ni a armar el gráfico.
+
+- `cache_reportes`: resultados de los métodos `reporte_*` de los DAOs
+  (decorador `@reporte_cacheado`), por (método, argumentos). Se vacía entero
+  cuando cambia la base, detectado en la conexión del hilo que consulta:
+  `PRAGMA data_version` cambia cuando otra conexión confirma cambios y
+  `total_changes` cuando los hace la propia conexión (ver cache_entidades.py).
+- Gráficos: cada ventana de reportes crea su propio
+  `CacheReportes(..., seguir_base=False)` con las Figures de matplotlib ya
+  armadas, con los datos graficados como parte de la clave (si los datos son
+  los mismos el gráfico también, así que no necesita seguir a la base). Es por
+  ventana porque un FigureCanvasTkAgg se adueña de la Figure (`fig.canvas`):
+  dos ventanas no pueden mostrar la misma. `al_descartar` (p. ej. plt.close)
+  se llama con cada Figure que sale del caché.
+
+Los resultados vacíos no se guardan: los DAOs devuelven [] también ante un
+error de la base, y un reporte sin datos es rápido de recalcular.
+"""
+import os
+import functools
+import threading
+from collections import OrderedDict
+
+from Backend.BDD.Conexion import get_conexion
+from Backend.cache_entidades import version_datos
+
+MAX_REPORTES = int(os.environ.get('CACHE_REPORTES_MAX', 64))
+MAX_FIGURAS = int(os.environ.get('CACHE_FIGURAS_MAX', 12))
+
+_SIN_VALOR = object()
+
+
+class CacheReportes:
+    def __init__(self, nombre, max_entradas=MAX_REPORTES, seguir_base=True, al_descartar=None):
+        self.nombre = nombre
+        self.max_entradas = max_entradas
+        self.seguir_base = seguir_base
+        self.al_descartar = al_descartar  # al_descartar(valor) al quitar una entrada
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()  # clave -> valor, del menos al más usado
+        self._local = threading.local()  # (conexión, data_version, total_changes) vistos por cada hilo
+        self._invalidaciones = 0
+        self._aciertos = 0
+        self._fallos = 0
+        self._vaciados_por_cambios = 0
+
+    # ---------------- coherencia con la base ----------------
+    def _verificar_version(self):
+        if not self.seguir_base:
+            return
+        conn = get_conexion()
+        if conn is None:
+            return
+        real = getattr(conn, '_real', conn)
+        vista = (real, version_datos(real), real.total_changes)
+        anterior = getattr(self._local, 'vista', None)
+        self._local.vista = vista
+        # La primera vez que consulta un hilo no se sabe qué cambió antes: se
+        # vacía igual (pasa una vez por hilo del pool)
+        if anterior is None or anterior[0] is not real or anterior[1:] != vista[1:] or vista[1] is None:
+            with self._lock:
+                if self._entradas:
+                    self._vaciados_por_cambios += 1
+            self.invalidar()
+
+    # ---------------- acceso ----------------
+    def obtener(self, clave):
+        """Valor guardado para la clave, o _SIN_VALOR (cuenta acierto/fallo)."""
+        self._verificar_version()
+        with self._lock:
+            valor = self._entradas.get(clave, _SIN_VALOR)
+            if valor is _SIN_VALOR:
+                self._fallos += 1
+            else:
+                self._entradas.move_to_end(clave)
+                self._aciertos += 1
+            return valor
+
+    def marca(self):
+        """Tomar antes de calcular; guardar() descarta el valor si hubo invalidaciones."""
+        with self._lock:
+            return self._invalidaciones
+
+    def guardar(self, clave, valor, marca=None):
+        descartados = []
+        with self._lock:
+            if marca is not None and marca != self._invalidaciones:
+                return  # la base cambió mientras se calculaba
+            anterior = self._entradas.get(clave, _SIN_VALOR)
+            if anterior is not _SIN_VALOR and anterior is not valor:
+                descartados.append(anterior)
+            self._entradas[clave] = valor
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                descartados.append(self._entradas.popitem(last=False)[1])
+        self._descartar(descartados)
+
+    def obtener_o_calcular(self, clave, funcion, *args, **kwargs):
+        """Devuelve el valor guardado o calcula funcion(*args, **kwargs) y lo guarda si no es vacío."""
+        valor = self.obtener(clave)
+        if valor is not _SIN_VALOR:
+            return valor
+        marca = self.marca()
+        valor = funcion(*args, **kwargs)
+        if valor:
+            self.guardar(clave, valor, marca)
+        return valor
+
+    def invalidar(self):
+        with self._lock:
+            self._invalidaciones += 1
+            descartados = list(self._entradas.values())
+            self._entradas.clear()
+        self._descartar(descartados)
+
+    def _descartar(self, valores):
+        if self.al_descartar is None:
+            return
+        for valor in valores:
+            try:
+                self.al_descartar(valor)
+            except Exception as e:
+                print(f"Error descartando una entrada del caché '{self.nombre}': {e}")
+
+    def estadisticas(self):
+        with self._lock:
+            consultas = self._aciertos + self._fallos
+            return {
+                'entradas': len(self._entradas),
+                'max_entradas': self.max_entradas,
+                'aciertos': self._aciertos,
+                'fallos': self._fallos,
+                'tasa_aciertos': round(self._aciertos / consultas, 3) if consultas else None,
+                'vaciados_por_cambios': self._vaciados_por_cambios,
+            }
+
+
+cache_reportes = CacheReportes('reportes')
+
+
+def reporte_cacheado(metodo):
+    """
+    Decorador para métodos de reporte de un DAO: guarda el resultado por
+    (clase.método, argumentos). Las listas se devuelven copiadas para que
+    quien las reciba pueda modificarlas sin tocar el caché; por eso solo se usa
+    en reportes que devuelven tuplas, no objetos del modelo (que se modifican
+    en el lugar, p. ej. turno.id_consultorio en ABMTurnos).
+    """
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        clave = (metodo.__qualname__, args, tuple(sorted(kwargs.items())))
+        valor = cache_reportes.obtener_o_calcular(clave, metodo, self, *args, **kwargs)
+        return list(valor) if isinstance(valor, list) else valor
+    return envoltura
+
+
+def estadisticas():
+    """Tamaño y tasa de aciertos del caché de resultados de reportes."""
+    return {cache_reportes.nombre: cache_reportes.estadisticas()}
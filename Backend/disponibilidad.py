@@ -0,0 +1,344 @@
+"""
+Motor de disponibilidad de turnos basado en mapas de bits.
+
+Cada día de un médico se representa con enteros de Python usados como mapas de
+bits con resolución de minuto: el bit `m` corresponde al slot que empieza en el
+minuto `m` del día (0..1439).
+
+- laborable[(id_medico, dia_semana)]: inicios de slot (cada 30 min) dentro de sus franjas.
+- ocupado[(id_medico, fecha)]: inicios de los turnos reservados ese día.
+
+Los horarios libres de un día son `laborable & ~ocupado`. Las entradas se cargan
+de la base bajo demanda, tienen un tiempo de vida (para ver cambios hechos por
+otros procesos) y se actualizan en forma incremental desde TurnoDAO y
+FranjaHorariaDAO.
+"""
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from Backend.BDD.Conexion import get_conexion
+
+DURACION_SLOT_MINUTOS = 30
+TTL_CACHE = 60  # segundos
+MAX_DIAS_CACHE = 5000
+
+_HORAS = [f"{m // 60:02d}:{m % 60:02d}" for m in range(24 * 60)]
+
+
+def _minutos(hora):
+    """'HH:MM' o 'HH:MM:SS' -> minutos desde la medianoche."""
+    partes = str(hora).split(":")
+    return int(partes[0]) * 60 + int(partes[1])
+
+
+def _bits_franja(hora_inicio, hora_fin):
+    """
+    Inicios de turno dentro de una franja: en la grilla de 30 minutos (HH:00 o
+    HH:30, lo que exige TurnoDAO) y con el turno entero antes del fin. Una franja
+    vieja de 08:15 a 10:15 ofrece 08:30, 09:00 y 09:30.
+    """
+    inicio = -(-_minutos(hora_inicio) // DURACION_SLOT_MINUTOS) * DURACION_SLOT_MINUTOS
+    bits = 0
+    for m in range(inicio, _minutos(hora_fin) - DURACION_SLOT_MINUTOS + 1, DURACION_SLOT_MINUTOS):
+        bits |= 1 << m
+    return bits
+
+
+def _bits_a_minutos(bits):
+    """Recorre los bits encendidos de menor a mayor."""
+    while bits:
+        bajo = bits & -bits
+        yield bajo.bit_length() - 1
+        bits ^= bajo
+
+
+def _separar_fecha_hora(fecha_hora):
+    """'YYYY-MM-DD HH:MM[:SS]' -> ('YYYY-MM-DD', minuto_del_dia)."""
+    valor = str(fecha_hora)
+    return valor[:10], _minutos(valor[11:])
+
+
+def _dia_semana(fecha):
+    """'YYYY-MM-DD' -> día de la semana 1-7 (Lunes=1). Lanza ValueError si es inválida."""
+    return datetime.strptime(fecha, "%Y-%m-%d").weekday() + 1
+
+
+class MotorDisponibilidad:
+    """
+    Cache de disponibilidad por médico y día.
+    Responde "slots libres del médico X el día D" y "¿slot ocupado?" sin ir a la base
+    mientras las entradas estén vigentes.
+    """
+
+    def __init__(self, ttl=TTL_CACHE):
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        # id_medico -> (cargado_en, {dia_semana: bits})
+        self._laborable = {}
+        # (id_medico, fecha) -> [cargado_en, bits, info_por_minuto o None]
+        self._ocupado = {}
+
+    # --- Carga desde la base ---
+
+    def _cargar_laborable(self, id_medico):
+        conn = None
+        try:
+            conn = get_conexion()
+            cursor = conn.cursor()
+            cursor.execute("SELECT dia_semana, hora_inicio, hora_fin FROM FranjaHoraria WHERE id_medico = ?", (id_medico,))
+            por_dia = {}
+            for dia, hora_inicio, hora_fin in cursor.fetchall():
+                por_dia[dia] = por_dia.get(dia, 0) | _bits_franja(hora_inicio, hora_fin)
+            return por_dia
+        except (sqlite3.Error, ValueError, IndexError) as e:
+            print(f"Error al cargar franjas para disponibilidad: {e}")
+            return None
+        finally:
+            if conn: conn.close()
+
+    def _cargar_dia(self, id_medico, fecha, con_info=False):
+        # Import diferido: TurnoDAO importa este módulo
+        from Backend.DAO.TurnoDAO import _rango_dias
+        conn = None
+        try:
+            conn = get_conexion()
+            cursor = conn.cursor()
+            if con_info:
+                cursor.execute(
+                    "SELECT T.fecha_hora, T.id_turno, T.id_paciente, P.nombre, P.apellido "
+                    "FROM Turno T LEFT JOIN Paciente P ON T.id_paciente = P.id_paciente "
+                    "WHERE T.id_medico = ? AND T.fecha_hora >= ? AND T.fecha_hora < ?",
+                    (id_medico, *_rango_dias(fecha))
+                )
+            else:
+                cursor.execute(
+                    "SELECT fecha_hora FROM Turno WHERE id_medico = ? AND fecha_hora >= ? AND fecha_hora < ?",
+                    (id_medico, *_rango_dias(fecha))
+                )
+            bits = 0
+            info = {} if con_info else None
+            for fila in cursor.fetchall():
+                m = _minutos(fila[0][11:])
+                bits |= 1 << m
+                if con_info:
+                    info[m] = {'id_turno': fila[1], 'id_paciente': fila[2],
+                               'paciente_nombre': f"{fila[3]} {fila[4]}".strip()}
+            return bits, info
+        except (sqlite3.Error, ValueError, IndexError) as e:
+            print(f"Error al cargar turnos para disponibilidad: {e}")
+            return None
+        finally:
+            if conn: conn.close()
+
+    # --- Acceso a las entradas del cache ---
+
+    def _vigente(self, cargado_en):
+        return time.monotonic() - cargado_en < self.ttl
+
+    def _bits_laborables(self, id_medico, dia_semana):
+        with self._lock:
+            entrada = self._laborable.get(id_medico)
+            if entrada and self._vigente(entrada[0]):
+                return entrada[1].get(dia_semana, 0)
+        por_dia = self._cargar_laborable(id_medico)
+        if por_dia is None:
+            return None
+        with self._lock:
+            self._laborable[id_medico] = (time.monotonic(), por_dia)
+        return por_dia.get(dia_semana, 0)
+
+    def _entrada_dia(self, id_medico, fecha, con_info=False):
+        clave = (id_medico, fecha)
+        with self._lock:
+            entrada = self._ocupado.get(clave)
+            if entrada and self._vigente(entrada[0]) and (not con_info or entrada[2] is not None):
+                return entrada
+        cargado = self._cargar_dia(id_medico, fecha, con_info)
+        if cargado is None:
+            return None
+        entrada = [time.monotonic(), cargado[0], cargado[1]]
+        with self._lock:
+            if len(self._ocupado) >= MAX_DIAS_CACHE:
+                self._purgar_vencidos()
+            self._ocupado[clave] = entrada
+        return entrada
+
+    def _purgar_vencidos(self):
+        vencidas = [k for k, v in self._ocupado.items() if not self._vigente(v[0])]
+        for k in vencidas:
+            del self._ocupado[k]
+        if len(self._ocupado) >= MAX_DIAS_CACHE:
+            self._ocupado.clear()
+
+    # --- Consultas ---
+
+    def horarios_libres(self, id_medico, fecha):
+        """Lista de horarios 'HH:MM' libres del médico en la fecha ('YYYY-MM-DD')."""
+        laborable = self._bits_laborables(id_medico, _dia_semana(fecha))
+        if not laborable:
+            return []
+        entrada = self._entrada_dia(id_medico, fecha)
+        if entrada is None:
+            return []
+        return [_HORAS[m] for m in _bits_a_minutos(laborable & ~entrada[1])]
+
+    def horarios_con_estado(self, id_medico, fecha):
+        """Lista de (hora 'HH:MM', ocupado_bool, info o None) para todos los slots laborables del día."""
+        laborable = self._bits_laborables(id_medico, _dia_semana(fecha))
+        if not laborable:
+            return []
+        entrada = self._entrada_dia(id_medico, fecha, con_info=True)
+        if entrada is None:
+            return []
+        ocupado, info = entrada[1], entrada[2]
+        return [(_HORAS[m], bool(ocupado >> m & 1), info.get(m) if ocupado >> m & 1 else None)
+                for m in _bits_a_minutos(laborable)]
+
+    def slot_ocupado(self, id_medico, fecha_hora):
+        """True si el médico ya tiene un turno que empieza en fecha_hora."""
+        fecha, minuto = _separar_fecha_hora(fecha_hora)
+        entrada = self._entrada_dia(id_medico, fecha)
+        return bool(entrada and entrada[1] >> minuto & 1)
+
+    def slot_libre(self, id_medico, fecha_hora):
+        """True si fecha_hora es un inicio de slot laborable y sin turno para el médico."""
+        fecha, minuto = _separar_fecha_hora(fecha_hora)
+        laborable = self._bits_laborables(id_medico, _dia_semana(fecha))
+        if not laborable or not laborable >> minuto & 1:
+            return False
+        return not self.slot_ocupado(id_medico, fecha_hora)
+
+    def buscar_libres(self, ids_medicos, fecha_desde, fecha_hasta, cantidad=10, no_antes_de=None):
+        """
+        Primeros `cantidad` slots libres entre varios médicos en [fecha_desde, fecha_hasta] (date).
+        Usa dos consultas en total (franjas y turnos de todos los médicos en la ventana)
+        y deja los días cargados en el cache para las consultas individuales.
+        Retorna una lista de (fecha 'YYYY-MM-DD', hora 'HH:MM', id_medico) ordenada por fecha y hora.
+        """
+        # Import diferido: TurnoDAO importa este módulo
+        from Backend.DAO.TurnoDAO import _rango_dias
+        ids_medicos = list(dict.fromkeys(ids_medicos))
+        if not ids_medicos or cantidad <= 0 or fecha_desde > fecha_hasta:
+            return []
+
+        fechas = []
+        dia = fecha_desde
+        while dia <= fecha_hasta:
+            fechas.append(dia.strftime("%Y-%m-%d"))
+            dia += timedelta(days=1)
+
+        marcas = ",".join("?" * len(ids_medicos))
+        conn = None
+        try:
+            conn = get_conexion()
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id_medico, dia_semana, hora_inicio, hora_fin FROM FranjaHoraria WHERE id_medico IN ({marcas})", ids_medicos)
+            laborable = {id_medico: {} for id_medico in ids_medicos}
+            for id_medico, dia_semana, hora_inicio, hora_fin in cursor.fetchall():
+                laborable[id_medico][dia_semana] = laborable[id_medico].get(dia_semana, 0) | _bits_franja(hora_inicio, hora_fin)
+
+            cursor.execute(
+                f"SELECT id_medico, fecha_hora FROM Turno WHERE id_medico IN ({marcas}) AND fecha_hora >= ? AND fecha_hora < ?",
+                (*ids_medicos, *_rango_dias(fechas[0], fechas[-1]))
+            )
+            ocupado = {}
+            for id_medico, fecha_hora in cursor.fetchall():
+                fecha, minuto = _separar_fecha_hora(fecha_hora)
+                ocupado[(id_medico, fecha)] = ocupado.get((id_medico, fecha), 0) | 1 << minuto
+        except (sqlite3.Error, ValueError, IndexError) as e:
+            print(f"Error al buscar horarios libres: {e}")
+            return []
+        finally:
+            if conn: conn.close()
+
+        ahora = time.monotonic()
+        with self._lock:
+            for id_medico, por_dia in laborable.items():
+                self._laborable[id_medico] = (ahora, por_dia)
+            if len(self._ocupado) + len(ids_medicos) * len(fechas) >= MAX_DIAS_CACHE:
+                self._purgar_vencidos()
+            for id_medico in ids_medicos:
+                for fecha in fechas:
+                    self._ocupado[(id_medico, fecha)] = [ahora, ocupado.get((id_medico, fecha), 0), None]
+
+        limite = None
+        if no_antes_de is not None:
+            limite = (no_antes_de.strftime("%Y-%m-%d"), no_antes_de.hour * 60 + no_antes_de.minute)
+
+        resultado = []
+        for fecha in fechas:
+            dia_semana = _dia_semana(fecha)
+            del_dia = []
+            for id_medico in ids_medicos:
+                libres = laborable[id_medico].get(dia_semana, 0) & ~ocupado.get((id_medico, fecha), 0)
+                if limite and fecha == limite[0]:
+                    libres &= ~((1 << limite[1]) - 1)
+                elif limite and fecha < limite[0]:
+                    libres = 0
+                del_dia.extend((m, id_medico) for m in _bits_a_minutos(libres))
+            del_dia.sort()
+            resultado.extend((fecha, _HORAS[m], id_medico) for m, id_medico in del_dia)
+            if len(resultado) >= cantidad:
+                break
+        return resultado[:cantidad]
+
+    # --- Actualización incremental ---
+
+    def registrar_turno(self, id_medico, fecha_hora):
+        """Marca ocupado el slot de un turno recién creado (si el día está en cache)."""
+        fecha, minuto = _separar_fecha_hora(fecha_hora)
+        with self._lock:
+            entrada = self._ocupado.get((id_medico, fecha))
+            if entrada:
+                entrada[1] |= 1 << minuto
+                entrada[2] = None  # la info de pacientes se recarga al pedirla
+
+    def liberar_turno(self, id_medico, fecha_hora):
+        """Libera el slot de un turno cancelado o movido (si el día está en cache)."""
+        fecha, minuto = _separar_fecha_hora(fecha_hora)
+        with self._lock:
+            entrada = self._ocupado.get((id_medico, fecha))
+            if entrada:
+                entrada[1] &= ~(1 << minuto)
+                entrada[2] = None
+
+    def invalidar_franjas(self, id_medico=None):
+        """Descarta las franjas laborales cacheadas (de un médico o de todos)."""
+        with self._lock:
+            if id_medico is None:
+                self._laborable.clear()
+            else:
+                self._laborable.pop(id_medico, None)
+
+    def invalidar_medico(self, id_medico):
+        """Descarta todo lo cacheado de un médico."""
+        with self._lock:
+            self._laborable.pop(id_medico, None)
+            for clave in [k for k in self._ocupado if k[0] == id_medico]:
+                del self._ocupado[clave]
+
+    def invalidar_turnos(self):
+        """Descarta todos los días cacheados (borrados masivos de turnos)."""
+        with self._lock:
+            self._ocupado.clear()
+
+    def invalidar(self):
+        with self._lock:
+            self._laborable.clear()
+            self._ocupado.clear()
+
+
+_motor = None
+_motor_lock = threading.Lock()
+
+
+def get_motor():
+    """Devuelve el motor de disponibilidad compartido por la aplicación."""
+    global _motor
+    if _motor is None:
+        with _motor_lock:
+            if _motor is None:
+                _motor = MotorDisponibilidad()
+    return _motor
@@ -0,0 +1,68 @@
+"""
+Conversión de filas de SQLite a objetos del modelo, por nombre de columna.
+
+Los DAOs armaban cada objeto a mano con índices (`fila[0]`, `fila[1]`...), lo
+que se rompe si la tabla tiene las columnas en otro orden (por ejemplo una
+base creada antes de una migración) y repite 13 argumentos por Paciente.
+
+`mapeador(modelo, cursor.description)` devuelve una función fila -> objeto
+compilada para esa combinación de columnas: asigna directamente cada atributo
+de `__slots__` del modelo desde la posición de la columna con el mismo nombre
+(o el nombre indicado en `alias`) y deja en None los que la consulta no trae.
+La función se genera una sola vez por (modelo, columnas) y se reutiliza en
+todas las consultas iguales.
+"""
+import threading
+
+_mapeadores = {}  # (modelo, columnas, alias) -> función
+_lock = threading.Lock()
+
+
+def _compilar(modelo, columnas, alias):
+    posiciones = {}
+    for i, columna in enumerate(columnas):
+        atributo = alias.get(columna, columna)
+        # Con columnas repetidas (p. ej. m.nombre y e.nombre en un JOIN) gana la primera
+        if atributo in modelo.__slots__ and atributo not in posiciones:
+            posiciones[atributo] = i
+    lineas = ["def mapear(fila):", "    objeto = _nuevo(_modelo)"]
+    for atributo in modelo.__slots__:
+        valor = f"fila[{posiciones[atributo]}]" if atributo in posiciones else "None"
+        lineas.append(f"    objeto.{atributo} = {valor}")
+    lineas.append("    return objeto")
+    espacio = {'_nuevo': object.__new__, '_modelo': modelo}
+    exec("\n".join(lineas), espacio)
+    return espacio['mapear']
+
+
+def mapeador(modelo, descripcion, alias=None):
+    """
+    Función fila -> objeto `modelo` para las columnas de `descripcion`
+    (cursor.description o una lista de nombres de columna). `alias` traduce
+    columnas a atributos cuando no se llaman igual, p. ej.
+    {'estado': 'id_estado'} para Receta.
+    """
+    columnas = tuple(d if isinstance(d, str) else d[0] for d in descripcion)
+    clave = (modelo, columnas, tuple(sorted(alias.items())) if alias else None)
+    funcion = _mapeadores.get(clave)
+    if funcion is None:
+        with _lock:
+            funcion = _mapeadores.get(clave)
+            if funcion is None:
+                funcion = _mapeadores[clave] = _compilar(modelo, columnas, alias or {})
+    return funcion
+
+
+def mapear_fila(modelo, cursor, fila, alias=None):
+    """Objeto para una fila de `cursor` (None si la fila es None)."""
+    if fila is None:
+        return None
+    return mapeador(modelo, cursor.description, alias)(fila)
+
+
+def mapear_filas(modelo, cursor, filas=None, alias=None):
+    """Lista de objetos para `filas` (por defecto, el resto de `cursor.fetchall()`)."""
+    if filas is None:
+        filas = cursor.fetchall()
+    mapear = mapeador(modelo, cursor.description, alias)
+    return [mapear(fila) for fila in filas]
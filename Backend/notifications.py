@@ -1,15 +1,18 @@
 import os
 import time
+import heapq
+import queue
+import random
+import sqlite3
 import smtplib
 from email.mime.text import MIMEText
-from threading import Thread
+from threading import Thread, Lock, Event, local
 from datetime import datetime, timedelta
 
 from Backend.DAO.TurnoDAO import TurnoDAO
 from Backend.DAO.PacienteDAO import PacienteDAO
 from Backend.DAO.MedicoDAO import MedicoDAO
-from Backend.DAO.ConsultorioDAO import ConsultorioDAO
-from Backend.BDD.Conexion import get_conexion
+from Backend.BDD.Conexion import get_conexion, HILOS_EMAIL
 
 
 # Configuración leída desde variables de entorno
@@ -20,78 +23,148 @@ EMAIL_USER = os.environ.get('EMAIL_USER', 'mateo.bianchi78@gmail.com')
 EMAIL_PASS = os.environ.get('EMAIL_PASS', 'ignfrjkimrylpdjf')
 EMAIL_FROM = os.environ.get('EMAIL_FROM', EMAIL_USER)
 EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True').lower() in ('1', 'true', 'yes')
+# 'starttls', 'ssl' o 'ninguna' (solo para servidores locales de prueba); por defecto según EMAIL_USE_TLS
+EMAIL_SEGURIDAD = os.environ.get('EMAIL_SEGURIDAD', '')
+# Mensajes enviados por una misma sesión SMTP antes de reconectar (muchos servidores cortan antes de ~100)
+EMAIL_MAX_POR_SESION = int(os.environ.get('EMAIL_MAX_POR_SESION', '50'))
+# Una sesión ociosa más de este tiempo se descarta: el servidor probablemente ya la cerró
+EMAIL_SESION_OCIOSA = 60
+EMAIL_TIMEOUT = 10           # segundos por operación SMTP (conexión, login, envío)
+
+# Despachador del outbox
+EMAIL_WORKERS = HILOS_EMAIL  # variable EMAIL_WORKERS; el pool de conexiones se dimensiona con ella
+EMAIL_MAX_INTENTOS = int(os.environ.get('EMAIL_MAX_INTENTOS', '6'))
+EMAIL_BACKOFF_BASE = 30      # segundos hasta el primer reintento
+EMAIL_BACKOFF_MAX = 3600     # tope de espera entre reintentos
+EMAIL_POLL_SEGUNDOS = 30     # revisión periódica aunque nadie despierte al despachador
+# Un mensaje 'enviando' reclamado hace más que esto se da por abandonado (el puesto
+# que lo reclamó se cerró) y vuelve a pendiente. Cubre con margen la espera en la cola
+# del worker (dos mensajes por worker) más conexión, login y envío con reconexión.
+EMAIL_RECLAMO_VENCE = timedelta(seconds=30 * EMAIL_TIMEOUT)
+
+# Recordatorios: anticipaciones separadas por coma (ej. "48h,2h"; también "30m" o "1d")
+RECORDATORIO_OFFSETS = os.environ.get('RECORDATORIO_OFFSETS', '24h')
+# Un recordatorio atrasado (app cerrada, barrido demorado) se envía igual si no pasó más que esto
+RECORDATORIO_TOLERANCIA = timedelta(hours=int(os.environ.get('RECORDATORIO_TOLERANCIA_HORAS', '6')))
+RECORDATORIO_BLOQUE = timedelta(hours=6)      # vencimientos que se cargan por vez en el heap
+RECORDATORIO_ESPERA_MAX = 3600                # segundos; se revisa al menos una vez por hora
+
+
+class TransporteSMTP:
+    """
+    Sesión SMTP autenticada que se reutiliza para muchos mensajes.
+    Conecta (EHLO, STARTTLS, login) recién al primer envío, reconecta si el servidor
+    cortó la sesión y la renueva cada `max_por_sesion` mensajes o si quedó ociosa.
+    No es thread-safe: cada hilo usa la suya (ver `_transporte()`).
+    """
 
-
-def _ensure_table():
-    conn = None
-    try:
-        conn = get_conexion()
-        cur = conn.cursor()
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS NotificacionTurno (
-                id_turno INTEGER PRIMARY KEY,
-                enviado_en TEXT
-            )
-        """)
-        conn.commit()
-    except Exception as e:
-        print(f"Error creando tabla de notificaciones: {e}")
-    finally:
-        if conn: conn.close()
-
-
-def _already_sent(id_turno):
-    conn = None
-    try:
-        conn = get_conexion()
-        cur = conn.cursor()
-        cur.execute("SELECT 1 FROM NotificacionTurno WHERE id_turno = ?", (id_turno,))
-        return cur.fetchone() is not None
-    except Exception as e:
-        print(f"Error comprobando notificación existente: {e}")
-        return False
-    finally:
-        if conn: conn.close()
-
-
-def _mark_sent(id_turno):
-    conn = None
-    try:
-        conn = get_conexion()
-        cur = conn.cursor()
-        cur.execute("INSERT OR REPLACE INTO NotificacionTurno (id_turno, enviado_en) VALUES (?, ?)", (id_turno, datetime.now().isoformat()))
-        conn.commit()
-    except Exception as e:
-        print(f"Error registrando notificación enviada: {e}")
-    finally:
-        if conn: conn.close()
-
-
-def _send_email(to_email, subject, body):
+    def __init__(self, host=None, port=None, usuario=None, clave=None, remitente=None,
+                 seguridad=None, max_por_sesion=None, timeout=EMAIL_TIMEOUT):
+        self.host = host if host is not None else EMAIL_HOST
+        self.port = port if port is not None else EMAIL_PORT
+        self.usuario = usuario if usuario is not None else EMAIL_USER
+        self.clave = clave if clave is not None else EMAIL_PASS
+        self.remitente = remitente if remitente is not None else EMAIL_FROM
+        self.seguridad = seguridad or EMAIL_SEGURIDAD or ('starttls' if EMAIL_USE_TLS else 'ssl')
+        self.max_por_sesion = max(1, max_por_sesion if max_por_sesion is not None else EMAIL_MAX_POR_SESION)
+        self.timeout = timeout
+        self._server = None
+        self._enviados = 0
+        self._ultimo_uso = 0.0
+        self.sesiones = 0  # cantidad de conexiones abiertas (para diagnóstico)
+
+    def _conectar(self):
+        if self.seguridad == 'ssl':
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            server.ehlo()
+            if self.seguridad == 'starttls':
+                server.starttls()
+                server.ehlo()
+        if self.usuario:
+            server.login(self.usuario, self.clave)
+        self._server = server
+        self._enviados = 0
+        self.sesiones += 1
+
+    def cerrar(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                try:
+                    self._server.close()
+                except Exception:
+                    pass
+        self._server = None
+        self._enviados = 0
+
+    def enviar(self, to_email, subject, body):
+        """Envía un mensaje por la sesión actual. Lanza la excepción si falla aun después de reconectar."""
+        msg = MIMEText(body)
+        msg['Subject'] = subject
+        msg['From'] = self.remitente
+        msg['To'] = to_email
+        contenido = msg.as_string()
+
+        if self._server is not None and (self._enviados >= self.max_por_sesion
+                                         or time.monotonic() - self._ultimo_uso > EMAIL_SESION_OCIOSA):
+            self.cerrar()
+        for intento in (1, 2):
+            if self._server is None:
+                self._conectar()
+            try:
+                self._server.sendmail(self.remitente, [to_email], contenido)
+                self._enviados += 1
+                self._ultimo_uso = time.monotonic()
+                return
+            except (smtplib.SMTPServerDisconnected, OSError):
+                # La sesión se cayó (timeout del servidor, red): se reconecta una vez
+                self.cerrar()
+                if intento == 2:
+                    raise
+            except smtplib.SMTPResponseException as e:
+                # 421: el servidor cierra la sesión; otros errores (destinatario, etc.) no se arreglan reconectando
+                self.cerrar()
+                if e.smtp_code != 421 or intento == 2:
+                    raise
+
+
+_transportes = local()
+
+
+def _transporte():
+    """Transporte SMTP del hilo actual (una sesión por worker del despachador, otra para la interfaz, etc.)."""
+    transporte = getattr(_transportes, 'smtp', None)
+    if transporte is None:
+        transporte = _transportes.smtp = TransporteSMTP()
+    return transporte
+
+
+def cerrar_transporte():
+    """Cierra la sesión SMTP del hilo actual, si hay una abierta."""
+    transporte = getattr(_transportes, 'smtp', None)
+    if transporte is not None:
+        transporte.cerrar()
+        _transportes.smtp = None
+
+
+def _entregar(to_email, subject, body):
+    """Envía un email por SMTP. Lanza la excepción si falla (la usa el despachador para reintentar)."""
     if not EMAIL_HOST or not EMAIL_PORT or not EMAIL_USER or not EMAIL_PASS:
         # Modo seguro: si no hay configuración SMTP, solo loguear el mail
         print("[Notificaciones] SMTP no configurado. Mostrando email en consola:")
         print(f"Para: {to_email}\nAsunto: {subject}\n\n{body}\n")
-        return True
+        return
 
-    msg = MIMEText(body)
-    msg['Subject'] = subject
-    msg['From'] = EMAIL_FROM
-    msg['To'] = to_email
+    _transporte().enviar(to_email, subject, body)
+    print(f"[Notificaciones] Email enviado a {to_email}")
 
-    try:
-        if EMAIL_USE_TLS:
-            server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT, timeout=10)
-            server.ehlo()
-            server.starttls()
-            server.ehlo()
-        else:
-            server = smtplib.SMTP_SSL(EMAIL_HOST, EMAIL_PORT, timeout=10)
 
-        server.login(EMAIL_USER, EMAIL_PASS)
-        server.sendmail(EMAIL_FROM, [to_email], msg.as_string())
-        server.quit()
-        print(f"[Notificaciones] Email enviado a {to_email}")
+def _send_email(to_email, subject, body):
+    try:
+        _entregar(to_email, subject, body)
         return True
     except Exception as e:
         print(f"[Notificaciones] Error enviando email a {to_email}: {e}")
@@ -115,6 +188,38 @@ def send_welcome_email(to_email, username, password, nombre=None):
     return _send_email(to_email, subject, body)
 
 
+def _formatear_hora(fecha_hora):
+    try:
+        return datetime.strptime(fecha_hora, "%Y-%m-%d %H:%M:%S").strftime('%Y-%m-%d %H:%M')
+    except Exception:
+        return str(fecha_hora)
+
+
+def _texto_turno_creado(paciente_nombre, medico_nombre, fecha_hora):
+    subject = "Turno confirmado"
+    body = (
+        f"Hola {paciente_nombre},\n\n"
+        f"Su turno ha sido registrado con éxito.\n\n"
+        f"Fecha y hora: {_formatear_hora(fecha_hora)}\n"
+        f"Médico: {medico_nombre}\n\n"
+        "Si desea cancelar el turno puede hacerlo desde la plataforma o contactando al centro.\n\n"
+        "Saludos,\nEl equipo de la clínica"
+    )
+    return subject, body
+
+
+def _texto_turno_cancelado(paciente_nombre, medico_nombre, fecha_hora, motivo, quien):
+    subject = "Turno cancelado"
+    body = (
+        f"Hola {paciente_nombre},\n\n"
+        f"Le informamos que su turno programado para {_formatear_hora(fecha_hora)} con {medico_nombre} ha sido CANCELADO por {quien}.\n\n"
+        f"Motivo: {motivo or 'No especificado'}\n\n"
+        "Si lo desea, puede solicitar un nuevo turno desde la plataforma.\n\n"
+        "Saludos,\nEl equipo de la clínica"
+    )
+    return subject, body
+
+
 def send_turno_created(id_turno):
     """Envía email al paciente informando que se creó un turno (usa id_turno para recuperar datos)."""
     try:
@@ -128,28 +233,253 @@ def send_turno_created(id_turno):
             print(f"[Notificaciones] Paciente sin email para turno {id_turno}")
             return False
 
-        hora = None
-        try:
-            hora = datetime.strptime(turno.fecha_hora, "%Y-%m-%d %H:%M:%S").strftime('%Y-%m-%d %H:%M')
-        except Exception:
-            hora = str(turno.fecha_hora)
-
         medico_nombre = f"{medico.nombre} {medico.apellido}" if medico else "el médico"
-        subject = "Turno confirmado"
-        body = (
-            f"Hola {paciente.nombre} {paciente.apellido},\n\n"
-            f"Su turno ha sido registrado con éxito.\n\n"
-            f"Fecha y hora: {hora}\n"
-            f"Médico: {medico_nombre}\n\n"
-            "Si desea cancelar el turno puede hacerlo desde la plataforma o contactando al centro.\n\n"
-            "Saludos,\nEl equipo de la clínica"
-        )
+        subject, body = _texto_turno_creado(f"{paciente.nombre} {paciente.apellido}", medico_nombre, turno.fecha_hora)
         return _send_email(paciente.email, subject, body)
     except Exception as e:
         print(f"[Notificaciones] Error al preparar email de turno creado: {e}")
         return False
 
 
+# --- OUTBOX DE EMAILS ---
+# Los DAOs escriben el mensaje ya armado en OutboxEmail dentro de la misma
+# transacción que crea o cancela el turno; el despachador lo entrega después,
+# con reintentos, sin que la reserva espere al servidor de correo.
+
+def encolar_email(cursor, destinatario, asunto, cuerpo, tipo=None, id_turno=None):
+    """Agrega un email al outbox usando el cursor (y la transacción) de quien llama. No hace commit."""
+    ahora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    cursor.execute(
+        "INSERT INTO OutboxEmail (destinatario, asunto, cuerpo, tipo, id_turno, proximo_intento, creado_en) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (destinatario, asunto, cuerpo, tipo, id_turno, ahora, ahora)
+    )
+
+
+def _datos_turnos(cursor, ids_turnos):
+    """id_turno -> (fecha_hora, motivo, paciente_nombre, paciente_email, medico_nombre), en una consulta."""
+    ids_turnos = list(ids_turnos)
+    if not ids_turnos:
+        return {}
+    cursor.execute(
+        "SELECT T.id_turno, T.fecha_hora, T.motivo, P.nombre, P.apellido, P.email, M.nombre, M.apellido "
+        "FROM Turno T LEFT JOIN Paciente P ON T.id_paciente = P.id_paciente "
+        "LEFT JOIN Medico M ON T.id_medico = M.id_medico "
+        f"WHERE T.id_turno IN ({','.join('?' * len(ids_turnos))})",
+        ids_turnos
+    )
+    return {f[0]: (f[1], f[2], f"{f[3]} {f[4]}", f[5], f"{f[6]} {f[7]}" if f[6] else "el médico")
+            for f in cursor.fetchall()}
+
+
+def encolar_turnos_creados(cursor, ids_turnos):
+    """Encola el aviso de creación de cada turno (deben estar insertados en la transacción actual)."""
+    filas = []
+    ahora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    for id_turno, (fecha_hora, _, paciente_nombre, email, medico_nombre) in _datos_turnos(cursor, ids_turnos).items():
+        if not email:
+            print(f"[Notificaciones] Paciente sin email para turno {id_turno}")
+            continue
+        subject, body = _texto_turno_creado(paciente_nombre, medico_nombre, fecha_hora)
+        filas.append((email, subject, body, 'turno_creado', id_turno, ahora, ahora))
+    cursor.executemany(
+        "INSERT INTO OutboxEmail (destinatario, asunto, cuerpo, tipo, id_turno, proximo_intento, creado_en) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        filas
+    )
+
+
+def encolar_turno_cancelado(cursor, id_turno, quien='El sistema'):
+    """Encola el aviso de cancelación; llamar antes del DELETE, dentro de la misma transacción."""
+    datos = _datos_turnos(cursor, [id_turno]).get(id_turno)
+    if not datos:
+        return
+    fecha_hora, motivo, paciente_nombre, email, medico_nombre = datos
+    if not email:
+        print(f"[Notificaciones] Paciente sin email para turno {id_turno}")
+        return
+    subject, body = _texto_turno_cancelado(paciente_nombre, medico_nombre, fecha_hora, motivo, quien)
+    encolar_email(cursor, email, subject, body, 'turno_cancelado', id_turno)
+
+
+def _segundos_backoff(intentos):
+    """Espera exponencial (con algo de azar) antes del siguiente reintento."""
+    espera = min(EMAIL_BACKOFF_BASE * (2 ** max(intentos - 1, 0)), EMAIL_BACKOFF_MAX)
+    return espera * random.uniform(0.8, 1.2)
+
+
+class DespachadorOutbox:
+    """
+    Entrega los emails pendientes de OutboxEmail con un hilo que reclama mensajes
+    vencidos y varios hilos trabajadores que los envían. Los fallos se reintentan
+    con espera exponencial hasta EMAIL_MAX_INTENTOS; después quedan como 'fallido'.
+
+    Varios puestos pueden compartir la base, cada uno con su despachador: un
+    reclamo guarda `reclamado_en` y solo se recupera cuando pasó
+    EMAIL_RECLAMO_VENCE, así un puesto que arranca no reenvía lo que otro
+    todavía está enviando.
+    """
+
+    def __init__(self, workers=EMAIL_WORKERS, max_intentos=EMAIL_MAX_INTENTOS):
+        self.workers = max(1, workers)
+        self.max_intentos = max_intentos
+        self._cola = queue.Queue()
+        self._despertar = Event()
+        self._detener = Event()
+        self._hilos = []
+
+    def iniciar(self):
+        self._hilos = [Thread(target=self._loop_reclamar, name="outbox-despachador", daemon=True)]
+        self._hilos += [Thread(target=self._loop_enviar, name=f"outbox-worker-{i}", daemon=True) for i in range(self.workers)]
+        for hilo in self._hilos:
+            hilo.start()
+        print(f"[Notificaciones] Despachador de outbox iniciado ({self.workers} workers).")
+
+    def despertar(self):
+        self._despertar.set()
+
+    def detener(self, timeout=5):
+        self._detener.set()
+        self._despertar.set()
+        for _ in range(self.workers):
+            self._cola.put(None)
+        for hilo in self._hilos:
+            hilo.join(timeout)
+
+    def _recuperar_interrumpidos(self, cur, ahora):
+        """Mensajes con el reclamo vencido (cierre abrupto de su puesto) vuelven a pendientes."""
+        vencido = (ahora - EMAIL_RECLAMO_VENCE).strftime("%Y-%m-%d %H:%M:%S")
+        cur.execute(
+            "UPDATE OutboxEmail SET estado = 'pendiente', reclamado_en = NULL "
+            "WHERE estado = 'enviando' AND (reclamado_en IS NULL OR reclamado_en < ?)",
+            (vencido,)
+        )
+
+    def _reclamar(self, limite):
+        """Marca como 'enviando' hasta `limite` mensajes vencidos y los devuelve."""
+        conn = None
+        try:
+            conn = get_conexion()
+            cur = conn.cursor()
+            momento = datetime.now()
+            ahora = momento.strftime("%Y-%m-%d %H:%M:%S")
+            cur.execute("BEGIN IMMEDIATE")
+            self._recuperar_interrumpidos(cur, momento)
+            cur.execute(
+                "SELECT id_mensaje, destinatario, asunto, cuerpo, intentos FROM OutboxEmail "
+                "WHERE estado = 'pendiente' AND proximo_intento <= ? ORDER BY proximo_intento, id_mensaje LIMIT ?",
+                (ahora, limite)
+            )
+            mensajes = cur.fetchall()
+            cur.executemany("UPDATE OutboxEmail SET estado = 'enviando', reclamado_en = ? WHERE id_mensaje = ?",
+                            [(ahora, m[0]) for m in mensajes])
+            conn.commit()
+            return mensajes
+        except sqlite3.Error as e:
+            if conn: conn.rollback()
+            print(f"[Notificaciones] Error leyendo el outbox: {e}")
+            return []
+        finally:
+            if conn: conn.close()
+
+    def _segundos_hasta_proximo(self):
+        conn = None
+        try:
+            conn = get_conexion()
+            fila = conn.execute("SELECT MIN(proximo_intento) FROM OutboxEmail WHERE estado = 'pendiente'").fetchone()
+            if not fila or not fila[0]:
+                return EMAIL_POLL_SEGUNDOS
+            proximo = datetime.strptime(fila[0], "%Y-%m-%d %H:%M:%S")
+            return min(max((proximo - datetime.now()).total_seconds(), 0.05), EMAIL_POLL_SEGUNDOS)
+        except (sqlite3.Error, ValueError) as e:
+            print(f"[Notificaciones] Error consultando el outbox: {e}")
+            return EMAIL_POLL_SEGUNDOS
+        finally:
+            if conn: conn.close()
+
+    def _loop_reclamar(self):
+        while not self._detener.is_set():
+            self._despertar.clear()
+            mensajes = self._reclamar(self.workers * 2) if self._cola.qsize() < self.workers else []
+            for mensaje in mensajes:
+                self._cola.put(mensaje)
+            if len(mensajes) < self.workers * 2:
+                self._despertar.wait(self._segundos_hasta_proximo())
+
+    def _loop_enviar(self):
+        while True:
+            try:
+                mensaje = self._cola.get(timeout=EMAIL_SESION_OCIOSA)
+            except queue.Empty:
+                # Sin trabajo: liberar la sesión SMTP de este worker
+                cerrar_transporte()
+                continue
+            if mensaje is None:
+                cerrar_transporte()
+                break
+            id_mensaje, destinatario, asunto, cuerpo, intentos = mensaje
+            try:
+                _entregar(destinatario, asunto, cuerpo)
+                self._registrar(id_mensaje, intentos + 1, None)
+            except Exception as e:
+                print(f"[Notificaciones] Error enviando email a {destinatario} (intento {intentos + 1}): {e}")
+                self._registrar(id_mensaje, intentos + 1, str(e))
+            finally:
+                self._cola.task_done()
+                # Avisar al despachador que hay lugar para más mensajes
+                self._despertar.set()
+
+    def _registrar(self, id_mensaje, intentos, error):
+        conn = None
+        try:
+            conn = get_conexion()
+            ahora = datetime.now()
+            if error is None:
+                conn.execute("UPDATE OutboxEmail SET estado = 'enviado', intentos = ?, enviado_en = ?, ultimo_error = NULL WHERE id_mensaje = ?",
+                             (intentos, ahora.strftime("%Y-%m-%d %H:%M:%S"), id_mensaje))
+            elif intentos >= self.max_intentos:
+                conn.execute("UPDATE OutboxEmail SET estado = 'fallido', intentos = ?, ultimo_error = ? WHERE id_mensaje = ?",
+                             (intentos, error, id_mensaje))
+            else:
+                proximo = ahora + timedelta(seconds=_segundos_backoff(intentos))
+                conn.execute("UPDATE OutboxEmail SET estado = 'pendiente', intentos = ?, ultimo_error = ?, proximo_intento = ? WHERE id_mensaje = ?",
+                             (intentos, error, proximo.strftime("%Y-%m-%d %H:%M:%S"), id_mensaje))
+            conn.commit()
+        except sqlite3.Error as e:
+            if conn: conn.rollback()
+            print(f"[Notificaciones] Error actualizando el outbox: {e}")
+        finally:
+            if conn: conn.close()
+
+
+_despachador = None
+_despachador_lock = Lock()
+
+
+def iniciar_despachador(workers=EMAIL_WORKERS):
+    """Inicia (una sola vez) el despachador del outbox en segundo plano."""
+    global _despachador
+    with _despachador_lock:
+        if _despachador is None:
+            _despachador = DespachadorOutbox(workers)
+            _despachador.iniciar()
+    return _despachador
+
+
+def despertar_despachador():
+    """Avisa que hay mensajes nuevos en el outbox (no hace nada si el despachador no corre)."""
+    if _despachador is not None:
+        _despachador.despertar()
+
+
+def detener_despachador(timeout=5):
+    global _despachador
+    with _despachador_lock:
+        if _despachador is not None:
+            _despachador.detener(timeout)
+            _despachador = None
+
+
 def send_turno_cancelled(turno_or_id, quien='El sistema'):
     """Envía email al paciente informando que su turno fue cancelado.
 
@@ -173,106 +503,246 @@ def send_turno_cancelled(turno_or_id, quien='El sistema'):
             print(f"[Notificaciones] Paciente sin email para turno {getattr(turno, 'id_turno', 'N/A')}")
             return False
 
-        hora = None
-        try:
-            hora = datetime.strptime(turno.fecha_hora, "%Y-%m-%d %H:%M:%S").strftime('%Y-%m-%d %H:%M')
-        except Exception:
-            hora = str(turno.fecha_hora)
-
         medico_nombre = f"{medico.nombre} {medico.apellido}" if medico else "el médico"
-        subject = "Turno cancelado"
-        body = (
-            f"Hola {paciente.nombre} {paciente.apellido},\n\n"
-            f"Le informamos que su turno programado para {hora} con {medico_nombre} ha sido CANCELADO por {quien}.\n\n"
-            f"Motivo: {turno.motivo or 'No especificado'}\n\n"
-            "Si lo desea, puede solicitar un nuevo turno desde la plataforma.\n\n"
-            "Saludos,\nEl equipo de la clínica"
-        )
+        subject, body = _texto_turno_cancelado(f"{paciente.nombre} {paciente.apellido}", medico_nombre, turno.fecha_hora, turno.motivo, quien)
         return _send_email(paciente.email, subject, body)
     except Exception as e:
         print(f"[Notificaciones] Error al preparar email de turno cancelado: {e}")
         return False
 
 
-def _find_and_send(window_start_dt, window_end_dt):
-    """Busca turnos cuya fecha_hora esté entre window_start_dt y window_end_dt y envía notificaciones."""
-    # Usamos TurnoDAO para obtener turnos del día (optimización simple)
-    fecha_str = window_start_dt.strftime("%Y-%m-%d")
-    turnos = TurnoDAO().obtener_turnos_por_fecha(fecha_str)
-
-    paciente_dao = PacienteDAO()
-    medico_dao = MedicoDAO()
-    consultorio_dao = ConsultorioDAO()
-
-    for t in turnos:
-        try:
-            turno_dt = datetime.strptime(t.fecha_hora, "%Y-%m-%d %H:%M:%S")
-        except Exception:
-            try:
-                turno_dt = datetime.strptime(t.fecha_hora, "%Y-%m-%d %H:%M")
-            except Exception:
-                print(f"[Notificaciones] Fecha inválida para turno {t}")
-                continue
-
-        if not (window_start_dt <= turno_dt < window_end_dt):
-            continue
-
-        if _already_sent(t.id_turno):
-            print(f"[Notificaciones] Ya se envió notificación para turno {t.id_turno}")
-            continue
-
-        paciente = paciente_dao.buscar_paciente_por_id_paciente(t.id_paciente)
-        medico = medico_dao.obtener_medico_por_id(t.id_medico)
-        consultorio_desc = None
-        if hasattr(t, 'id_consultorio') and t.id_consultorio:
-            cons = consultorio_dao.obtener_por_id(t.id_consultorio)
-            if cons:
-                consultorio_desc = cons.descripcion
-
-        if not paciente or not paciente.email:
-            print(f"[Notificaciones] Paciente sin email para turno {t.id_turno}")
+# Recordatorios vencidos y todavía no enviados, con todo lo necesario para armar el email.
+# Se omiten los turnos que ya recibieron un recordatorio de igual o menor anticipación
+# (uno más cercano al turno reemplaza a los anteriores que se hayan atrasado).
+SQL_RECORDATORIOS_PENDIENTES = """
+SELECT T.id_turno, T.fecha_hora, P.email, M.nombre, M.apellido, C.descripcion
+FROM Turno T
+JOIN Paciente P ON T.id_paciente = P.id_paciente
+LEFT JOIN Medico M ON T.id_medico = M.id_medico
+LEFT JOIN Consultorio C ON T.id_consultorio = C.id_consultorio
+WHERE T.fecha_hora >= ? AND T.fecha_hora < ?
+  AND P.email IS NOT NULL AND P.email <> ''
+  AND NOT EXISTS (SELECT 1 FROM RecordatorioEnviado R WHERE R.id_turno = T.id_turno AND R.offset_minutos <= ?)
+ORDER BY T.fecha_hora
+"""
+
+
+def _parse_offsets(texto):
+    """'48h,2h' -> [120, 2880] (minutos, de menor a mayor). Acepta sufijos m, h y d."""
+    unidades = {'m': 1, 'h': 60, 'd': 1440}
+    offsets = set()
+    for parte in str(texto).split(','):
+        parte = parte.strip().lower()
+        if not parte:
             continue
+        try:
+            if parte[-1] in unidades:
+                offsets.add(int(float(parte[:-1]) * unidades[parte[-1]]))
+            else:
+                offsets.add(int(parte) * 60)
+        except ValueError:
+            print(f"[Notificaciones] Anticipación de recordatorio inválida: {parte!r}")
+    return sorted(o for o in offsets if o > 0) or [1440]
+
+
+def _texto_recordatorio(fecha_hora, medico_nombre, consultorio_desc):
+    turno_dt = datetime.strptime(str(fecha_hora)[:16], "%Y-%m-%d %H:%M")
+    dias = (turno_dt.date() - datetime.now().date()).days
+    cuando = "hoy" if dias == 0 else ("mañana" if dias == 1 else f"el {turno_dt.strftime('%d/%m')}")
+    hora_str = turno_dt.strftime('%H:%M')
+    subject = "Recordatorio de turno"
+    if consultorio_desc:
+        body = f"Recordatorio: {cuando} a las {hora_str} en {consultorio_desc} tiene su turno con {medico_nombre}."
+    else:
+        body = f"Recordatorio: {cuando} a las {hora_str} tiene su turno con {medico_nombre}."
+    return subject, body
+
+
+def _find_and_send(window_start_dt, window_end_dt, offset_minutos=1440):
+    """Encola los recordatorios de anticipación `offset_minutos` para los turnos con fecha_hora en
+    [window_start_dt, window_end_dt). Una sola consulta trae los pendientes; el outbox y
+    RecordatorioEnviado se escriben en la misma transacción, así un recordatorio no se duplica
+    ni se pierde. Retorna la cantidad encolada."""
+    conn = None
+    try:
+        conn = get_conexion()
+        cur = conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        cur.execute(SQL_RECORDATORIOS_PENDIENTES, (window_start_dt.strftime("%Y-%m-%d %H:%M:%S"),
+                                                   window_end_dt.strftime("%Y-%m-%d %H:%M:%S"),
+                                                   offset_minutos))
+        pendientes = cur.fetchall()
+        if not pendientes:
+            conn.rollback()
+            return 0
+
+        ahora = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        mensajes = []
+        for id_turno, fecha_hora, email, medico_nombre, medico_apellido, consultorio_desc in pendientes:
+            medico = f"{medico_nombre} {medico_apellido}" if medico_nombre else "el médico"
+            subject, body = _texto_recordatorio(fecha_hora, medico, consultorio_desc)
+            mensajes.append((email, subject, body, 'recordatorio', id_turno, ahora, ahora))
+        cur.executemany(
+            "INSERT INTO OutboxEmail (destinatario, asunto, cuerpo, tipo, id_turno, proximo_intento, creado_en) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            mensajes
+        )
+        cur.executemany("INSERT OR REPLACE INTO RecordatorioEnviado (id_turno, offset_minutos, enviado_en) VALUES (?, ?, ?)",
+                        [(fila[0], offset_minutos, datetime.now().isoformat()) for fila in pendientes])
+        conn.commit()
+        print(f"[Notificaciones] {len(pendientes)} recordatorio(s) de {offset_minutos} min encolado(s).")
+        despertar_despachador()
+        return len(pendientes)
+    except (sqlite3.Error, ValueError) as e:
+        if conn: conn.rollback()
+        print(f"[Notificaciones] Error buscando recordatorios: {e}")
+        return 0
+    finally:
+        if conn: conn.close()
 
-        hora_str = turno_dt.strftime('%H:%M')
-        medico_nombre = f"{medico.nombre} {medico.apellido}" if medico else "el médico"
-
-        subject = "Recordatorio de turno"
-        if consultorio_desc:
-            body = f"Recordatorio: mañana a las {hora_str} en {consultorio_desc} tiene su turno con {medico_nombre}."
-        else:
-            body = f"Recordatorio: mañana a las {hora_str} tiene su turno con {medico_nombre}."
-
-        ok = _send_email(paciente.email, subject, body)
-        if ok:
-            _mark_sent(t.id_turno)
 
+class PlanificadorRecordatorios:
+    """
+    Programa los recordatorios según sus vencimientos (fecha_hora del turno - anticipación).
+    Mantiene un min-heap con los vencimientos de las próximas horas, cargado por bloques a
+    medida que avanza el tiempo, y duerme hasta el próximo vencimiento. Los cambios en
+    turnos lo despiertan. Al vencer, el envío es un barrido por conjunto (_find_and_send)
+    desde `ahora - tolerancia`, así que un arranque tardío o una demora no pierden recordatorios.
+    """
 
-def _scheduler_loop(interval_minutes=1):
-    print("[Notificaciones] Scheduler iniciado (daemon). Intervalo (min):", interval_minutes)
-    _ensure_table()
-    interval_td = timedelta(minutes=interval_minutes)
-    while True:
+    def __init__(self, offsets=None, tolerancia=RECORDATORIO_TOLERANCIA, bloque=RECORDATORIO_BLOQUE):
+        self.offsets = _parse_offsets(offsets if offsets is not None else RECORDATORIO_OFFSETS)
+        self.tolerancia = tolerancia
+        self.bloque = bloque
+        self._heap = []           # (vencimiento, offset_minutos, id_turno)
+        self._cargado_hasta = None
+        self._lock = Lock()
+        self._evento = Event()
+        self._detener = Event()
+        self._hilo = None
+
+    def iniciar(self):
+        self._hilo = Thread(target=self._loop, name="recordatorios", daemon=True)
+        self._hilo.start()
+        print(f"[Notificaciones] Planificador de recordatorios iniciado (anticipaciones en min: {self.offsets}).")
+
+    def detener(self, timeout=5):
+        self._detener.set()
+        self._evento.set()
+        if self._hilo:
+            self._hilo.join(timeout)
+
+    def turno_cambiado(self, id_turno=None, fecha_hora=None):
+        """Agrega los vencimientos de un turno nuevo o movido y despierta al planificador.
+        Los turnos cancelados no hace falta quitarlos: el barrido lee el estado actual de la base."""
+        if fecha_hora:
+            try:
+                turno_dt = datetime.strptime(str(fecha_hora)[:19], "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                turno_dt = None
+            with self._lock:
+                if turno_dt and self._cargado_hasta is not None:
+                    for offset in self.offsets:
+                        vencimiento = turno_dt - timedelta(minutes=offset)
+                        if vencimiento < self._cargado_hasta:
+                            heapq.heappush(self._heap, (vencimiento, offset, id_turno))
+        self._evento.set()
+
+    def _cargar_bloque(self, desde, hasta):
+        """Carga en el heap los vencimientos en [desde, hasta), una consulta por anticipación."""
+        conn = None
         try:
-            now = datetime.now()
-            window_start = now + timedelta(hours=24)
-            # el scheduler se ejecuta cada `interval_minutes`, por lo que cubrimos ese intervalo
-            window_end = window_start + interval_td
-            print(f"[Notificaciones] Buscando turnos entre {window_start} y {window_end}")
-            _find_and_send(window_start, window_end)
-        except Exception as e:
-            print(f"[Notificaciones] Error en el loop: {e}")
-        time.sleep(interval_minutes * 60)
-
-
-def start_scheduler(interval_minutes=1):
-    thread = Thread(target=_scheduler_loop, args=(interval_minutes,), daemon=True)
-    thread.start()
-    return thread
+            conn = get_conexion()
+            cur = conn.cursor()
+            nuevos = []
+            for offset in self.offsets:
+                delta = timedelta(minutes=offset)
+                cur.execute(
+                    "SELECT id_turno, fecha_hora FROM Turno T WHERE fecha_hora >= ? AND fecha_hora < ? "
+                    "AND NOT EXISTS (SELECT 1 FROM RecordatorioEnviado R WHERE R.id_turno = T.id_turno AND R.offset_minutos <= ?)",
+                    ((desde + delta).strftime("%Y-%m-%d %H:%M:%S"), (hasta + delta).strftime("%Y-%m-%d %H:%M:%S"), offset)
+                )
+                for id_turno, fecha_hora in cur.fetchall():
+                    try:
+                        turno_dt = datetime.strptime(str(fecha_hora)[:19], "%Y-%m-%d %H:%M:%S")
+                    except ValueError:
+                        continue
+                    nuevos.append((turno_dt - delta, offset, id_turno))
+            with self._lock:
+                for item in nuevos:
+                    heapq.heappush(self._heap, item)
+                self._cargado_hasta = hasta
+        except sqlite3.Error as e:
+            print(f"[Notificaciones] Error cargando vencimientos de recordatorios: {e}")
+        finally:
+            if conn: conn.close()
+
+    def _barrer(self, ahora, offsets):
+        """Encola los recordatorios vencidos de cada anticipación (la menor primero)."""
+        for offset in sorted(offsets):
+            delta = timedelta(minutes=offset)
+            # Turnos cuyo vencimiento cayó en [ahora - tolerancia, ahora] y que todavía no pasaron
+            _find_and_send(max(ahora - self.tolerancia + delta, ahora), ahora + delta + timedelta(seconds=1), offset)
+
+    def _loop(self):
+        while not self._detener.is_set():
+            try:
+                self._evento.clear()
+                ahora = datetime.now()
+                if self._cargado_hasta is None:
+                    # Primer bloque: incluye los vencimientos atrasados dentro de la tolerancia
+                    self._cargar_bloque(ahora - self.tolerancia, ahora + self.bloque)
+                elif ahora >= self._cargado_hasta:
+                    self._cargar_bloque(self._cargado_hasta, ahora + self.bloque)
+
+                vencidos = set()
+                with self._lock:
+                    while self._heap and self._heap[0][0] <= ahora:
+                        vencidos.add(heapq.heappop(self._heap)[1])
+                    proximo = self._heap[0][0] if self._heap else None
+                if vencidos:
+                    self._barrer(ahora, vencidos)
+                    continue
+
+                limite = min(proximo, self._cargado_hasta) if proximo else self._cargado_hasta
+                espera = (limite - datetime.now()).total_seconds() if limite else RECORDATORIO_ESPERA_MAX
+                self._evento.wait(min(max(espera, 0.05), RECORDATORIO_ESPERA_MAX))
+            except Exception as e:
+                print(f"[Notificaciones] Error en el planificador de recordatorios: {e}")
+                self._evento.wait(60)
+
+
+_planificador = None
+_planificador_lock = Lock()
+
+
+def start_scheduler(offsets=None):
+    """Inicia (una sola vez) el planificador de recordatorios en segundo plano."""
+    global _planificador
+    with _planificador_lock:
+        if _planificador is None:
+            _planificador = PlanificadorRecordatorios(offsets)
+            _planificador.iniciar()
+    return _planificador
+
+
+def stop_scheduler(timeout=5):
+    global _planificador
+    with _planificador_lock:
+        if _planificador is not None:
+            _planificador.detener(timeout)
+            _planificador = None
+
+
+def recordatorios_turno_cambiado(id_turno=None, fecha_hora=None):
+    """Avisa al planificador que se creó, movió o canceló un turno (no hace nada si no corre)."""
+    if _planificador is not None:
+        _planificador.turno_cambiado(id_turno, fecha_hora)
 
 
 if __name__ == '__main__':
     # Arranque de prueba
-    start_scheduler(1)
+    start_scheduler()
     print('Scheduler corriendo en background. Ctrl-C para terminar.')
     try:
         while True:
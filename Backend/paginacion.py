@@ -0,0 +1,135 @@
+"""
+Paginación por clave (keyset) para las grillas con muchas filas.
+
+En lugar de traer la tabla completa (o usar OFFSET, que obliga a SQLite a
+recorrer y descartar todas las filas anteriores), cada página se pide a partir
+de la última fila mostrada:
+
+    WHERE (columna_orden, id) > (?, ?) ORDER BY columna_orden, id LIMIT ?
+
+Los DAOs arman una `ConsultaPaginada` con su SELECT base (columnas con alias,
+filtros y parámetros) y la lista de columnas por las que se puede ordenar; la
+tabla de la interfaz (GUI/tabla_paginada.py) pide páginas hacia adelante o
+hacia atrás a medida que el usuario se desplaza. El orden lo resuelve SQLite.
+
+Las columnas de orden no deben tener NULL (usar COALESCE en el SELECT base),
+porque una comparación con NULL deja afuera la fila.
+
+Para recorrer una tabla entera (exportaciones, reportes) `iterar()` devuelve
+un generador que lee con fetchmany de a `TAM_LOTE` filas, así la memoria no
+depende del tamaño de la tabla.
+"""
+import sqlite3
+
+from Backend.BDD.Conexion import get_conexion
+
+TAM_PAGINA = 200
+TAM_LOTE = 500
+
+
+class ConsultaPaginada:
+    def __init__(self, sql, params=(), columnas=(), id_columna=None, ordenables=None, orden_defecto=None):
+        """
+        sql: SELECT base; sus columnas de salida deben llamarse como `columnas`.
+        id_columna: columna única que desempata el orden (normalmente el id).
+        ordenables: columnas por las que se puede ordenar (por defecto todas).
+        """
+        self.sql = sql
+        self.params = tuple(params)
+        self.columnas = tuple(columnas)
+        self.id_columna = id_columna or self.columnas[0]
+        self.ordenables = tuple(ordenables) if ordenables is not None else self.columnas
+        self.orden_defecto = orden_defecto or self.id_columna
+        self._indice = {c: i for i, c in enumerate(self.columnas)}
+
+    def _columna_orden(self, orden):
+        # Solo nombres declarados: nunca se interpola texto que venga de la interfaz
+        return orden if orden in self.ordenables else self.orden_defecto
+
+    def clave(self, fila, orden=None):
+        """Clave keyset (valor de orden, id) de una fila devuelta por pagina()."""
+        orden = self._columna_orden(orden)
+        return fila[self._indice[orden]], fila[self._indice[self.id_columna]]
+
+    def pagina(self, orden=None, descendente=False, despues_de=None, antes_de=None, limite=TAM_PAGINA):
+        """
+        Filas (tuplas en el orden de `columnas`) de una página.
+        despues_de: clave de la última fila ya mostrada -> página siguiente.
+        antes_de: clave de la primera fila ya mostrada -> página anterior.
+        Sin clave devuelve la primera página. Retorna [] si hay error.
+        """
+        orden = self._columna_orden(orden)
+        hacia_atras = antes_de is not None
+        # Hacia atrás se recorre en sentido inverso y después se da vuelta la lista
+        invertir = descendente != hacia_atras
+        sentido = "DESC" if invertir else "ASC"
+        claves = [orden] if orden == self.id_columna else [orden, self.id_columna]
+        sql = f"SELECT * FROM ({self.sql}) AS q"
+        params = list(self.params)
+        clave = antes_de if hacia_atras else despues_de
+        if clave is not None:
+            operador = "<" if invertir else ">"
+            if len(claves) == 1:
+                sql += f" WHERE q.{orden} {operador} ?"
+                params.append(clave[1])
+            else:
+                sql += f" WHERE (q.{orden}, q.{self.id_columna}) {operador} (?, ?)"
+                params.extend(clave)
+        sql += " ORDER BY " + ", ".join(f"q.{c} {sentido}" for c in claves)
+        sql += " LIMIT ?"
+        params.append(limite)
+
+        conn = None
+        try:
+            conn = get_conexion()
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            filas = cursor.fetchall()
+            return filas[::-1] if hacia_atras else filas
+        except sqlite3.Error as e:
+            print(f"Error al obtener la página: {e}")
+            return []
+        finally:
+            if conn: conn.close()
+
+    def pagina_por_id(self, despues_de_id=None, limite=TAM_PAGINA):
+        """Página ordenada por id: las `limite` filas con id mayor a `despues_de_id`."""
+        clave = None if despues_de_id is None else (despues_de_id, despues_de_id)
+        return self.pagina(self.id_columna, despues_de=clave, limite=limite)
+
+    def iterar(self, tam_lote=TAM_LOTE):
+        """
+        Generador con todas las filas ordenadas por id, leídas de a `tam_lote`.
+        Usa la conexión del hilo que lo recorre: consumirlo en el mismo hilo y
+        hasta el final (o cerrarlo), porque mientras tanto la lectura queda abierta.
+        """
+        conn = get_conexion()
+        if conn is None:
+            return
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT * FROM ({self.sql}) AS q ORDER BY q.{self.id_columna}", self.params)
+            while True:
+                filas = cursor.fetchmany(tam_lote)
+                if not filas:
+                    break
+                yield from filas
+        except sqlite3.Error as e:
+            print(f"Error al recorrer las filas: {e}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    def contar(self):
+        """Cantidad total de filas de la consulta (para mostrar 'x de N')."""
+        conn = None
+        try:
+            conn = get_conexion()
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT COUNT(*) FROM ({self.sql})", self.params)
+            return cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error al contar las filas: {e}")
+            return 0
+        finally:
+            if conn: conn.close()
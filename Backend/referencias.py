@@ -0,0 +1,136 @@
+"""
+Caché de datos de referencia: Barrio, ObraSocial, Especialidad, Consultorio y Estado.
+
+Son tablas chicas que casi no cambian pero se consultan al abrir cada pantalla
+y dentro de bucles (una especialidad por fila, la lista de consultorios en cada
+combo). El caché las carga una sola vez (al iniciar la aplicación con
+`precargar()` o en el primer uso) en diccionarios id -> objeto y nombre -> id.
+
+Los DAOs de cada tabla llaman a `invalidar(tabla)` después de confirmar un
+alta, modificación o baja, de modo que solo se recarga la tabla afectada.
+`estadisticas()` devuelve aciertos y fallos por tabla.
+"""
+import sqlite3
+import threading
+
+from Backend.BDD.Conexion import get_conexion
+from Backend.Model.Barrio import Barrio
+from Backend.Model.ObraSocial import ObraSocial
+from Backend.Model.Especialidad import Especialidad
+from Backend.Model.Consultorio import Consultorio
+from Backend.Model.Estado import Estado
+
+# tabla -> (consulta, constructor, atributo id, atributo nombre)
+TABLAS = {
+    'Barrio': (
+        "SELECT id_barrio, nombre FROM Barrio ORDER BY id_barrio",
+        lambda f: Barrio(id_barrio=f[0], nombre=f[1]), 'id_barrio', 'nombre'),
+    'ObraSocial': (
+        "SELECT id_obra_social, nombre FROM ObraSocial ORDER BY id_obra_social",
+        lambda f: ObraSocial(id_obra_social=f[0], nombre=f[1]), 'id_obra_social', 'nombre'),
+    'Especialidad': (
+        "SELECT id_especialidad, nombre, descripcion FROM Especialidad ORDER BY id_especialidad",
+        lambda f: Especialidad(id_especialidad=f[0], nombre=f[1], descripcion=f[2]), 'id_especialidad', 'nombre'),
+    'Consultorio': (
+        "SELECT id_consultorio, descripcion FROM Consultorio ORDER BY id_consultorio",
+        lambda f: Consultorio(id_consultorio=f[0], descripcion=f[1]), 'id_consultorio', 'descripcion'),
+    'Estado': (
+        "SELECT id_estado, nombre FROM Estado ORDER BY id_estado",
+        lambda f: Estado(id_estado=f[0], nombre=f[1]), 'id_estado', 'nombre'),
+}
+
+
+class CacheReferencias:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._datos = {}  # tabla -> (lista ordenada por id, {id: objeto}, {nombre: id})
+        self._aciertos = dict.fromkeys(TABLAS, 0)
+        self._fallos = dict.fromkeys(TABLAS, 0)
+        self._version = dict.fromkeys(TABLAS, 0)  # sube en cada invalidación
+
+    # ---------------- carga ----------------
+    def _cargar(self, tabla):
+        sql, crear, attr_id, attr_nombre = TABLAS[tabla]
+        conn = None
+        try:
+            conn = get_conexion()
+            cursor = conn.cursor()
+            cursor.execute(sql)
+            objetos = [crear(f) for f in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error al cargar {tabla} en el caché de referencias: {e}")
+            return None
+        finally:
+            if conn:
+                conn.close()
+        por_id = {getattr(o, attr_id): o for o in objetos}
+        por_nombre = {}
+        for o in objetos:
+            por_nombre.setdefault(getattr(o, attr_nombre), getattr(o, attr_id))
+        return objetos, por_id, por_nombre
+
+    def _tabla(self, tabla):
+        with self._lock:
+            datos = self._datos.get(tabla)
+            if datos is not None:
+                self._aciertos[tabla] += 1
+                return datos
+            self._fallos[tabla] += 1
+            version = self._version[tabla]
+        datos = self._cargar(tabla)
+        if datos is None:
+            return [], {}, {}
+        with self._lock:
+            # Una invalidación durante la carga deja estos datos viejos: no se guardan
+            if self._version[tabla] == version:
+                self._datos[tabla] = datos
+        return datos
+
+    def precargar(self):
+        """Carga todas las tablas de referencia (se llama al iniciar la aplicación)."""
+        for tabla in TABLAS:
+            self._tabla(tabla)
+
+    # ---------------- consultas ----------------
+    def todos(self, tabla):
+        """Lista de objetos de la tabla ordenada por id."""
+        return list(self._tabla(tabla)[0])
+
+    def por_id(self, tabla, id_valor):
+        return self._tabla(tabla)[1].get(id_valor)
+
+    def id_por_nombre(self, tabla, nombre):
+        return self._tabla(tabla)[2].get(nombre)
+
+    def por_nombre(self, tabla, nombre):
+        _, por_id, por_nombre = self._tabla(tabla)
+        id_valor = por_nombre.get(nombre)
+        return por_id.get(id_valor) if id_valor is not None else None
+
+    # ---------------- invalidación ----------------
+    def invalidar(self, tabla=None):
+        """Descarta una tabla (o todas); se recarga en el próximo acceso."""
+        with self._lock:
+            for t in (TABLAS if tabla is None else (tabla,)):
+                self._datos.pop(t, None)
+                self._version[t] += 1
+
+    def estadisticas(self):
+        """{tabla: {'aciertos': n, 'fallos': n, 'filas': n o None si no está cargada}}."""
+        with self._lock:
+            return {
+                tabla: {
+                    'aciertos': self._aciertos[tabla],
+                    'fallos': self._fallos[tabla],
+                    'filas': len(self._datos[tabla][0]) if tabla in self._datos else None,
+                }
+                for tabla in TABLAS
+            }
+
+
+_referencias = CacheReferencias()
+
+
+def get_referencias():
+    """Caché de referencias compartido por todo el proceso."""
+    return _referencias
@@ -6,20 +6,44 @@ ROOT_DIR = pathlib.Path(__file__).parent.parent
 sys.path.insert(0, str(ROOT_DIR))
 
 from GUI.welcome import WelcomeScreen
-from Backend.notifications import start_scheduler
+from Backend.notifications import start_scheduler, stop_scheduler, iniciar_despachador, detener_despachador
 from Backend.BDD.Conexion import close_real_conexion
+from Backend.referencias import get_referencias
+from GUI.ejecutor import cerrar_pool_hilos
 
 if __name__ == "__main__":
     print("Iniciando la Interfaz Gráfica...")
-    # Iniciamos el scheduler de notificaciones en background (cada 1 minuto para pruebas)
+    # Tablas de referencia (barrios, obras sociales, especialidades, consultorios, estados) en memoria
     try:
-        start_scheduler(1)
+        get_referencias().precargar()
+    except Exception as e:
+        print(f"No se pudo precargar el caché de referencias: {e}")
+    # Planificador de recordatorios en background (duerme hasta el próximo vencimiento)
+    try:
+        start_scheduler()
     except Exception as e:
         print(f"No se pudo iniciar el scheduler de notificaciones: {e}")
+    # Despachador del outbox: entrega en segundo plano los emails de turnos creados/cancelados
+    try:
+        iniciar_despachador()
+    except Exception as e:
+        print(f"No se pudo iniciar el despachador de emails: {e}")
     app = WelcomeScreen()
     try:
         app.mainloop()
     finally:
+        try:
+            cerrar_pool_hilos()
+        except Exception as e:
+            print(f"Error deteniendo los hilos de consultas: {e}")
+        try:
+            stop_scheduler()
+        except Exception as e:
+            print(f"Error deteniendo el planificador de recordatorios: {e}")
+        try:
+            detener_despachador()
+        except Exception as e:
+            print(f"Error deteniendo el despachador de emails: {e}")
         try:
             close_real_conexion()
         except Exception as e:
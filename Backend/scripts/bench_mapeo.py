@@ -0,0 +1,91 @@
+"""Benchmark: memoria y tiempo para armar objetos del modelo desde filas de SQLite.
+
+Compara la forma anterior (clase con __dict__ y constructor por keywords con
+índices fijos, `Paciente(id_paciente=fila[0], ...)`) contra el modelo con
+__slots__ armado con el mapeador por nombre de columna (Backend/mapeo.py).
+Usa filas sintéticas con la misma forma que `SELECT * FROM Paciente`.
+
+Uso:  python Backend/scripts/bench_mapeo.py [filas]
+"""
+import sys
+import time
+import pathlib
+import tracemalloc
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from Backend.Model.Paciente import Paciente
+from Backend.mapeo import mapeador
+
+COLUMNAS = ('id_paciente', 'id_barrio', 'id_obra_social', 'usuario', 'tipo_dni', 'nombre',
+            'apellido', 'fecha_nacimiento', 'dni', 'email', 'telefono', 'calle', 'numero_calle')
+
+
+class PacienteDict:
+    """El modelo como era antes: atributos en __dict__."""
+
+    def __init__(self, id_paciente=None, id_barrio=None, id_obra_social=None, usuario=None,
+                 nombre=None, apellido=None, fecha_nacimiento=None, tipo_dni=None,
+                 dni=None, email=None, telefono=None, calle=None, numero_calle=None):
+        self.id_paciente = id_paciente
+        self.id_barrio = id_barrio
+        self.id_obra_social = id_obra_social
+        self.usuario = usuario
+        self.tipo_dni = tipo_dni
+        self.nombre = nombre
+        self.apellido = apellido
+        self.fecha_nacimiento = fecha_nacimiento
+        self.dni = dni
+        self.email = email
+        self.telefono = telefono
+        self.calle = calle
+        self.numero_calle = numero_calle
+
+
+def armar_anterior(filas):
+    return [PacienteDict(id_paciente=f[0], id_barrio=f[1], id_obra_social=f[2], usuario=f[3],
+                         tipo_dni=f[4], nombre=f[5], apellido=f[6], fecha_nacimiento=f[7],
+                         dni=f[8], email=f[9], telefono=f[10], calle=f[11], numero_calle=f[12])
+            for f in filas]
+
+
+def armar_mapeador(filas):
+    mapear = mapeador(Paciente, COLUMNAS)
+    return [mapear(f) for f in filas]
+
+
+def filas_de_prueba(cantidad):
+    return [(i, i % 50 + 1, i % 10 + 1, f"user{i}", 1, f"Nombre{i}", f"Apellido{i}",
+             "1990-01-01", str(20000000 + i), f"p{i}@mail.com", "3510000000", "Calle", i % 9000)
+            for i in range(cantidad)]
+
+
+def medir(nombre, funcion, filas):
+    inicio = time.perf_counter()
+    objetos = funcion(filas)
+    segundos = time.perf_counter() - inicio
+    del objetos
+
+    tracemalloc.start()
+    objetos = funcion(filas)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objetos
+
+    print(f"{nombre:<22} {segundos:8.3f} s  {segundos / len(filas) * 1e6:7.2f} µs/fila  "
+          f"{memoria / len(filas):7.1f} bytes/fila")
+    return segundos, memoria
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    filas = filas_de_prueba(cantidad)
+    print(f"{cantidad} filas de Paciente ({len(COLUMNAS)} columnas)\n")
+    t_antes, m_antes = medir("kwargs + __dict__", armar_anterior, filas)
+    t_ahora, m_ahora = medir("mapeador + __slots__", armar_mapeador, filas)
+    print(f"\nTiempo: {t_antes / t_ahora:.1f}x más rápido; memoria: {m_antes / m_ahora:.1f}x menos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark: reservas por segundo con lectores concurrentes según el perfil de pragmas.
+
+Crea una base temporal con médicos, pacientes y turnos de prueba; luego, para
+cada perfil, corre varios hilos lectores (consultas tipo reporte) mientras un
+hilo reserva turnos (INSERT + commit) y mide reservas/s y errores de bloqueo.
+
+Uso:  python Backend/scripts/bench_pragmas.py [segundos] [lectores]
+"""
+import sys
+import time
+import sqlite3
+import pathlib
+import tempfile
+import threading
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from Backend.BDD.Conexion import ConnectionPool, pragmas_de_perfil
+
+SQL_TABLAS = """
+CREATE TABLE Medico (id_medico INTEGER PRIMARY KEY, nombre TEXT, id_especialidad INTEGER);
+CREATE TABLE Paciente (id_paciente INTEGER PRIMARY KEY, nombre TEXT);
+CREATE TABLE Turno (
+    id_turno INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_paciente INTEGER NOT NULL,
+    id_medico INTEGER NOT NULL,
+    id_consultorio INTEGER,
+    fecha_hora DATETIME NOT NULL,
+    motivo TEXT,
+    asistio INTEGER
+);
+"""
+
+SQL_LECTURA = """
+SELECT M.id_especialidad, COUNT(*),
+       SUM(CASE WHEN T.asistio = 1 THEN 1 ELSE 0 END)
+FROM Turno T JOIN Medico M ON T.id_medico = M.id_medico
+GROUP BY M.id_especialidad
+"""
+
+
+def crear_base(path, medicos=20, pacientes=500, turnos=20000):
+    conn = sqlite3.connect(path)
+    conn.executescript(SQL_TABLAS)
+    conn.executemany("INSERT INTO Medico VALUES (?, ?, ?)", [(i, f"Medico {i}", i % 5) for i in range(1, medicos + 1)])
+    conn.executemany("INSERT INTO Paciente VALUES (?, ?)", [(i, f"Paciente {i}") for i in range(1, pacientes + 1)])
+    conn.executemany(
+        "INSERT INTO Turno (id_paciente, id_medico, fecha_hora, asistio) VALUES (?, ?, ?, ?)",
+        [(i % pacientes + 1, i % medicos + 1, f"2025-{i % 12 + 1:02d}-{i % 28 + 1:02d} 10:00:00", i % 3 or None)
+         for i in range(turnos)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def medir(path, perfil, segundos, lectores):
+    pool = ConnectionPool(path, max_conexiones=lectores + 2, pragmas=pragmas_de_perfil(perfil), migrar=False)
+    fin = time.perf_counter() + segundos
+    resultados = {'reservas': 0, 'bloqueos': 0, 'lecturas': 0}
+    lock = threading.Lock()
+
+    def lector():
+        conn = pool.obtener()
+        n = 0
+        while time.perf_counter() < fin:
+            try:
+                conn.execute(SQL_LECTURA).fetchall()
+                n += 1
+            except sqlite3.OperationalError:
+                pass
+        with lock:
+            resultados['lecturas'] += n
+        pool.liberar()
+
+    def escritor():
+        conn = pool.obtener()
+        i = 0
+        while time.perf_counter() < fin:
+            i += 1
+            try:
+                conn.execute(
+                    "INSERT INTO Turno (id_paciente, id_medico, fecha_hora) VALUES (?, ?, ?)",
+                    (i % 500 + 1, i % 20 + 1, "2026-01-01 08:00:00")
+                )
+                conn.commit()
+                resultados['reservas'] += 1
+            except sqlite3.OperationalError:
+                conn.rollback()
+                resultados['bloqueos'] += 1
+        pool.liberar()
+
+    hilos = [threading.Thread(target=lector) for _ in range(lectores)]
+    hilos.append(threading.Thread(target=escritor))
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    pool.cerrar_todas()
+    return resultados
+
+
+if __name__ == "__main__":
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 3
+    lectores = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    print(f"Duración por perfil: {segundos}s, lectores concurrentes: {lectores}\n")
+    print(f"{'perfil':<12}{'reservas/s':>12}{'bloqueos':>10}{'lecturas/s':>12}")
+    for perfil in ('compatible', 'normal', 'seguro'):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = pathlib.Path(tmp) / "bench.db"
+            crear_base(path)
+            r = medir(path, perfil, segundos, lectores)
+        print(f"{perfil:<12}{r['reservas'] / segundos:>12.1f}{r['bloqueos']:>10}{r['lecturas'] / segundos:>12.1f}")
@@ -0,0 +1,175 @@
+"""Prueba del transporte SMTP de Backend.notifications contra un servidor SMTP local mínimo.
+
+Levanta un servidor de prueba (sockets, sin TLS) que acepta EHLO, AUTH PLAIN,
+MAIL/RCPT/DATA y QUIT, cuenta conexiones, logins y mensajes, y puede cortar la
+sesión cada N mensajes para simular un servidor que se cae. Después verifica:
+
+  1. Reutilización de sesión: 250 mensajes con tope de 100 por sesión -> 3 conexiones.
+  2. Comparación con una conexión por mensaje (el comportamiento anterior).
+  3. Reconexión: el servidor corta cada 40 mensajes y no se pierde ninguno.
+  4. Una sesión por hilo: 4 hilos enviando con _entregar() -> 4 conexiones.
+
+Uso:  python Backend/scripts/probar_smtp_local.py
+"""
+import sys
+import time
+import socket
+import pathlib
+import threading
+
+ROOT_DIR = pathlib.Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import Backend.notifications as notifications
+from Backend.notifications import TransporteSMTP
+
+
+class ServidorSMTPPrueba:
+    """Servidor SMTP de prueba: un hilo por conexión, sin persistir nada."""
+
+    def __init__(self, cortar_cada=None):
+        self.cortar_cada = cortar_cada
+        self.conexiones = 0
+        self.logins = 0
+        self.mensajes = 0
+        self._lock = threading.Lock()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind(("127.0.0.1", 0))
+        self._socket.listen(16)
+        self.port = self._socket.getsockname()[1]
+        threading.Thread(target=self._aceptar, daemon=True).start()
+
+    def _aceptar(self):
+        while True:
+            try:
+                cliente, _ = self._socket.accept()
+            except OSError:
+                return
+            with self._lock:
+                self.conexiones += 1
+            threading.Thread(target=self._atender, args=(cliente,), daemon=True).start()
+
+    def _atender(self, cliente):
+        archivo = cliente.makefile("rb")
+        enviar = lambda linea: cliente.sendall(linea.encode() + b"\r\n")
+        enviar("220 localhost SMTP de prueba")
+        en_sesion = 0
+        try:
+            while True:
+                linea = archivo.readline()
+                if not linea:
+                    return
+                comando = linea.decode(errors="replace").strip()
+                verbo = comando.split(" ")[0].upper()
+                if verbo in ("EHLO", "HELO"):
+                    enviar("250-localhost")
+                    enviar("250 AUTH PLAIN")
+                elif verbo == "AUTH":
+                    with self._lock:
+                        self.logins += 1
+                    enviar("235 Autenticado")
+                elif verbo in ("MAIL", "RCPT", "RSET", "NOOP"):
+                    enviar("250 OK")
+                elif verbo == "DATA":
+                    enviar("354 Fin con <CRLF>.<CRLF>")
+                    while archivo.readline() not in (b".\r\n", b""):
+                        pass
+                    with self._lock:
+                        self.mensajes += 1
+                    en_sesion += 1
+                    enviar("250 Encolado")
+                    if self.cortar_cada and en_sesion >= self.cortar_cada:
+                        return  # corte abrupto, como un servidor que cierra sesiones largas
+                elif verbo == "QUIT":
+                    enviar("221 Adios")
+                    return
+                else:
+                    enviar("502 No implementado")
+        finally:
+            archivo.close()
+            cliente.close()
+
+    def cerrar(self):
+        self._socket.close()
+
+
+def transporte(servidor, max_por_sesion):
+    return TransporteSMTP(host="127.0.0.1", port=servidor.port, usuario="prueba", clave="clave",
+                          remitente="clinica@localhost", seguridad="ninguna", max_por_sesion=max_por_sesion)
+
+
+def enviar_lote(t, cantidad):
+    for i in range(cantidad):
+        t.enviar(f"paciente{i}@localhost", "Recordatorio de turno", f"Mensaje {i}")
+    t.cerrar()
+
+
+def esperar(condicion, segundos=2):
+    fin = time.time() + segundos
+    while not condicion() and time.time() < fin:
+        time.sleep(0.01)
+
+
+if __name__ == "__main__":
+    errores = 0
+
+    def verificar(descripcion, ok):
+        global errores
+        print(f"  [{'OK' if ok else 'FALLA'}] {descripcion}")
+        errores += 0 if ok else 1
+
+    print("1. Reutilización de sesión (250 mensajes, tope 100 por sesión)")
+    srv = ServidorSMTPPrueba()
+    inicio = time.perf_counter()
+    enviar_lote(transporte(srv, 100), 250)
+    reutilizando = time.perf_counter() - inicio
+    esperar(lambda: srv.mensajes == 250)
+    verificar(f"mensajes={srv.mensajes} conexiones={srv.conexiones} logins={srv.logins}",
+              srv.mensajes == 250 and srv.conexiones == 3 and srv.logins == 3)
+    srv.cerrar()
+
+    print("2. Una conexión por mensaje (comportamiento anterior)")
+    srv = ServidorSMTPPrueba()
+    inicio = time.perf_counter()
+    enviar_lote(transporte(srv, 1), 250)
+    por_mensaje = time.perf_counter() - inicio
+    esperar(lambda: srv.mensajes == 250)
+    verificar(f"mensajes={srv.mensajes} conexiones={srv.conexiones}", srv.mensajes == 250 and srv.conexiones == 250)
+    print(f"  tiempo: {reutilizando * 1000:.0f} ms reutilizando vs {por_mensaje * 1000:.0f} ms una conexión por mensaje "
+          "(sin TLS; con STARTTLS y login remotos la diferencia es mucho mayor)")
+    srv.cerrar()
+
+    print("3. Reconexión cuando el servidor corta cada 40 mensajes")
+    srv = ServidorSMTPPrueba(cortar_cada=40)
+    t = transporte(srv, 1000)
+    enviar_lote(t, 100)
+    esperar(lambda: srv.mensajes == 100)
+    verificar(f"mensajes={srv.mensajes} conexiones={srv.conexiones} sesiones_transporte={t.sesiones}",
+              srv.mensajes == 100 and srv.conexiones == 3)
+    srv.cerrar()
+
+    print("4. Una sesión por hilo con _entregar() (como los workers del despachador)")
+    srv = ServidorSMTPPrueba()
+    notifications.EMAIL_HOST, notifications.EMAIL_PORT = "127.0.0.1", srv.port
+    notifications.EMAIL_USER, notifications.EMAIL_PASS = "prueba", "clave"
+    notifications.EMAIL_FROM, notifications.EMAIL_SEGURIDAD = "clinica@localhost", "ninguna"
+
+    def worker(n):
+        for i in range(50):
+            notifications._entregar(f"w{n}-{i}@localhost", "Turno confirmado", "Hola")
+        notifications.cerrar_transporte()
+
+    import contextlib, io
+    with contextlib.redirect_stdout(io.StringIO()):
+        hilos = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+    esperar(lambda: srv.mensajes == 200)
+    verificar(f"mensajes={srv.mensajes} conexiones={srv.conexiones}", srv.mensajes == 200 and srv.conexiones == 4)
+    srv.cerrar()
+
+    print("\nResultado:", "todas las pruebas pasaron" if not errores else f"{errores} prueba(s) fallaron")
+    sys.exit(1 if errores else 0)
@@ -0,0 +1,100 @@
+"""
+Contexto de sesión del usuario logueado.
+
+Una `Sesion` guarda el usuario, su rol y, si corresponde, el id_medico o
+id_paciente asociado. Se crea al iniciar sesión (UsuarioDAO.iniciar_sesion) y
+los DAOs la aceptan en lugar del nombre de usuario (`usuario_actual`).
+
+Para no consultar la tabla Usuario en cada operación, las sesiones se guardan
+en un caché por nombre de usuario con tiempo de vida (SESION_TTL segundos). El
+caché se invalida cuando se crean, modifican o eliminan usuarios, médicos o
+pacientes, así que los permisos nunca quedan desactualizados más allá del TTL
+por cambios hechos desde otros procesos.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from Backend.BDD.Conexion import get_conexion
+
+SESION_TTL = int(os.environ.get('SESION_TTL', 300))  # segundos
+
+SQL_DATOS_SESION = """
+SELECT U.usuario, U.rol,
+       (SELECT M.id_medico FROM Medico M WHERE M.usuario = U.usuario),
+       (SELECT P.id_paciente FROM Paciente P WHERE P.usuario = U.usuario)
+FROM Usuario U
+WHERE U.usuario = ?
+"""
+
+
+class Sesion:
+    def __init__(self, usuario, rol, id_medico=None, id_paciente=None):
+        self.usuario = usuario
+        self.rol = rol
+        self.id_medico = id_medico
+        self.id_paciente = id_paciente
+        self.creada = time.monotonic()
+
+    def es_admin(self):
+        return self.rol == "Administrador"
+
+    def __str__(self):
+        return f"Sesion(Usuario: {self.usuario}, Rol: {self.rol}, Médico: {self.id_medico}, Paciente: {self.id_paciente})"
+
+
+_cache = {}  # usuario -> Sesion
+_lock = threading.Lock()
+
+
+def nombre_usuario(usuario_actual):
+    """Nombre de usuario de una Sesion o de un string (lo que reciben los DAOs)."""
+    return usuario_actual.usuario if isinstance(usuario_actual, Sesion) else usuario_actual
+
+
+def _cargar_sesion(usuario):
+    """Lee rol, id_medico e id_paciente del usuario en una sola consulta."""
+    conn = None
+    try:
+        conn = get_conexion()
+        cursor = conn.cursor()
+        cursor.execute(SQL_DATOS_SESION, (usuario,))
+        fila = cursor.fetchone()
+        return Sesion(*fila) if fila else None
+    except sqlite3.Error as e:
+        print(f"Error al cargar la sesión de {usuario}: {e}")
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+
+def obtener_sesion(usuario_actual):
+    """
+    Devuelve la Sesion del usuario (una Sesion o su nombre), usando el caché.
+    Retorna None si el usuario no existe.
+    """
+    if usuario_actual is None:
+        return None
+    usuario = nombre_usuario(usuario_actual)
+    with _lock:
+        sesion = _cache.get(usuario)
+    if sesion is not None and time.monotonic() - sesion.creada < SESION_TTL:
+        return sesion
+    sesion = _cargar_sesion(usuario)
+    with _lock:
+        if sesion is None:
+            _cache.pop(usuario, None)
+        else:
+            _cache[usuario] = sesion
+    return sesion
+
+
+def invalidar_sesiones(usuario=None):
+    """Descarta la sesión cacheada de un usuario, o todas si no se indica."""
+    with _lock:
+        if usuario is None:
+            _cache.clear()
+        else:
+            _cache.pop(nombre_usuario(usuario), None)
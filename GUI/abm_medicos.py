@@ -5,6 +5,7 @@ from Backend.DAO.EspecialidadDAO import EspecialidadDAO
 from Backend.DAO.BarrioDAO import BarrioDAO
 from Backend.Model.Medico import Medico
 from GUI.panel_horarios import PanelHorarios
+from GUI.tabla_paginada import TablaPaginada
 
 class GestionMedicos(tk.Toplevel):
     def __init__(self, parent, usuario="admin"):
@@ -80,26 +81,18 @@ class GestionMedicos(tk.Toplevel):
         style.configure("Treeview", background="#DDDDDD", foreground="black", fieldbackground="#DDDDDD")
         style.configure("Treeview.Heading", background="#CCCCCC", foreground="black")
 
-        self.tree = ttk.Treeview(tree_frame, columns=("id", "nombre", "apellido", "dni", "matricula", "especialidad"), show="headings")
-        self.tree.heading("id", text="ID"); self.tree.heading("nombre", text="Nombre"); self.tree.heading("apellido", text="Apellido")
-        self.tree.heading("dni", text="DNI"); self.tree.heading("matricula", text="Matrícula"); self.tree.heading("especialidad", text="Especialidad")
-        
-        self.tree.column("id", width=50, anchor="center", stretch=tk.NO)
-        self.tree.column("nombre", width=150); self.tree.column("apellido", width=150)
-        self.tree.column("dni", width=100); self.tree.column("matricula", width=100); self.tree.column("especialidad", width=150)
-
-        self.tree.pack(fill="both", expand=True, side="left")
-        
-        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
+        # Tabla paginada: se cargan solo las páginas visibles, ordenables por columna
+        self.tabla = TablaPaginada(tree_frame, [
+            ("id", "ID", 50, "id_medico"), ("nombre", "Nombre", 150), ("apellido", "Apellido", 150),
+            ("dni", "DNI", 100), ("matricula", "Matrícula", 100), ("especialidad", "Especialidad", 150)])
+        self.tabla.pack(fill="both", expand=True)
+        self.tree = self.tabla.tree
+        self.tree.column("id", anchor="center", stretch=tk.NO)
 
         self.tree.bind("<<TreeviewSelect>>", self.seleccionar_medico)
 
     def cargar_medicos(self):
-        for i in self.tree.get_children(): self.tree.delete(i)
-        for m in MedicoDAO().obtener_medicos_con_especialidad():
-            self.tree.insert("", "end", values=m)
+        self.tabla.cargar(MedicoDAO().consulta_medicos_con_especialidad())
 
     def cargar_especialidades(self):
         self.especialidades = EspecialidadDAO().obtener_todas_las_especialidades()
@@ -3,6 +3,7 @@ from tkinter import ttk, messagebox
 from tkcalendar import DateEntry
 from Backend.DAO.PacienteDAO import PacienteDAO
 from Backend.Model.Paciente import Paciente
+from GUI.tabla_paginada import TablaPaginada
 
 class GestionPacientes(tk.Toplevel):
     def __init__(self, parent, usuario="admin"):
@@ -63,26 +64,18 @@ class GestionPacientes(tk.Toplevel):
         style.configure("Treeview", background="#DDDDDD", foreground="black", fieldbackground="#DDDDDD")
         style.configure("Treeview.Heading", background="#CCCCCC", foreground="black")
 
-        self.tree = ttk.Treeview(tree_frame, columns=("id", "nombre", "apellido", "dni"), show="headings")
-        self.tree.heading("id", text="ID"); self.tree.heading("nombre", text="Nombre")
-        self.tree.heading("apellido", text="Apellido"); self.tree.heading("dni", text="DNI")
-        
-        self.tree.column("id", width=50, anchor="center", stretch=tk.NO)
-        self.tree.column("nombre", width=200); self.tree.column("apellido", width=200)
-        self.tree.column("dni", width=100)
-
-        self.tree.pack(fill="both", expand=True, side="left")
-        
-        scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
+        # Tabla paginada: se cargan solo las páginas visibles, ordenables por columna
+        self.tabla = TablaPaginada(tree_frame, [
+            ("id", "ID", 50, "id_paciente"), ("nombre", "Nombre", 200),
+            ("apellido", "Apellido", 200), ("dni", "DNI", 100)])
+        self.tabla.pack(fill="both", expand=True)
+        self.tree = self.tabla.tree
+        self.tree.column("id", anchor="center", stretch=tk.NO)
 
         self.tree.bind("<<TreeviewSelect>>", self.seleccionar_paciente)
 
     def cargar_pacientes(self):
-        for i in self.tree.get_children(): self.tree.delete(i)
-        for p in PacienteDAO().obtener_todos_los_pacientes():
-            self.tree.insert("", "end", values=(p.id_paciente, p.nombre, p.apellido, p.dni))
+        self.tabla.cargar(PacienteDAO().consulta_pacientes())
 
     def seleccionar_paciente(self, _):
         selected_item = self.tree.selection()
@@ -7,7 +7,12 @@ from Backend.DAO.EspecialidadDAO import EspecialidadDAO
 from Backend.DAO.ConsultorioDAO import ConsultorioDAO
 from GUI.consulta_historial import ConsultaHistorial
 from GUI.registro_historial import RegistroHistorial
+from GUI.combo_busqueda import ComboBusqueda
+from GUI.ejecutor import EjecutorDAO
+from GUI.tabla_paginada import TablaPaginada
+from Backend.busqueda import etiqueta_persona
 from Backend.Model.Turno import Turno
+from Backend.Model.Receta import Receta
 from tkcalendar import DateEntry
 from datetime import datetime, date
 import calendar
@@ -36,6 +41,8 @@ class ABMTurnos(tk.Toplevel):
 
         self.rol = rol
         self.usuario = usuario
+        # Consultas a la base en segundo plano (ver GUI/ejecutor.py)
+        self.ejecutor = EjecutorDAO(self)
 
         self.create_widgets()
         self.cargar_combos()
@@ -51,7 +58,8 @@ class ABMTurnos(tk.Toplevel):
         form_frame.pack(padx=10, pady=10, fill="x")
 
         tk.Label(form_frame, text="Paciente:", bg="#333333", fg="white").grid(row=0, column=0, padx=5, pady=5, sticky="e")
-        self.paciente_combo = ttk.Combobox(form_frame, width=30)
+        # Búsqueda incremental: no se carga el padrón completo de pacientes
+        self.paciente_combo = ComboBusqueda(form_frame, buscar=lambda texto: PacienteDAO().buscar_opciones(texto), width=30)
         self.paciente_combo.grid(row=0, column=1, padx=5, pady=5, sticky="w")
 
         tk.Label(form_frame, text="Especialidad:", bg="#333333", fg="white").grid(row=1, column=0, padx=5, pady=5, sticky="e")
@@ -79,6 +87,10 @@ class ABMTurnos(tk.Toplevel):
         self.filtrar_turnos_btn = ttk.Button(form_frame, text="Filtrar turnos", command=self.filtrar_turnos_por_fecha)
         self.filtrar_turnos_btn.grid(row=4, column=3, padx=5, pady=5, sticky="w")
 
+        # Botón para buscar los próximos horarios libres entre todos los médicos de la especialidad
+        self.proximos_libres_btn = ttk.Button(form_frame, text="Próximos libres (especialidad)", command=self.mostrar_proximos_libres)
+        self.proximos_libres_btn.grid(row=1, column=2, padx=5, pady=5, sticky="w")
+
         horarios_frame = tk.Frame(main_frame, bg="#333333")
         horarios_frame.pack(padx=10, pady=5, fill="x")
 
@@ -90,6 +102,9 @@ class ABMTurnos(tk.Toplevel):
         scrollbar = ttk.Scrollbar(horarios_frame, orient="vertical", command=self.slots_listbox.yview)
         scrollbar.pack(side="left", fill="y")
         self.slots_listbox.config(yscrollcommand=scrollbar.set)
+        self.slots_listbox.bind("<Double-Button-1>", self.elegir_proximo_libre)
+        # Resultados de la búsqueda por especialidad (None cuando la lista muestra un solo médico/día)
+        self.proximos_libres = None
 
         button_frame = tk.Frame(main_frame, bg="#333333")
         button_frame.pack(padx=10, pady=10, fill="x")
@@ -115,30 +130,28 @@ class ABMTurnos(tk.Toplevel):
         style.configure("Treeview", background="#DDDDDD", foreground="black", fieldbackground="#DDDDDD")
         style.configure("Treeview.Heading", background="#CCCCCC", foreground="black")
 
-        self.tree = ttk.Treeview(main_frame, columns=("id", "paciente", "medico", "especialidad", "consultorio", "fecha", "hora", "estado"), show="headings")
-        self.tree.column("id", width=60, anchor="center")
-        self.tree.column("paciente", width=150)
-        self.tree.column("medico", width=150)
-        self.tree.column("especialidad", width=120)
-        self.tree.column("consultorio", width=120)
-        self.tree.column("fecha", width=90, anchor="center")
-        self.tree.column("hora", width=70, anchor="center")
-        self.tree.column("estado", width=110, anchor="center")
-        self.tree.heading("id", text="ID")
-        self.tree.heading("paciente", text="Paciente")
-        self.tree.heading("medico", text="Médico")
-        self.tree.heading("especialidad", text="Especialidad")
-        self.tree.heading("consultorio", text="Consultorio")
-        self.tree.heading("fecha", text="Fecha")
-        self.tree.heading("hora", text="Hora")
-        self.tree.heading("estado", text="Estado")
-        self.tree.pack(padx=10, pady=10, fill="both", expand=True)
+        # Tabla paginada: solo se cargan las páginas que se van viendo y el
+        # orden por columna se resuelve en SQL (fecha y hora ordenan por fecha_hora)
+        self.tabla = TablaPaginada(main_frame, [
+            ("id", "ID", 60, "id_turno"),
+            ("paciente", "Paciente", 150),
+            ("medico", "Médico", 150),
+            ("especialidad", "Especialidad", 120),
+            ("consultorio", "Consultorio", 120),
+            ("fecha", "Fecha", 90, "fecha_hora"),
+            ("hora", "Hora", 70, "fecha_hora"),
+            ("estado", "Estado", 110),
+        ], valores=lambda fila: fila[:8], etiquetas=self._etiqueta_turno)
+        self.tabla.pack(padx=10, pady=10, fill="both", expand=True)
+        self.tree = self.tabla.tree
+        for col in ("id", "fecha", "hora", "estado"):
+            self.tree.column(col, anchor="center")
         self.tree.tag_configure('asistio', background='#c7f0c1')
         self.tree.tag_configure('inasistencia', background='#f8c0c0')
         self.tree.tag_configure('pendiente', background='#fff3b0')
 
         if self.rol == "Medico":
-            for w in [self.paciente_combo, self.especialidad_combo, self.medico_combo]:
+            for w in [self.paciente_combo, self.especialidad_combo, self.medico_combo, self.proximos_libres_btn]:
                 if w: w.configure(state="disabled")
             # Para médicos dejamos habilitado el filtro por fecha y el botón de filtrar
             try:
@@ -155,8 +168,6 @@ class ABMTurnos(tk.Toplevel):
 
     def cargar_combos(self):
         self.paciente_dao = PacienteDAO()
-        self.pacientes = self.paciente_dao.obtener_todos_los_pacientes()
-        self.paciente_combo["values"] = [f"{p.nombre} {p.apellido}" for p in self.pacientes]
 
         self.especialidad_dao = EspecialidadDAO()
         self.especialidades = self.especialidad_dao.obtener_todas_las_especialidades()
@@ -167,7 +178,7 @@ class ABMTurnos(tk.Toplevel):
         if self.rol == "Paciente":
             paciente = self.paciente_dao.obtener_paciente_por_usuario(self.usuario)
             if paciente:
-                self.paciente_combo.set(f"{paciente.nombre} {paciente.apellido}")
+                self.paciente_combo.seleccionar(paciente.id_paciente, etiqueta_persona(paciente.apellido, paciente.nombre, paciente.dni))
                 self.paciente_combo.config(state="disabled")
 
     def cargar_medicos_por_especialidad(self, event):
@@ -181,14 +192,6 @@ class ABMTurnos(tk.Toplevel):
         self.medico_combo["values"] = [f"{m.nombre} {m.apellido}" for m in self.medicos]
 
     def cargar_turnos(self, filter_fecha=None):
-        try:
-            TurnoDAO().cerrar_dia()
-        except Exception:
-            pass
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        turno_dao = TurnoDAO()
         # Si se pasó una fecha de filtro, la guardamos
         if filter_fecha:
             # esperar una fecha en formato YYYY-MM-DD o un objeto date
@@ -200,73 +203,60 @@ class ABMTurnos(tk.Toplevel):
                 except Exception:
                     fecha_str = None
             self.current_filter_fecha = fecha_str
+        # Por defecto se muestran solo los turnos del día actual; se puede filtrar por fecha
+        if getattr(self, 'current_filter_fecha', None):
+            turno_fecha = self.current_filter_fecha
+        else:
+            turno_fecha = date.today().strftime("%Y-%m-%d")
+            self.current_filter_fecha = turno_fecha
+        try:
+            # Actualizar la DateEntry para que muestre la fecha filtrada
+            self.fecha_entry.set_date(datetime.strptime(turno_fecha, "%Y-%m-%d").date())
+        except Exception:
+            pass
+        # La consulta corre en segundo plano; si se cambia de fecha antes de que
+        # termine, el pedido anterior se descarta
+        self.ejecutor.enviar('turnos', self._consultar_turnos, self.rol, self.usuario, turno_fecha,
+                             al_terminar=self._mostrar_turnos, al_fallar=self._error_turnos)
+
+    @staticmethod
+    def _consultar_turnos(rol, usuario, turno_fecha):
+        """Se ejecuta fuera del hilo de Tk: devuelve la ConsultaPaginada de la grilla (o None)."""
+        turno_dao = TurnoDAO()
+        try:
+            turno_dao.cerrar_dia()
+        except Exception:
+            pass
         # Comportamiento por rol
-        if self.rol == "Administrador":
-            # Por defecto mostrar solo los turnos del día actual; permitir filtrar por fecha
-            if getattr(self, 'current_filter_fecha', None):
-                turno_fecha = self.current_filter_fecha
-            else:
-                turno_fecha = date.today().strftime("%Y-%m-%d")
-                self.current_filter_fecha = turno_fecha
-            try:
-                # Actualizar la DateEntry para que muestre la fecha filtrada
-                self.fecha_entry.set_date(datetime.strptime(turno_fecha, "%Y-%m-%d").date())
-            except Exception:
-                pass
-            turnos = turno_dao.obtener_turnos_por_fecha(turno_fecha)
-        elif self.rol == "Medico":
-            # Por defecto mostrar solo los turnos del día actual
-            medico = MedicoDAO().obtener_medico_por_usuario(self.usuario)
+        if rol == "Administrador":
+            return turno_dao.consulta_grilla_turnos(fecha=turno_fecha)
+        if rol == "Medico":
+            medico = MedicoDAO().obtener_medico_por_usuario(usuario)
             if not medico:
-                turnos = []
-            else:
-                if getattr(self, 'current_filter_fecha', None):
-                    turno_fecha = self.current_filter_fecha
-                else:
-                    turno_fecha = date.today().strftime("%Y-%m-%d")
-                    self.current_filter_fecha = turno_fecha
-                try:
-                    self.fecha_entry.set_date(datetime.strptime(turno_fecha, "%Y-%m-%d").date())
-                except Exception:
-                    pass
-                turnos = turno_dao.obtener_turnos_por_medico_y_fecha(medico.id_medico, turno_fecha)
-        elif self.rol == "Paciente":
-            # Por defecto mostrar solo los turnos del día actual para el paciente; permitir filtrar por fecha
-            pac = PacienteDAO().obtener_paciente_por_usuario(self.usuario)
+                return None
+            return turno_dao.consulta_grilla_turnos(fecha=turno_fecha, id_medico=medico.id_medico)
+        if rol == "Paciente":
+            pac = PacienteDAO().obtener_paciente_por_usuario(usuario)
             if not pac:
-                turnos = []
-            else:
-                if getattr(self, 'current_filter_fecha', None):
-                    turno_fecha = self.current_filter_fecha
-                else:
-                    turno_fecha = date.today().strftime("%Y-%m-%d")
-                    self.current_filter_fecha = turno_fecha
-                try:
-                    self.fecha_entry.set_date(datetime.strptime(turno_fecha, "%Y-%m-%d").date())
-                except Exception:
-                    pass
-                turnos = turno_dao.obtener_turnos_por_paciente_y_fecha(pac.id_paciente, turno_fecha)
+                return None
+            return turno_dao.consulta_grilla_turnos(fecha=turno_fecha, id_paciente=pac.id_paciente)
+        return None
+
+    def _mostrar_turnos(self, consulta):
+        # Cada fila ya viene resuelta por TurnoDAO.consulta_grilla_turnos (un solo JOIN)
+        if consulta is None:
+            self.tabla.limpiar()
         else:
-            turnos = []
-
-        for t in turnos:
-            pac = PacienteDAO().buscar_paciente_por_id_paciente(t.id_paciente)
-            med = MedicoDAO().obtener_medico_por_id(t.id_medico)
-            esp = EspecialidadDAO().obtener_especialidad_por_id(med.id_especialidad) if med else None
-            cons_desc = ""
-            if hasattr(t, 'id_consultorio') and t.id_consultorio:
-                cons = next((c for c in getattr(self, 'consultorios', []) if c.id_consultorio == t.id_consultorio), None)
-                cons_desc = cons.descripcion if cons else str(t.id_consultorio)
-
-            paciente_nombre = f"{pac.nombre} {pac.apellido}" if pac else "N/A"
-            medico_nombre = f"{med.nombre} {med.apellido}" if med else "N/A"
-            especialidad_nombre = esp.nombre if esp else "N/A"
+            self.tabla.cargar(consulta)
 
-            fecha, hora = t.fecha_hora.split(" ")
-            estado = 'Pendiente' if t.asistio is None else ('Asistió' if t.asistio == 1 else 'Inasistencia')
-            tag = 'pendiente' if t.asistio is None else ('asistio' if t.asistio == 1 else 'inasistencia')
+    @staticmethod
+    def _etiqueta_turno(fila):
+        asistio = fila[8]
+        return ('pendiente' if asistio is None else ('asistio' if asistio == 1 else 'inasistencia'),)
 
-            self.tree.insert("", "end", values=(t.id_turno, paciente_nombre, medico_nombre, especialidad_nombre, cons_desc, fecha, hora, estado), tags=(tag,))
+    def _error_turnos(self, error):
+        print(f"Error al cargar turnos: {error}")
+        messagebox.showerror("Error", "No se pudieron cargar los turnos.", parent=self)
 
     def mostrar_horarios_disponibles(self, event=None):
         medico_nombre_completo = self.medico_combo.get()
@@ -301,6 +291,7 @@ class ABMTurnos(tk.Toplevel):
         slots = self.turno_dao.calcular_horarios_con_estado(id_medico, fecha)
 
         self.slots_listbox.delete(0, tk.END)
+        self.proximos_libres = None
         # Guardamos el estado localmente para validar selección
         self.slots_estado = []
         if slots:
@@ -331,6 +322,44 @@ class ABMTurnos(tk.Toplevel):
             self.slots_listbox.insert(tk.END, "No hay franjas laborales para este médico o fecha.")
             self.slots_estado = []
 
+    def mostrar_proximos_libres(self):
+        """Lista los primeros horarios libres entre todos los médicos de la especialidad elegida."""
+        nombre_esp = self.especialidad_combo.get()
+        esp = next((e for e in getattr(self, 'especialidades', []) if e.nombre == nombre_esp), None)
+        if not esp:
+            messagebox.showwarning("Advertencia", "Seleccione una especialidad para buscar horarios.")
+            return
+        if not hasattr(self, 'medicos') or not self.medicos:
+            self.cargar_medicos_por_especialidad(None)
+
+        if not hasattr(self, 'turno_dao'):
+            self.turno_dao = TurnoDAO()
+        self.proximos_libres = self.turno_dao.buscar_proximos_horarios_libres(id_especialidad=esp.id_especialidad, cantidad=20)
+
+        self.slots_listbox.delete(0, tk.END)
+        self.slots_estado = []
+        if not self.proximos_libres:
+            self.slots_listbox.insert(tk.END, "No hay horarios libres para esta especialidad en el próximo mes.")
+            return
+        for libre in self.proximos_libres:
+            self.slots_listbox.insert(tk.END, f"{libre['fecha']} {libre['hora']}  -  {libre['medico']}  (doble clic para elegir)")
+
+    def elegir_proximo_libre(self, event=None):
+        """Al elegir un resultado de la búsqueda por especialidad, carga médico, fecha y horario."""
+        if not self.proximos_libres:
+            return
+        sel = self.slots_listbox.curselection()
+        if not sel or sel[0] >= len(self.proximos_libres):
+            return
+        libre = self.proximos_libres[sel[0]]
+        self.medico_combo.set(libre['medico'])
+        self.fecha_entry.set_date(datetime.strptime(libre['fecha'], "%Y-%m-%d").date())
+        self.mostrar_horarios_disponibles()
+        idx = next((i for i, (h, _, _) in enumerate(self.slots_estado) if h == libre['hora']), None)
+        if idx is not None:
+            self.slots_listbox.selection_set(idx)
+            self.slots_listbox.see(idx)
+
     def solicitar_turno(self):
         fecha_obj = self.fecha_entry.get_date()
         fecha = fecha_obj.strftime("%Y-%m-%d")
@@ -371,12 +400,15 @@ class ABMTurnos(tk.Toplevel):
             messagebox.showerror("Error", "Complete todos los campos.")
             return
 
-        pac = next((p for p in self.pacientes if f"{p.nombre} {p.apellido}" == pac_nombre), None)
+        id_paciente = self.paciente_combo.get_id()
+        if id_paciente is None:
+            messagebox.showerror("Error", "Seleccione un paciente de la lista.")
+            return
         med = next((m for m in getattr(self, "medicos", []) if f"{m.nombre} {m.apellido}" == med_nombre), None)
 
         fecha_hora = f"{fecha} {hora_seleccionada}:00"
 
-        turno = Turno(id_paciente=pac.id_paciente, id_medico=med.id_medico, id_consultorio=None, fecha_hora=fecha_hora)
+        turno = Turno(id_paciente=id_paciente, id_medico=med.id_medico, id_consultorio=None, fecha_hora=fecha_hora)
 
         id_creado, mensaje = TurnoDAO().crear_turno(turno, self.usuario)
         if id_creado:
@@ -492,14 +524,9 @@ class ABMTurnos(tk.Toplevel):
             if not detalles:
                 if not messagebox.askyesno("Confirmar", "La receta está vacía. Desea crearla igual?"):
                     return
-            # Construir objeto receta con atributos que espera RecetaDAO
-            class _R: pass
-            r = _R()
-            r.id_paciente = turno.id_paciente
-            r.id_medico = turno.id_medico
             # Validaciones actuales esperan formato YYYY-MM-DD
-            r.fecha_emision = datetime.now().strftime("%Y-%m-%d")
-            r.detalles = detalles
+            r = Receta(id_paciente=turno.id_paciente, id_medico=turno.id_medico,
+                       fecha=datetime.now().strftime("%Y-%m-%d"), descripcion=detalles)
 
             from Backend.DAO.RecetaDAO import RecetaDAO
             receta_id = RecetaDAO().crear_receta(r, self.usuario)
@@ -0,0 +1,80 @@
+from tkinter import ttk
+
+
+class ComboBusqueda(ttk.Combobox):
+    """
+    Combobox que busca mientras se escribe, para elegir pacientes o médicos sin
+    cargar el padrón completo al abrir la ventana.
+
+    `buscar(texto)` debe devolver una lista acotada de pares (id, etiqueta), por
+    ejemplo PacienteDAO().buscar_opciones. La búsqueda se dispara `demora_ms`
+    después de la última tecla (debounce), así que escribir rápido genera una
+    sola consulta. `get_id()` devuelve el id de la opción elegida o None.
+    """
+
+    TECLAS_IGNORADAS = {"Up", "Down", "Left", "Right", "Return", "KP_Enter", "Tab", "Escape",
+                        "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+    def __init__(self, parent, buscar, demora_ms=250, **kwargs):
+        super().__init__(parent, **kwargs)
+        self._buscar = buscar
+        self._demora_ms = demora_ms
+        self._pendiente = None  # id del after() programado
+        self._opciones = {}  # etiqueta -> id
+        self._id_elegido = None
+        self.bind("<KeyRelease>", self._on_tecla, add="+")
+        self.bind("<<ComboboxSelected>>", self._on_elegido, add="+")
+        self.bind("<Destroy>", self._on_destroy, add="+")
+        # Con el combo vacío, al desplegarlo se muestran las primeras opciones
+        self.configure(postcommand=self._al_desplegar)
+
+    def _on_tecla(self, event):
+        if event.keysym in self.TECLAS_IGNORADAS:
+            return
+        self._id_elegido = None
+        if self._pendiente is not None:
+            self.after_cancel(self._pendiente)
+        self._pendiente = self.after(self._demora_ms, self.actualizar_opciones)
+
+    def _al_desplegar(self):
+        if not self._opciones:
+            self.actualizar_opciones()
+
+    def actualizar_opciones(self):
+        """Ejecuta la búsqueda con el texto actual y recarga la lista desplegable."""
+        self._pendiente = None
+        texto = self.get().strip()
+        try:
+            resultados = self._buscar(texto)
+        except Exception as e:
+            print(f"Error en la búsqueda del combo: {e}")
+            resultados = []
+        self._opciones = {etiqueta: id_valor for id_valor, etiqueta in resultados}
+        self["values"] = [etiqueta for _, etiqueta in resultados]
+
+    def _on_elegido(self, event=None):
+        self._id_elegido = self._opciones.get(self.get())
+
+    def _on_destroy(self, event):
+        if event.widget is self and self._pendiente is not None:
+            self.after_cancel(self._pendiente)
+            self._pendiente = None
+
+    def get_id(self):
+        """Id de la opción elegida; también acepta una etiqueta escrita completa."""
+        if self._id_elegido is not None:
+            return self._id_elegido
+        return self._opciones.get(self.get())
+
+    def seleccionar(self, id_valor, etiqueta):
+        """Fija una opción sin buscar (p. ej. el propio paciente logueado)."""
+        self._opciones = {etiqueta: id_valor}
+        self["values"] = [etiqueta]
+        self.set(etiqueta)
+        self._id_elegido = id_valor
+
+    def limpiar(self):
+        self._opciones = {}
+        self._id_elegido = None
+        self["values"] = []
+        self.set("")
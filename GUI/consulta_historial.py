@@ -2,6 +2,8 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from Backend.DAO.HistorialDAO import HistorialDAO
 from Backend.DAO.PacienteDAO import PacienteDAO
+from Backend.busqueda import etiqueta_persona
+from GUI.combo_busqueda import ComboBusqueda
 
 class ConsultaHistorial(tk.Toplevel):
     def __init__(self, parent, usuario, rol, id_paciente_fijo=None):
@@ -29,9 +31,9 @@ class ConsultaHistorial(tk.Toplevel):
         filter_frame.pack(fill='x', pady=5)
 
         tk.Label(filter_frame, text="Seleccionar Paciente:", bg="#333333", fg="white").pack(side='left', padx=(0, 5))
-        self.paciente_combo = ttk.Combobox(filter_frame, width=40, state='readonly')
+        self.paciente_combo = ComboBusqueda(filter_frame, buscar=lambda texto: PacienteDAO().buscar_opciones(texto), width=40)
         self.paciente_combo.pack(side='left')
-        self.paciente_combo.bind('<<ComboboxSelected>>', self.on_paciente_select)
+        self.paciente_combo.bind('<<ComboboxSelected>>', self.on_paciente_select, add="+")
 
         self.tree = ttk.Treeview(main_frame, columns=('fecha', 'medico', 'diagnostico'), show='headings')
         self.tree.heading('fecha', text='Fecha')
@@ -46,30 +48,24 @@ class ConsultaHistorial(tk.Toplevel):
         if self.rol == 'Paciente':
             paciente = PacienteDAO().obtener_paciente_por_usuario(self.usuario)
             if paciente:
-                self.pacientes = [paciente]
-                self.paciente_combo['values'] = [f"{paciente.nombre} {paciente.apellido}"]
-                self.paciente_combo.current(0)
+                self.paciente_combo.seleccionar(paciente.id_paciente, etiqueta_persona(paciente.apellido, paciente.nombre, paciente.dni))
                 self.paciente_combo.config(state='disabled')
                 self.on_paciente_select(None)
-        else: # Admin o Medico
-            self.pacientes = PacienteDAO().obtener_todos_los_pacientes()
-            self.paciente_combo['values'] = [f"{p.nombre} {p.apellido}" for p in self.pacientes]
+        # Admin o Medico: el combo busca pacientes a medida que se escribe
 
     def cargar_historial_fijo(self):
         paciente = PacienteDAO().buscar_paciente_por_id_paciente(self.id_paciente_fijo)
         if paciente:
-            self.paciente_combo['values'] = [f"{paciente.nombre} {paciente.apellido}"]
-            self.paciente_combo.current(0)
+            self.paciente_combo.seleccionar(paciente.id_paciente, etiqueta_persona(paciente.apellido, paciente.nombre, paciente.dni))
             self.on_paciente_select(None)
 
     def on_paciente_select(self, event):
         for i in self.tree.get_children():
             self.tree.delete(i)
 
-        idx = self.paciente_combo.current()
-        if idx < 0: return
+        id_paciente = self.paciente_combo.get_id()
+        if id_paciente is None: return
 
-        id_paciente = self.pacientes[idx].id_paciente
         historial_data, msg = HistorialDAO().obtener_historial_por_paciente(id_paciente, self.usuario)
 
         if not historial_data:
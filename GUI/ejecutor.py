@@ -0,0 +1,164 @@
+"""
+Ejecución de consultas a la base fuera del hilo de Tk.
+
+Los paneles no deben llamar a los DAOs directamente dentro de un callback de
+botón: una consulta lenta (o un envío de mail) congela la ventana. En su lugar
+cada ventana crea un `EjecutorDAO` y le pasa la función a ejecutar:
+
+    self.ejecutor = EjecutorDAO(self)
+    self.ejecutor.enviar('turnos', TurnoDAO().obtener_grilla_turnos, fecha,
+                         al_terminar=self._mostrar_turnos)
+
+La función corre en un pool de hilos compartido por toda la aplicación y el
+resultado vuelve por una cola que la ventana vacía con `after()`, así que
+`al_terminar` y `al_fallar` siempre se ejecutan en el hilo de Tk.
+
+Cada pedido tiene una clave ('turnos', 'reporte', ...). Si se envía un pedido
+nuevo con la misma clave antes de que termine el anterior, el anterior queda
+obsoleto: se cancela si todavía no había empezado y, si ya estaba corriendo,
+su resultado se descarta. Mientras haya pedidos pendientes la ventana muestra
+el cursor de espera.
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from Backend.BDD.Conexion import HILOS_GUI
+
+# Cada hilo del pool usa su propia conexión del pool de SQLite; la cantidad
+# (variable de entorno GUI_HILOS) entra en el cálculo de MAX_CONEXIONES
+MAX_HILOS = HILOS_GUI
+INTERVALO_MS = 40  # cada cuánto se revisa la cola de resultados
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool_hilos():
+    """Pool de hilos compartido por todas las ventanas, creado la primera vez."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=MAX_HILOS, thread_name_prefix="dao")
+    return _pool
+
+
+def cerrar_pool_hilos():
+    """Descarta los pedidos en espera y termina los hilos (al cerrar la aplicación)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+class EjecutorDAO:
+    def __init__(self, widget, cursor_ocupado="watch"):
+        self.widget = widget
+        self.cursor_ocupado = cursor_ocupado
+        self._resultados = queue.Queue()  # (clave, generación, ok, valor)
+        self._generaciones = {}  # clave -> generación del último pedido
+        self._futuros = {}  # clave -> future del último pedido
+        self._callbacks = {}  # (clave, generación) -> (al_terminar, al_fallar)
+        self._cursor_previo = None
+        self._sondeo = None  # id del after() que revisa la cola
+        self._cerrado = False
+        widget.bind("<Destroy>", self._on_destroy, add="+")
+
+    # ---------------- pedidos ----------------
+    def enviar(self, clave, funcion, *args, al_terminar=None, al_fallar=None, **kwargs):
+        """
+        Ejecuta funcion(*args, **kwargs) en segundo plano. Al terminar se llama
+        al_terminar(resultado) o, si lanzó una excepción, al_fallar(excepcion),
+        ambos en el hilo de Tk. Reemplaza al pedido anterior con la misma clave.
+        """
+        if self._cerrado:
+            return
+        self.cancelar(clave)
+        generacion = self._generaciones.get(clave, 0) + 1
+        self._generaciones[clave] = generacion
+        self._callbacks[(clave, generacion)] = (al_terminar, al_fallar)
+        self._futuros[clave] = get_pool_hilos().submit(
+            self._correr, clave, generacion, funcion, args, kwargs)
+        self._actualizar_indicador()
+        if self._sondeo is None:
+            self._sondeo = self.widget.after(INTERVALO_MS, self._vaciar_cola)
+
+    def _correr(self, clave, generacion, funcion, args, kwargs):
+        # Corre en un hilo del pool: no tocar widgets acá
+        try:
+            self._resultados.put((clave, generacion, True, funcion(*args, **kwargs)))
+        except Exception as e:
+            self._resultados.put((clave, generacion, False, e))
+
+    def cancelar(self, clave=None):
+        """Marca como obsoleto el pedido pendiente de una clave (o todos)."""
+        for c in ([clave] if clave is not None else list(self._futuros)):
+            futuro = self._futuros.pop(c, None)
+            if futuro is None:
+                continue
+            futuro.cancel()  # si ya está corriendo no se detiene, pero se ignora su resultado
+            self._callbacks.pop((c, self._generaciones.get(c)), None)
+        self._actualizar_indicador()
+
+    def ocupado(self, clave=None):
+        """True si hay pedidos pendientes (de la clave indicada o de cualquiera)."""
+        return (clave in self._futuros) if clave is not None else bool(self._futuros)
+
+    # ---------------- hilo de Tk ----------------
+    def _vaciar_cola(self):
+        self._sondeo = None
+        if self._cerrado:
+            return
+        while True:
+            try:
+                clave, generacion, ok, valor = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            callbacks = self._callbacks.pop((clave, generacion), None)
+            if callbacks is None or self._generaciones.get(clave) != generacion:
+                continue  # pedido cancelado o reemplazado por uno más nuevo
+            self._futuros.pop(clave, None)
+            self._actualizar_indicador()
+            al_terminar, al_fallar = callbacks
+            try:
+                if ok:
+                    if al_terminar:
+                        al_terminar(valor)
+                elif al_fallar:
+                    al_fallar(valor)
+                else:
+                    print(f"Error en tarea en segundo plano '{clave}': {valor}")
+            except Exception as e:
+                print(f"Error procesando el resultado de '{clave}': {e}")
+            if self._cerrado:
+                return
+        if self._futuros:
+            self._sondeo = self.widget.after(INTERVALO_MS, self._vaciar_cola)
+
+    def _actualizar_indicador(self):
+        try:
+            if self._futuros and self._cursor_previo is None:
+                self._cursor_previo = self.widget.cget("cursor")
+                self.widget.configure(cursor=self.cursor_ocupado)
+            elif not self._futuros and self._cursor_previo is not None:
+                self.widget.configure(cursor=self._cursor_previo)
+                self._cursor_previo = None
+        except Exception:
+            pass  # la ventana ya se destruyó
+
+    def _on_destroy(self, event):
+        if event.widget is not self.widget:
+            return
+        self._cerrado = True
+        for futuro in self._futuros.values():
+            futuro.cancel()
+        self._futuros.clear()
+        self._callbacks.clear()
+        if self._sondeo is not None:
+            try:
+                self.widget.after_cancel(self._sondeo)
+            except Exception:
+                pass
+            self._sondeo = None
@@ -64,11 +64,11 @@ class LoginWindow(tk.Tk):
             return
 
         usuario_dao = UsuarioDAO()
-        rol = usuario_dao.autenticar_usuario(usuario, password)
+        sesion = usuario_dao.iniciar_sesion(usuario, password)
         
-        if rol:
+        if sesion:
             self.destroy()
-            app = MainMenu(rol, usuario)
+            app = MainMenu(sesion.rol, usuario)
             app.mainloop()
         else:
             messagebox.showerror("Error", "Usuario o contraseña incorrectos.")
@@ -118,7 +118,8 @@ class PanelHorarios(tk.Toplevel):
         
     def _validar_hora_completa(self, hora_str):
         """
-        Valida que la cadena de hora tenga el formato HH:MM y que los valores sean válidos.
+        Valida que la cadena de hora tenga el formato HH:MM, que los valores sean válidos
+        y que caiga en punto o y media (los turnos son de 30 minutos desde HH:00 o HH:30).
         Retorna True si es válida, False en caso contrario.
         """
         match = re.fullmatch(r'(\d{2}):(\d{2})', hora_str)
@@ -128,7 +129,7 @@ class PanelHorarios(tk.Toplevel):
         horas = int(match.group(1))
         minutos = int(match.group(2))
         
-        if not (0 <= horas <= 23 and 0 <= minutos <= 59):
+        if not (0 <= horas <= 23 and minutos in (0, 30)):
             return False
             
         return True
@@ -171,11 +172,11 @@ class PanelHorarios(tk.Toplevel):
             return
 
         if not self._validar_hora_completa(inicio):
-            messagebox.showerror("Error", "La 'Hora Inicio' no es válida. Use el formato HH:MM (ej. 08:00).", parent=self)
+            messagebox.showerror("Error", "La 'Hora Inicio' no es válida. Use el formato HH:MM en punto o y media (ej. 08:00).", parent=self)
             return
         
         if not self._validar_hora_completa(fin):
-            messagebox.showerror("Error", "La 'Hora Fin' no es válida. Use el formato HH:MM (ej. 14:30).", parent=self)
+            messagebox.showerror("Error", "La 'Hora Fin' no es válida. Use el formato HH:MM en punto o y media (ej. 14:30).", parent=self)
             return
         
         if inicio >= fin:
@@ -251,11 +252,11 @@ class PanelHorarios(tk.Toplevel):
             return
 
         if not self._validar_hora_completa(inicio):
-            messagebox.showerror("Error", "La 'Hora Inicio' no es válida. Use el formato HH:MM (ej. 08:00).", parent=self)
+            messagebox.showerror("Error", "La 'Hora Inicio' no es válida. Use el formato HH:MM en punto o y media (ej. 08:00).", parent=self)
             return
         
         if not self._validar_hora_completa(fin):
-            messagebox.showerror("Error", "La 'Hora Fin' no es válida. Use el formato HH:MM (ej. 14:30).", parent=self)
+            messagebox.showerror("Error", "La 'Hora Fin' no es válida. Use el formato HH:MM en punto o y media (ej. 14:30).", parent=self)
             return
 
         if inicio >= fin:
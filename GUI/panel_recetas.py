@@ -4,6 +4,7 @@ from datetime import datetime, date
 from Backend.DAO.RecetaDAO import RecetaDAO
 from Backend.DAO.PacienteDAO import PacienteDAO
 from Backend.DAO.MedicoDAO import MedicoDAO
+from GUI.ejecutor import EjecutorDAO
 
 class PanelRecetas(tk.Toplevel):
     """Panel para que un paciente vea sus recetas y filtre por vigentes/vencidas."""
@@ -12,6 +13,7 @@ class PanelRecetas(tk.Toplevel):
         self.title("Mis Recetas")
         self.geometry("800x400")
         self.usuario = usuario
+        self.ejecutor = EjecutorDAO(self)
 
         self.create_widgets()
         self.cargar_recetas()
@@ -35,21 +37,23 @@ class PanelRecetas(tk.Toplevel):
         self.tree.pack(fill='both', expand=True, padx=10, pady=10)
 
     def cargar_recetas(self):
+        # La consulta corre en segundo plano; si se cambia el filtro antes de
+        # que termine, el pedido anterior se descarta
+        self.ejecutor.enviar('recetas', self._consultar_recetas, self.usuario, self.filtro_var.get(),
+                             al_terminar=self._mostrar_recetas, al_fallar=self._error_recetas)
+
+    @staticmethod
+    def _consultar_recetas(usuario, filtro):
+        """Se ejecuta fuera del hilo de Tk: devuelve las filas a mostrar o None si no hay paciente."""
         # Obtener paciente por usuario
-        paciente = PacienteDAO().obtener_paciente_por_usuario(self.usuario)
+        paciente = PacienteDAO().obtener_paciente_por_usuario(usuario)
         if not paciente:
-            messagebox.showerror('Error', 'No se pudo determinar el paciente')
-            self.destroy()
-            return
+            return None
 
         recetas = RecetaDAO().obtener_recetas_por_paciente(paciente.id_paciente)
 
-        # Limpiar
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
         hoy = date.today()
-        filtro = self.filtro_var.get()
+        filas = []
 
         for r in recetas:
             # r may have attributes 'fecha'/'descripcion' or 'fecha_emision'/'detalles'
@@ -101,4 +105,22 @@ class PanelRecetas(tk.Toplevel):
                 pass
 
             fecha_str = fecha_dt.strftime('%Y-%m-%d') if fecha_dt else str(raw_fecha)
-            self.tree.insert('', 'end', values=(r.id_receta, fecha_str, medico_nombre, getattr(r, 'detalles', getattr(r, 'descripcion', '')), estado))
+            filas.append((r.id_receta, fecha_str, medico_nombre, getattr(r, 'detalles', getattr(r, 'descripcion', '')), estado))
+        return filas
+
+    def _mostrar_recetas(self, filas):
+        if filas is None:
+            messagebox.showerror('Error', 'No se pudo determinar el paciente')
+            self.destroy()
+            return
+
+        # Limpiar
+        for i in self.tree.get_children():
+            self.tree.delete(i)
+
+        for valores in filas:
+            self.tree.insert('', 'end', values=valores)
+
+    def _error_recetas(self, error):
+        print(f"Error al cargar recetas: {error}")
+        messagebox.showerror('Error', 'No se pudieron cargar las recetas', parent=self)
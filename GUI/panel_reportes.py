@@ -3,6 +3,10 @@ from tkinter import ttk, messagebox, filedialog
 from Backend.DAO.TurnoDAO import TurnoDAO
 from Backend.DAO.MedicoDAO import MedicoDAO
 from Backend.DAO.PacienteDAO import PacienteDAO
+from GUI.combo_busqueda import ComboBusqueda
+from GUI.ejecutor import EjecutorDAO
+from GUI.tabla_paginada import TablaPaginada
+from Backend.cache_reportes import CacheReportes, MAX_FIGURAS
 
 try:
     from matplotlib.figure import Figure
@@ -54,13 +58,15 @@ class PanelReportes(tk.Toplevel):
         self.turno_dao = TurnoDAO()
         self.medico_dao = MedicoDAO()
         self.paciente_dao = PacienteDAO()
+        # Los reportes se calculan en segundo plano; todos comparten la clave
+        # 'reporte', así que pedir otro reporte descarta el que estaba en curso
+        self.ejecutor = EjecutorDAO(self)
         # Figura actual para exportar
         self.current_fig = None
+        # Gráficos ya armados de esta ventana, por datos graficados
+        self.figuras = CacheReportes('figuras', MAX_FIGURAS, seguir_base=False)
         
-        # --- Datos para combos ---
-        self.medicos = []
         self.create_widgets()
-        self.cargar_combo_medicos()
 
     def create_widgets(self):
         main_frame = ttk.Frame(self, style="Main.TFrame")
@@ -76,7 +82,7 @@ class PanelReportes(tk.Toplevel):
 
         # --- Columna 0 y 1: FILTROS ---
         ttk.Label(filter_frame, text="Médico:", style="TLabel").grid(row=0, column=0, padx=10, pady=10, sticky="e")
-        self.combo_medicos = ttk.Combobox(filter_frame, width=30, state="readonly")
+        self.combo_medicos = ComboBusqueda(filter_frame, buscar=lambda texto: self.medico_dao.buscar_opciones(texto), width=30)
         self.combo_medicos.grid(row=0, column=1, padx=5, pady=10, sticky="w")
 
         ttk.Label(filter_frame, text="Fecha Inicio:", style="TLabel").grid(row=1, column=0, padx=10, pady=10, sticky="e")
@@ -118,32 +124,28 @@ class PanelReportes(tk.Toplevel):
         self.tree_frame = ttk.Frame(main_frame)
         self.tree_frame.pack(padx=20, pady=10, fill="both", expand=True)
         
-        self.tree = ttk.Treeview(self.tree_frame, columns=("1", "2", "3", "4", "5"), show="headings")
-        self.tree.pack(fill="both", expand=True, side="left")
-        
-        scrollbar = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-        scrollbar.pack(side="right", fill="y")
+        # Tabla del reporte 3, paginada: los pacientes se traen a medida que se
+        # recorre la lista y el orden por columna se resuelve en SQL
+        self.tabla = TablaPaginada(self.tree_frame, [
+            ("id_pac", "ID Paciente", 80, "id_paciente"),
+            ("nombre", "Nombre", 150),
+            ("apellido", "Apellido", 150),
+            ("dni", "DNI", 100),
+            ("email", "Email", 200),
+        ], al_cargar=self._reporte_3_cargado)
+        self.tabla.pack(fill="both", expand=True, side="left")
+        self.tree = self.tabla.tree
+        self.tree.column("id_pac", anchor="center")
         
         # --- Frame del Gráfico (Lienzo) ---
         self.chart_frame = ttk.Frame(main_frame, style="Main.TFrame")
         # (No lo mostramos con .pack() aún)
 
-    def cargar_combo_medicos(self):
-        """Carga el ComboBox con todos los médicos."""
-        try:
-            # Asumo que tenés un método que devuelve todos los médicos
-            self.medicos = self.medico_dao.obtener_medicos() 
-            self.combo_medicos["values"] = [f"{m.nombre} {m.apellido}" for m in self.medicos]
-        except Exception as e:
-            print(f"Error cargando médicos: {e}")
-            messagebox.showerror("Error", "No se pudo cargar la lista de médicos.")
-
-    
     def generar_reporte_2(self):
         self.label_titulo_reporte.config(text="Reporte: Turnos por Especialidad")
         # Ocultar la tabla y preparar el frame del gráfico
-        self.tree.pack_forget()
+        self.tabla.limpiar()
+        self.tabla.pack_forget()
         for widget in self.chart_frame.winfo_children():
             widget.destroy()
         self.chart_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -163,8 +165,13 @@ class PanelReportes(tk.Toplevel):
             return
 
         # Llamar al Backend (DAO) con el rango de fechas
+        self.ejecutor.enviar('reporte', self.turno_dao.reporte_cantidad_turnos_por_especialidad_periodo,
+                             fecha_inicio, fecha_fin,
+                             al_terminar=lambda datos: self._dibujar_reporte_2(datos, fecha_inicio, fecha_fin),
+                             al_fallar=lambda e: self._error_reporte(2, e))
+
+    def _dibujar_reporte_2(self, datos_reporte, fecha_inicio, fecha_fin):
         try:
-            datos_reporte = self.turno_dao.reporte_cantidad_turnos_por_especialidad_periodo(fecha_inicio, fecha_fin)
             if not datos_reporte:
                 messagebox.showinfo("Sin resultados", "No se encontraron turnos para generar el reporte en ese período.", parent=self)
                 return
@@ -177,15 +184,10 @@ class PanelReportes(tk.Toplevel):
                 messagebox.showwarning("Matplotlib no instalado", "Instale matplotlib para ver el gráfico.", parent=self)
                 return
 
-            fig = Figure(figsize=(8, 5), dpi=100)
-            ax = fig.add_subplot(111)
-            ax.bar(nombres, cantidades, color='#4C78A8')
-            ax.set_title(f'Turnos por Especialidad\n{fecha_inicio} a {fecha_fin}')
-            ax.set_xlabel('Especialidad')
-            ax.set_ylabel('Cantidad de Turnos')
-            ax.set_xticks(range(len(nombres)))
-            ax.set_xticklabels(nombres, rotation=45, ha='right')
-            fig.tight_layout()
+            # Con los mismos datos se reutiliza el gráfico ya armado
+            fig = self.figuras.obtener_o_calcular(
+                ('reporte_2', fecha_inicio, fecha_fin, tuple(nombres), tuple(cantidades)),
+                self._figura_reporte_2, nombres, cantidades, fecha_inicio, fecha_fin)
 
             # Mostrar en canvas
             canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
@@ -200,8 +202,20 @@ class PanelReportes(tk.Toplevel):
                 pass
 
         except Exception as e:
-            print(f"Error generando reporte 2 (gráfico): {e}")
-            messagebox.showerror("Error de Backend", "No se pudo generar el reporte. Revise la consola.", parent=self)
+            self._error_reporte(2, e)
+
+    @staticmethod
+    def _figura_reporte_2(nombres, cantidades, fecha_inicio, fecha_fin):
+        fig = Figure(figsize=(8, 5), dpi=100)
+        ax = fig.add_subplot(111)
+        ax.bar(nombres, cantidades, color='#4C78A8')
+        ax.set_title(f'Turnos por Especialidad\n{fecha_inicio} a {fecha_fin}')
+        ax.set_xlabel('Especialidad')
+        ax.set_ylabel('Cantidad de Turnos')
+        ax.set_xticks(range(len(nombres)))
+        ax.set_xticklabels(nombres, rotation=45, ha='right')
+        fig.tight_layout()
+        return fig
 
 
     def generar_reporte_3(self):
@@ -217,8 +231,9 @@ class PanelReportes(tk.Toplevel):
             pass
         # Ocultar el gráfico (si está visible)
         self.chart_frame.pack_forget()
-        # Mostrar la tabla (TreeView)
-        self.tree.pack(fill="both", expand=True, side="left")
+        # Mostrar la tabla (TreeView); descarta un gráfico que se estuviera calculando
+        self.ejecutor.cancelar('reporte')
+        self.tabla.pack(fill="both", expand=True, side="left")
         
         # 1. Obtener datos de los filtros (solo fechas)
         try:
@@ -235,46 +250,12 @@ class PanelReportes(tk.Toplevel):
             messagebox.showwarning("Rango inválido", "La 'Fecha Fin' no puede ser anterior a la 'Fecha Inicio'.", parent=self)
             return
 
-        # 3. Limpiar y Reconfigurar tabla (TreeView)
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        # --- RECONFIGURAR COLUMNAS PARA REPORTE 3 ---
-        self.tree.configure(columns=("id_pac", "nombre", "apellido", "dni", "email"), show="headings")
-        self.tree.heading("id_pac", text="ID Paciente")
-        self.tree.heading("nombre", text="Nombre")
-        self.tree.heading("apellido", text="Apellido")
-        self.tree.heading("dni", text="DNI")
-        self.tree.heading("email", text="Email")
-        self.tree.column("id_pac", width=80, anchor="center")
-        self.tree.column("nombre", width=150)
-        self.tree.column("apellido", width=150)
-        self.tree.column("dni", width=100)
-        self.tree.column("email", width=200)
-        # ---------------------------------------------
-
-        # 4. Llamar al Backend (DAO)
-        try:
-            # Este método del PacienteDAO ya lo creamos
-            pacientes_encontrados = self.paciente_dao.reporte_pacientes_atendidos_por_fecha(fecha_inicio, fecha_fin)
-            
-            if not pacientes_encontrados:
-                messagebox.showinfo("Sin resultados", "No se encontraron pacientes atendidos en ese período.", parent=self)
-                return
+        # 3. Llamar al Backend (DAO): la tabla pide las páginas en segundo plano
+        self.tabla.cargar(self.paciente_dao.consulta_pacientes_atendidos(fecha_inicio, fecha_fin))
 
-            # 5. Poblar la tabla
-            for pac in pacientes_encontrados:
-                self.tree.insert("", "end", values=(
-                    pac.id_paciente,
-                    pac.nombre,
-                    pac.apellido,
-                    pac.dni,
-                    pac.email
-                ))
-        
-        except Exception as e:
-            print(f"Error generando reporte 3: {e}")
-            messagebox.showerror("Error de Backend", "No se pudo generar el reporte. Revise la consola.", parent=self)
+    def _reporte_3_cargado(self, total):
+        if not total:
+            messagebox.showinfo("Sin resultados", "No se encontraron pacientes atendidos en ese período.", parent=self)
 
 
     def generar_reporte_4(self):
@@ -286,33 +267,38 @@ class PanelReportes(tk.Toplevel):
             return
         self.label_titulo_reporte.config(text="Reporte: Gráfico de Asistencias")
         # Ocultar la tabla (TreeView)
-        self.tree.pack_forget() 
+        self.tabla.limpiar()
+        self.tabla.pack_forget()
         # Limpiar el frame del gráfico (por si ya había uno)
         for widget in self.chart_frame.winfo_children():
             widget.destroy()
         # Mostrar el frame del gráfico
         self.chart_frame.pack(fill="both", expand=True, padx=10, pady=10)
 
-        # 2. Llamar al Backend (DAO)
+        # Obtener fechas del calendario y validar
         try:
-            # Este método del TurnoDAO ya lo creamos
-            # Devuelve una tupla (asistencias, inasistencias, pendientes)
-            # Obtener fechas del calendario y validar
-            try:
-                fecha_obj_inicio = self.entry_fecha_inicio.get_date()
-                fecha_obj_fin = self.entry_fecha_fin.get_date()
-                fecha_inicio = fecha_obj_inicio.strftime('%Y-%m-%d')
-                fecha_fin = fecha_obj_fin.strftime('%Y-%m-%d')
-            except Exception:
-                messagebox.showerror("Error de fecha", "Fechas inválidas seleccionadas.", parent=self)
-                return
-
-            if fecha_obj_fin < fecha_obj_inicio:
-                messagebox.showwarning("Rango inválido", "La 'Fecha Fin' no puede ser anterior a la 'Fecha Inicio'.", parent=self)
-                return
+            fecha_obj_inicio = self.entry_fecha_inicio.get_date()
+            fecha_obj_fin = self.entry_fecha_fin.get_date()
+            fecha_inicio = fecha_obj_inicio.strftime('%Y-%m-%d')
+            fecha_fin = fecha_obj_fin.strftime('%Y-%m-%d')
+        except Exception:
+            messagebox.showerror("Error de fecha", "Fechas inválidas seleccionadas.", parent=self)
+            return
 
-            datos = self.turno_dao.reporte_asistencia_por_periodo(fecha_inicio, fecha_fin)
+        if fecha_obj_fin < fecha_obj_inicio:
+            messagebox.showwarning("Rango inválido", "La 'Fecha Fin' no puede ser anterior a la 'Fecha Inicio'.", parent=self)
+            return
 
+        # 2. Llamar al Backend (DAO)
+        # Este método del TurnoDAO ya lo creamos
+        # Devuelve una tupla (asistencias, inasistencias, pendientes)
+        self.ejecutor.enviar('reporte', self.turno_dao.reporte_asistencia_por_periodo,
+                             fecha_inicio, fecha_fin,
+                             al_terminar=self._dibujar_reporte_4,
+                             al_fallar=lambda e: self._error_reporte(4, e))
+
+    def _dibujar_reporte_4(self, datos):
+        try:
             if not datos or (datos[0] is None and datos[1] is None and datos[2] is None):
                 messagebox.showinfo("Sin resultados", "No hay datos de asistencia para graficar en ese período.", parent=self)
                 return
@@ -322,23 +308,10 @@ class PanelReportes(tk.Toplevel):
             pendientes = datos[2] if datos[2] is not None else 0
 
             # 3. Preparar los datos para Matplotlib
-            labels = ['Asistencias', 'Inasistencias', 'Pendientes']
-            valores = [asistencias, inasistencias, pendientes]
-            colores = ['#4CAF50', '#F44336', '#FFC107'] # Verde, Rojo, Ámbar
-
-            # 4. Crear la Figura (El Gráfico)
-            # Creamos una figura de matplotlib (tamaño 8x5 pulgadas)
-            fig = Figure(figsize=(8, 5), dpi=100)
-            # Le agregamos un "subplot" (un set de ejes)
-            ax = fig.add_subplot(111) 
-            
-            # Creamos el gráfico de barras
-            ax.bar(labels, valores, color=colores)
-            
-            # Seteamos títulos y etiquetas
-            ax.set_title('Resumen de Asistencia de Pacientes')
-            ax.set_ylabel('Cantidad de Turnos')
-            ax.set_ylim(0, max(valores) * 1.2) # Damos un 20% de espacio arriba
+            valores = (asistencias, inasistencias, pendientes)
+
+            # 4. Crear la Figura (El Gráfico), o reutilizarla si los valores son los mismos
+            fig = self.figuras.obtener_o_calcular(('reporte_4', valores), self._figura_reporte_4, valores)
 
             # 5. "Dibujar" el gráfico en el "Lienzo" de Tkinter
             canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
@@ -353,8 +326,29 @@ class PanelReportes(tk.Toplevel):
                 pass
 
         except Exception as e:
-            print(f"Error generando reporte 4 (gráfico): {e}")
-            messagebox.showerror("Error de Backend", "No se pudo generar el gráfico. Revise la consola.", parent=self)
+            self._error_reporte(4, e)
+
+    @staticmethod
+    def _figura_reporte_4(valores):
+        labels = ['Asistencias', 'Inasistencias', 'Pendientes']
+        colores = ['#4CAF50', '#F44336', '#FFC107'] # Verde, Rojo, Ámbar
+        # Creamos una figura de matplotlib (tamaño 8x5 pulgadas)
+        fig = Figure(figsize=(8, 5), dpi=100)
+        # Le agregamos un "subplot" (un set de ejes)
+        ax = fig.add_subplot(111)
+
+        # Creamos el gráfico de barras
+        ax.bar(labels, valores, color=colores)
+
+        # Seteamos títulos y etiquetas
+        ax.set_title('Resumen de Asistencia de Pacientes')
+        ax.set_ylabel('Cantidad de Turnos')
+        ax.set_ylim(0, max(valores) * 1.2) # Damos un 20% de espacio arriba
+        return fig
+
+    def _error_reporte(self, numero, error):
+        print(f"Error generando reporte {numero}: {error}")
+        messagebox.showerror("Error de Backend", "No se pudo generar el reporte. Revise la consola.", parent=self)
 
     def export_current_chart(self):
         """Abre un diálogo para exportar la figura actual a PDF."""
@@ -5,6 +5,8 @@ from Backend.DAO.HistorialDAO import HistorialDAO
 from Backend.DAO.PacienteDAO import PacienteDAO
 from Backend.DAO.MedicoDAO import MedicoDAO
 from Backend.Model.Historial import Historial
+from Backend.busqueda import etiqueta_persona
+from GUI.combo_busqueda import ComboBusqueda
 
 
 class RegistroHistorial(tk.Toplevel):
@@ -17,7 +19,6 @@ class RegistroHistorial(tk.Toplevel):
         self.usuario = usuario
         self.rol = rol
         self.id_paciente_fijo = id_paciente_fijo
-        self.pacientes = []
         
         if rol != "Medico":
             messagebox.showerror("Error", "Solo médicos pueden registrar en el historial.")
@@ -33,7 +34,7 @@ class RegistroHistorial(tk.Toplevel):
 
         # Selección de paciente
         ttk.Label(form_frame, text="Paciente:").grid(row=0, column=0, padx=10, pady=8, sticky="e")
-        self.paciente_combo = ttk.Combobox(form_frame, width=45, state="readonly")
+        self.paciente_combo = ComboBusqueda(form_frame, buscar=lambda texto: PacienteDAO().buscar_opciones(texto), width=45)
         self.paciente_combo.grid(row=0, column=1, padx=10, pady=8, sticky="w")
 
         # Fecha (automática, solo informativa)
@@ -63,20 +64,16 @@ class RegistroHistorial(tk.Toplevel):
         if self.id_paciente_fijo is not None:
             paciente = PacienteDAO().buscar_paciente_por_id_paciente(self.id_paciente_fijo)
             if paciente:
-                self.pacientes = [paciente]
-                self.paciente_combo['values'] = [f"{paciente.apellido}, {paciente.nombre} (DNI: {paciente.dni})"]
-                self.paciente_combo.current(0)
+                self.paciente_combo.seleccionar(paciente.id_paciente, etiqueta_persona(paciente.apellido, paciente.nombre, paciente.dni))
                 self.paciente_combo.config(state="disabled")
             else:
                 messagebox.showerror("Error", "Paciente no encontrado.")
                 self.destroy()
-        else:
-            self.pacientes = PacienteDAO().obtener_todos_los_pacientes()
-            self.paciente_combo['values'] = [f"{p.apellido}, {p.nombre} (DNI: {p.dni})" for p in self.pacientes]
+        # Sin paciente fijo, el combo busca pacientes a medida que se escribe
 
     def guardar_entrada(self):
-        sel_index = self.paciente_combo.current()
-        if sel_index == -1:
+        id_paciente = self.paciente_combo.get_id()
+        if id_paciente is None:
             messagebox.showerror("Error", "Debe seleccionar un paciente.")
             return
 
@@ -93,10 +90,8 @@ class RegistroHistorial(tk.Toplevel):
             messagebox.showerror("Error", "No se pudo identificar al médico.")
             return
 
-        paciente = self.pacientes[sel_index]
-        
         historial = Historial(
-            id_paciente=paciente.id_paciente,
+            id_paciente=id_paciente,
             id_medico=medico.id_medico,
             fecha=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             diagnostico=diagnostico,
@@ -3,6 +3,7 @@ from tkinter import ttk, messagebox, filedialog
 # Imports absolutos desde Backend
 from Backend.DAO.TurnoDAO import TurnoDAO
 from Backend.DAO.PacienteDAO import PacienteDAO
+from Backend.cache_reportes import cache_reportes, CacheReportes, MAX_FIGURAS
 
 try:
     import matplotlib.pyplot as plt
@@ -21,6 +22,11 @@ class Reportes(tk.Toplevel):
         self.geometry("800x600")
         # Figura actual mostrada (para exportar)
         self.current_fig = None
+        # Gráficos ya armados de esta ventana, por datos graficados. Son figuras
+        # de pyplot: se cierran al salir del caché y al cerrar la ventana.
+        self.figuras = CacheReportes('figuras', MAX_FIGURAS, seguir_base=False,
+                                     al_descartar=plt.close if _HAS_MATPLOTLIB else None)
+        self.bind("<Destroy>", self._on_destroy, add="+")
 
         self.create_widgets()
 
@@ -85,37 +91,37 @@ class Reportes(tk.Toplevel):
     # 'Turnos por Médico' report removed
 
     def reporte_turnos_por_paciente(self):
+        # Los conteos quedan en caché hasta que cambie la base (Backend/cache_reportes.py)
+        paciente_nombres, turnos_counts = cache_reportes.obtener_o_calcular(
+            ('Reportes.turnos_por_paciente',), self._contar_turnos_por_paciente)
+
+        self.crear_grafico_barras(paciente_nombres, turnos_counts, "Turnos por Paciente", "Pacientes", "Cantidad de Turnos")
+
+    @staticmethod
+    def _contar_turnos_por_paciente():
         turno_dao = TurnoDAO()
         paciente_dao = PacienteDAO()
 
-        pacientes = paciente_dao.obtener_todos_los_pacientes()
-        paciente_nombres = [f"{p.nombre} {p.apellido}" for p in pacientes]
-        turnos_counts = [turno_dao.contar_turnos_por_paciente(p.id_paciente) for p in pacientes]
-
-        self.crear_grafico_barras(paciente_nombres, turnos_counts, "Turnos por Paciente", "Pacientes", "Cantidad de Turnos")
+        paciente_nombres = []
+        turnos_counts = []
+        for p in paciente_dao.iter_pacientes():
+            paciente_nombres.append(f"{p.nombre} {p.apellido}")
+            turnos_counts.append(turno_dao.contar_turnos_por_paciente(p.id_paciente))
+        # Tuplas: el valor queda en el caché y se comparte entre llamadas
+        return tuple(paciente_nombres), tuple(turnos_counts)
 
     def reporte_turnos_por_dia(self):
         turno_dao = TurnoDAO()
-        turnos = turno_dao.obtener_todos_los_turnos()
-        
-        turnos_por_dia = {}
-        for turno in turnos:
-            fecha = turno.fecha_hora.split(" ")[0]
-            turnos_por_dia[fecha] = turnos_por_dia.get(fecha, 0) + 1
-            
-        dias = list(turnos_por_dia.keys())
-        turnos_counts = list(turnos_por_dia.values())
+        datos = turno_dao.reporte_turnos_por_dia()
+        dias = [d[0] for d in datos]
+        turnos_counts = [d[1] for d in datos]
 
         self.crear_grafico_barras(dias, turnos_counts, "Turnos por Día", "Fecha", "Cantidad de Turnos")
 
     def crear_grafico_barras(self, x_data, y_data, title, xlabel, ylabel):
-        fig, ax = plt.subplots(figsize=(10, 5))
-        ax.bar(x_data, y_data)
-        ax.set_title(title)
-        ax.set_xlabel(xlabel)
-        ax.set_ylabel(ylabel)
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
+        # Con los mismos datos se reutiliza la figura ya armada
+        fig = self.figuras.obtener_o_calcular((title, xlabel, ylabel, tuple(x_data), tuple(y_data)),
+                                              self._figura_barras, x_data, y_data, title, xlabel, ylabel)
         # Guardar figura actual y habilitar exportación
         self.current_fig = fig
         try:
@@ -127,6 +133,17 @@ class Reportes(tk.Toplevel):
         canvas.draw()
         canvas.get_tk_widget().pack(fill="both", expand=True)
 
+    @staticmethod
+    def _figura_barras(x_data, y_data, title, xlabel, ylabel):
+        fig, ax = plt.subplots(figsize=(10, 5))
+        ax.bar(x_data, y_data)
+        ax.set_title(title)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        plt.xticks(rotation=45, ha="right")
+        plt.tight_layout()
+        return fig
+
     def reporte_turnos_por_especialidad(self):
         turno_dao = TurnoDAO()
         datos = turno_dao.reporte_cantidad_turnos_por_especialidad()
@@ -147,6 +164,15 @@ class Reportes(tk.Toplevel):
             messagebox.showinfo("Info", "No hay datos de asistencia/inasistencia registrados.")
             return
 
+        fig = self.figuras.obtener_o_calcular(('asistencia_mes', tuple(map(tuple, datos))),
+                                              self._figura_asistencias_por_mes, datos)
+
+        canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
+        canvas.draw()
+        canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    @staticmethod
+    def _figura_asistencias_por_mes(datos):
         meses = [d[0] for d in datos]
         asist = [d[1] for d in datos]
         inasist = [d[2] for d in datos]
@@ -162,10 +188,12 @@ class Reportes(tk.Toplevel):
         ax.set_xticklabels(meses, rotation=45, ha="right")
         ax.legend()
         plt.tight_layout()
+        return fig
 
-        canvas = FigureCanvasTkAgg(fig, master=self.chart_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill="both", expand=True)
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self.current_fig = None
+            self.figuras.invalidar()
 
     def export_current_chart(self):
         """Exporta la figura actual a un archivo PDF usando un diálogo de guardado."""
@@ -0,0 +1,182 @@
+from tkinter import ttk
+from collections import deque
+
+from Backend.paginacion import TAM_PAGINA
+from GUI.ejecutor import EjecutorDAO
+
+
+class TablaPaginada(ttk.Frame):
+    """
+    Treeview que muestra una `ConsultaPaginada` (Backend/paginacion.py) sin
+    cargar todas las filas: trae la primera página y, a medida que el usuario
+    se acerca al final (o al principio) de lo cargado, pide la página siguiente
+    (o la anterior) por clave. Como máximo mantiene `max_paginas` páginas en el
+    Treeview y descarta las del otro extremo.
+
+    Al hacer clic en un encabezado se ordena por esa columna (en SQL, no en
+    memoria). Las consultas corren en segundo plano con EjecutorDAO.
+
+    columnas: lista de (clave, título, ancho) o (clave, título, ancho, orden),
+    donde `orden` es la columna de la consulta por la que se ordena (por defecto
+    la misma clave). `valores(fila)` y `etiquetas(fila)` permiten adaptar cada
+    fila de la consulta a los valores y tags del Treeview. `al_cargar(total)` se
+    llama cada vez que se muestra la primera página de una consulta.
+
+    El Treeview queda accesible como `self.tree` (selection, item, bind...).
+    """
+
+    UMBRAL = 0.1  # fracción del scroll a la que se pide la página siguiente/anterior
+
+    def __init__(self, parent, columnas, tam_pagina=TAM_PAGINA, max_paginas=5,
+                 valores=None, etiquetas=None, al_cargar=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.tam_pagina = tam_pagina
+        self.max_paginas = max_paginas
+        self._valores = valores or (lambda fila: fila[:len(self._columnas)])
+        self._etiquetas = etiquetas
+        self._al_cargar = al_cargar  # al_cargar(total) después de mostrar la primera página
+        self._columnas = []  # (clave, título, columna de orden)
+
+        claves = [c[0] for c in columnas]
+        self.tree = ttk.Treeview(self, columns=claves, show="headings")
+        for col in columnas:
+            clave, titulo, ancho = col[:3]
+            orden = col[3] if len(col) > 3 else clave
+            self._columnas.append((clave, titulo, orden))
+            self.tree.heading(clave, text=titulo, command=lambda c=clave: self.ordenar_por(c))
+            self.tree.column(clave, width=ancho)
+
+        self.label_estado = ttk.Label(self, text="")
+        self.label_estado.pack(side="bottom", anchor="w")
+        self.tree.pack(fill="both", expand=True, side="left")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.configure(yscrollcommand=self._on_scroll)
+
+        self.ejecutor = EjecutorDAO(self)
+        self._consulta = None
+        self._orden = None  # clave de la columna elegida
+        self._descendente = False
+        self._total = 0
+        self._paginas = deque()  # [ids de items, clave de la primera fila, clave de la última]
+        self._hay_antes = False
+        self._hay_despues = False
+
+    # ---------------- carga ----------------
+    def cargar(self, consulta):
+        """Muestra una nueva consulta desde su primera página."""
+        self._consulta = consulta
+        self.recargar()
+
+    def recargar(self):
+        """Vuelve a pedir la primera página (p. ej. después de un alta o una baja)."""
+        if self._consulta is None:
+            return
+        self.ejecutor.enviar('pagina', self._primera_pagina, self._consulta, self._columna_orden(),
+                             self._descendente, self.tam_pagina, al_terminar=self._mostrar_primera)
+
+    @staticmethod
+    def _primera_pagina(consulta, orden, descendente, limite):
+        return consulta.contar(), consulta.pagina(orden, descendente, limite=limite)
+
+    def limpiar(self):
+        self.ejecutor.cancelar()
+        self._consulta = None
+        self._vaciar()
+        self.label_estado.config(text="")
+
+    def _vaciar(self):
+        self.tree.delete(*self.tree.get_children())
+        self._paginas.clear()
+        self._hay_antes = self._hay_despues = False
+
+    def _mostrar_primera(self, resultado):
+        self._total, filas = resultado
+        self._vaciar()
+        self._insertar(filas, al_final=True)
+        self.tree.yview_moveto(0)
+        self._actualizar_estado()
+        if self._al_cargar:
+            self._al_cargar(self._total)
+
+    def _insertar(self, filas, al_final):
+        if not filas:
+            if al_final:
+                self._hay_despues = False
+            else:
+                self._hay_antes = False
+            return
+        orden = self._columna_orden()
+        ids = []
+        for i, fila in enumerate(filas):
+            tags = self._etiquetas(fila) if self._etiquetas else ()
+            ids.append(self.tree.insert("", "end" if al_final else i, values=self._valores(fila), tags=tags))
+        pagina = (ids, self._consulta.clave(filas[0], orden), self._consulta.clave(filas[-1], orden))
+        completa = len(filas) == self.tam_pagina
+        if al_final:
+            self._paginas.append(pagina)
+            self._hay_despues = completa
+        else:
+            self._paginas.appendleft(pagina)
+            self._hay_antes = completa
+
+    # ---------------- desplazamiento ----------------
+    def _on_scroll(self, primero, ultimo):
+        self.scrollbar.set(primero, ultimo)
+        if self._consulta is None or self.ejecutor.ocupado('pagina') or not self._paginas:
+            return
+        orden = self._columna_orden()
+        if float(ultimo) >= 1 - self.UMBRAL and self._hay_despues:
+            self.ejecutor.enviar('pagina', self._consulta.pagina, orden, self._descendente,
+                                 despues_de=self._paginas[-1][2], limite=self.tam_pagina,
+                                 al_terminar=lambda filas: self._agregar(filas, al_final=True))
+        elif float(primero) <= self.UMBRAL and self._hay_antes:
+            self.ejecutor.enviar('pagina', self._consulta.pagina, orden, self._descendente,
+                                 antes_de=self._paginas[0][1], limite=self.tam_pagina,
+                                 al_terminar=lambda filas: self._agregar(filas, al_final=False))
+
+    def _agregar(self, filas, al_final):
+        # Conservar la fila visible arriba de todo mientras se agregan/quitan páginas
+        cantidad = len(self.tree.get_children())
+        arriba = round(float(self.tree.yview()[0]) * cantidad)
+        self._insertar(filas, al_final)
+        if not al_final:
+            arriba += len(filas)
+        if len(self._paginas) > self.max_paginas:
+            if al_final:
+                ids = self._paginas.popleft()[0]
+                self._hay_antes = True
+                arriba -= len(ids)
+            else:
+                ids = self._paginas.pop()[0]
+                self._hay_despues = True
+            self.tree.delete(*ids)
+        cantidad = len(self.tree.get_children())
+        if cantidad:
+            self.tree.yview_moveto(max(arriba, 0) / cantidad)
+
+    # ---------------- orden ----------------
+    def _columna_orden(self):
+        for clave, _, orden in self._columnas:
+            if clave == self._orden:
+                return orden
+        return None  # orden por defecto de la consulta
+
+    def ordenar_por(self, clave):
+        """Ordena por la columna (un segundo clic invierte el sentido) y recarga."""
+        if self._consulta is not None:
+            orden = next(o for c, _, o in self._columnas if c == clave)
+            if orden not in self._consulta.ordenables:
+                return
+        if self._orden == clave:
+            self._descendente = not self._descendente
+        else:
+            self._orden = clave
+            self._descendente = False
+        for c, titulo, _ in self._columnas:
+            flecha = (" ▼" if self._descendente else " ▲") if c == self._orden else ""
+            self.tree.heading(c, text=titulo + flecha)
+        self.recargar()
+
+    def _actualizar_estado(self):
+        self.label_estado.config(text=f"{self._total} filas")